@@ -5,6 +5,10 @@ import ctypes
 import numpy as np
 import cv2
 from utils.config_loader import ConfigLoader
+from camera.edsdk_backend import load_edsdk
+from camera.evf_reader import EvfFrameReader
+from camera.jpeg_decoder import JpegDecoder
+from utils.frame_packet import FramePacket, content_hash
 
 
 # Canon EDSDK konstanty
@@ -31,23 +35,38 @@ kEdsWhiteBalance_Daylight = 0x02
 class CanonCamera:
     """Canon EOS LiveView kamera přes EDSDK."""
 
-    def __init__(self, sdk_path, debug=False):
+    def __init__(self, sdk_path, debug=False, decoder=None, edsdk=None, dedupe=True, camera_index=0):
         self.debug = debug
+        self.camera_index = camera_index  # pořadí těla v seznamu kamer EDSDK (víc kamer na jednom PC)
+        self.dedupe = dedupe  # stejný EVF JPEG jako minule → bez dekódování, označen jako duplikát
+        self.duplicates = 0
+        self.decoder = decoder or JpegDecoder()
         self.sdk_path = sdk_path
         self.edsdk = None
         self.cam_ref = None
         self.available = False
         self.initialized = False
+        self._evf_reader = None
+        self._last_jpeg = None
+        self._last_full = None
+        self._last_capture_time = None
+        self._last_frame = None
+        self._last_digest = None
+        self._duplicate = False
+
+        if edsdk is not None:
+            # Náhradní backend (např. FakeEdsdk) – bez Windows DLL
+            self.edsdk = edsdk
+            self.available = True
+            print(f"[CanonCamera] EDSDK backend: {type(edsdk).__name__}")
+            return
 
         if not os.path.exists(sdk_path):
             raise FileNotFoundError(f"[CanonCamera] SDK knihovna nenalezena: {sdk_path}")
 
-        try:
-            self.edsdk = ctypes.WinDLL(sdk_path)
-            print(f"[CanonCamera] EDSDK načteno z: {sdk_path}")
-            self.available = True
-        except Exception as e:
-            raise RuntimeError(f"[CanonCamera] Nelze načíst EDSDK DLL: {e}")
+        self.edsdk = load_edsdk(sdk_path)
+        print(f"[CanonCamera] EDSDK načteno z: {sdk_path}")
+        self.available = True
 
     def initialize(self):
         """Inicializace EDSDK a otevření relace s kamerou."""
@@ -61,7 +80,8 @@ class CanonCamera:
         self._check(self.edsdk.EdsGetCameraList(ctypes.byref(cam_list)), "EdsGetCameraList")
 
         cam_ref = ctypes.c_void_p()
-        self._check(self.edsdk.EdsGetChildAtIndex(cam_list, 0, ctypes.byref(cam_ref)), "EdsGetChildAtIndex")
+        self._check(self.edsdk.EdsGetChildAtIndex(cam_list, self.camera_index, ctypes.byref(cam_ref)),
+                    f"EdsGetChildAtIndex (kamera {self.camera_index})")
 
         try:
             self.edsdk.EdsRelease(cam_list)
@@ -137,52 +157,97 @@ class CanonCamera:
         if not self.available or not self.initialized:
             return None
 
+        if self._evf_reader is None:
+            self._evf_reader = EvfFrameReader(self.edsdk, self.cam_ref, debug=self.debug)
+
         for attempt in range(3):
             try:
-                stream_ref = ctypes.c_void_p()
-                evf_image = ctypes.c_void_p()
-
-                self.edsdk.EdsCreateMemoryStream(0, ctypes.byref(stream_ref))
-                self.edsdk.EdsCreateEvfImageRef(stream_ref, ctypes.byref(evf_image))
-
-                err = self.edsdk.EdsDownloadEvfImage(self.cam_ref, evf_image)
+                err, jpeg = self._evf_reader.read_jpeg()
                 if err != EDS_OK:
                     if self.debug:
                         print(f"[CanonCamera DEBUG] EvfDownload error {hex(err)}, retry {attempt+1}/3")
                     time.sleep(0.3)
                     continue
 
-                pointer = ctypes.c_void_p()
-                size = ctypes.c_uint64()
-                self.edsdk.EdsGetPointer(stream_ref, ctypes.byref(pointer))
-                self.edsdk.EdsGetLength(stream_ref, ctypes.byref(size))
-
-                if size.value == 0:
+                if jpeg is None:
                     time.sleep(0.2)
                     continue
-
-                data = (ctypes.c_ubyte * size.value).from_address(pointer.value)
-                img_array = np.frombuffer(data, dtype=np.uint8)
-                frame = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-
-                self.edsdk.EdsRelease(evf_image)
-                self.edsdk.EdsRelease(stream_ref)
-
+                capture_time = time.monotonic()
+
+                # Kamera bez nového snímku vrací tentýž JPEG – otisk je levnější než dekódování
+                digest = content_hash(jpeg) if self.dedupe else None
+                if digest is not None and digest == self._last_digest and self._last_frame is not None:
+                    self.duplicates += 1
+                    self._duplicate = True
+                    # Kopie jen pro duplikát (levnější než dekódování); originál zůstává čistý,
+                    # protože konzumenti do obrazu paketu nekreslí (Visualizer kreslí do kopie)
+                    return self._last_frame.copy()
+
+                # Dekódování přímo z paměti SDK streamu (bez mezikopie)
+                frame = self.decoder.decode(jpeg)
                 if frame is not None:
+                    self._remember_frame(jpeg, frame, capture_time, digest)
                     return frame
 
             except Exception as e:
                 if self.debug:
                     print(f"[CanonCamera DEBUG] get_frame exception: {e}")
+                # Handly mohou být po výjimce v nedefinovaném stavu – založí se znovu
+                self._release_evf()
                 time.sleep(0.3)
 
         return None
 
+    def _remember_frame(self, jpeg, frame, capture_time, digest=None):
+        """Zapamatuje si poslední JPEG (kopie – SDK stream se dalším stažením přepíše)."""
+        self._last_jpeg = jpeg.tobytes()
+        self._last_full = None if self.decoder.reduces else frame
+        self._last_capture_time = capture_time
+        self._last_frame = frame
+        self._last_digest = digest
+        self._duplicate = False
+
+    def get_full_frame(self):
+        """
+        Vrátí poslední snímek v plném rozlišení (snapshot, tiling).
+
+        Při zmenšeném dekódování se plný snímek dekóduje líně až zde.
+        """
+        if self._last_full is None and self._last_jpeg is not None:
+            self._last_full = self.decoder.decode_full(np.frombuffer(self._last_jpeg, dtype=np.uint8))
+        return self._last_full
+
+    def get_packet(self, source_id="canon"):
+        """Jako get_frame(), ale vrací FramePacket s časem zachycení a původním JPEG."""
+        frame = self.get_frame()
+        if frame is None:
+            return None
+        packet = FramePacket(
+            frame,
+            source_id=source_id,
+            capture_time=self._last_capture_time,
+            jpeg=self._last_jpeg,
+            full=self._last_full,
+            digest=self._last_digest,
+            duplicate=self._duplicate,
+        )
+        packet.stamp("decoded")
+        return packet
+
+    def _release_evf(self):
+        """Uvolní EVF stream/image handly aktuální LiveView relace."""
+        if self._evf_reader is not None:
+            self._evf_reader.close()
+            self._evf_reader = None
+
     def stop_liveview(self):
         """Zastaví LiveView a Movie režim."""
         if not self.initialized:
             return
 
+        # EVF handly patří k LiveView relaci – uvolní se před jejím ukončením
+        self._release_evf()
+
         try:
             record_state = ctypes.c_int(kEdsRecord_Stop)
             self.edsdk.EdsSetPropertyData(
@@ -195,6 +260,8 @@ class CanonCamera:
 
     def close(self):
         """Ukončí relaci a EDSDK."""
+        self._release_evf()
+
         if not self.initialized:
             return
 
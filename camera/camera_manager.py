@@ -1,16 +1,79 @@
 # Modul: camera/camera_manager.py
 # camera/camera_manager.py
+import os
+import threading
+import time
+
 import cv2
 
+from camera.jpeg_decoder import JpegDecoder
+from utils.frame_packet import FramePacket
+
+
+def is_file_source(source):
+    """Zdroj je videosoubor (ne index kamery ani síťový stream)."""
+    return isinstance(source, str) and os.path.isfile(source)
+
+
 class CameraManager:
-    """Správa připojené kamery."""
+    """
+    Správa připojené kamery.
+
+    V režimu threaded=True běží na pozadí vlákno, které průběžně volá grab()
+    (bez dekódování). Snímek se dekóduje přes retrieve() jen tehdy, když si ho
+    konzument vyžádá – zastaralé snímky se tak přeskočí levně a read() vždy
+    vrátí nejnovější snímek s časem zachycení a pořadovým číslem.
 
-    def __init__(self, source=0, width=None, height=None, fps=None):
+    speed > 0 přehrává videosoubor tempem CAP_PROP_FPS × speed (jako živou
+    kameru); 0 = čtení tak rychle, jak stíhá konzument.
+    """
+
+    def __init__(self, source=0, width=None, height=None, fps=None, decoder=None, threaded=False, speed=0.0):
         self.source = source
         self.cap = None
         self.width = width
         self.height = height
         self.fps = fps
+        # VideoCapture vrací již dekódované snímky – "reduced" i "resize" se
+        # zde projeví jako jediný resize na cílovou velikost
+        self.decoder = decoder or JpegDecoder()
+        self.threaded = threaded
+        self.speed = speed
+        self._last_full = None
+        self._frame_period = 0.0
+        self._pace_start = None
+
+        # Stav pro asynchronní režim
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._want_frame = False
+        self._latest = None          # (frame, timestamp, index)
+        self._last_read_index = 0
+        self.grabbed_frames = 0
+        self.dropped_frames = 0
+        self.grab_failures = 0
+
+    @classmethod
+    def from_config(cls, config, source=None, speed=1.0):
+        """
+        Vytvoří CameraManager ze sekce camera (zdroj lze přepsat).
+
+        Videosoubor se čte synchronně a tempem svého FPS × speed – vlákno
+        s drop-oldest bufferem by ze souboru přeskočilo většinu snímků.
+        """
+        cam_cfg = config.get("camera", {})
+        source = cam_cfg.get("source", 0) if source is None else source
+        from_file = is_file_source(source)
+        return cls(
+            source=source,
+            width=cam_cfg.get("width"),
+            height=cam_cfg.get("height"),
+            fps=cam_cfg.get("fps"),
+            decoder=JpegDecoder.from_config(config),
+            threaded=cam_cfg.get("threaded", False) and not from_file,
+            speed=speed if from_file else 0.0,
+        )
 
     def start(self):
         """Inicializace kamery."""
@@ -26,23 +89,130 @@ class CameraManager:
         if not self.cap.isOpened():
             raise RuntimeError(f"Nelze otevřít kameru: {self.source}")
 
-    def read(self):
-        """Přečte jeden snímek z kamery."""
+        file_fps = self.cap.get(cv2.CAP_PROP_FPS) if self.speed else 0.0
+        self._frame_period = 1.0 / (file_fps * self.speed) if file_fps and file_fps > 0 else 0.0
+        self._pace_start = None
+
+        if self.threaded:
+            # Vlastní vlákno drží jen nejnovější snímek – interní fronta OpenCV je zbytečná
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            self._running = True
+            self._thread = threading.Thread(target=self._grab_loop, name="CameraManagerGrab", daemon=True)
+            self._thread.start()
+
+    def _pace(self, index):
+        """U videosouboru počká na čas snímku index (číslováno od 1) podle FPS × speed."""
+        if not self._frame_period:
+            return
+        now = time.monotonic()
+        if self._pace_start is None:
+            self._pace_start = now
+        delay = self._pace_start + (index - 1) * self._frame_period - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def _grab_loop(self):
+        """Průběžné grab(); retrieve() jen pro snímek, o který si někdo řekl."""
+        index = 0
+        while self._running:
+            self._pace(index + 1)
+            ok = self.cap.grab()
+            timestamp = time.monotonic()
+            if not ok:
+                self.grab_failures += 1
+                time.sleep(0.01)
+                continue
+
+            index += 1
+            self.grabbed_frames = index
+
+            with self._cond:
+                wanted = self._want_frame
+            if not wanted:
+                continue
+
+            ok, frame = self.cap.retrieve()
+            if not ok:
+                self.grab_failures += 1
+                continue
+
+            with self._cond:
+                self._latest = (frame, timestamp, index)
+                self._want_frame = False
+                self._cond.notify_all()
+
+    def read_latest(self, timeout=1.0):
+        """
+        Vrátí (frame, timestamp, index) nejnovějšího snímku.
+
+        V asynchronním režimu čeká nejvýše timeout sekund na snímek novější než
+        ten naposledy vrácený; přeskočené snímky se započítají do dropped_frames.
+        """
         if not self.cap:
             raise RuntimeError("Kamera není spuštěná. Zavolej nejprve .start().")
-        ret, frame = self.cap.read()
-        if not ret:
-            raise RuntimeError("Nepodařilo se získat snímek z kamery.")
-        return frame
+
+        if not self.threaded:
+            self._pace(self.grabbed_frames + 1)
+            ret, frame = self.cap.read()
+            if not ret:
+                raise RuntimeError("Nepodařilo se získat snímek z kamery.")
+            self.grabbed_frames += 1
+            return frame, time.monotonic(), self.grabbed_frames
+
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._want_frame = True
+            while self._latest is None or self._latest[2] <= self._last_read_index:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._running:
+                    raise RuntimeError("Nepodařilo se získat snímek z kamery.")
+                self._cond.wait(remaining)
+
+            frame, timestamp, index = self._latest
+            self.dropped_frames += index - self._last_read_index - 1
+            self._last_read_index = index
+        return frame, timestamp, index
+
+    def read(self):
+        """Přečte jeden snímek z kamery."""
+        frame, _, _ = self.read_latest()
+        self._last_full = frame
+        return self.decoder.resize(frame)
 
     def read_frame(self):
         """Alias pro kompatibilitu s main.py."""
         return self.read()
 
+    def get_frame(self):
+        """Alias pro kompatibilitu s CanonCamera / CaptureThread (None při chybě)."""
+        try:
+            return self.read()
+        except RuntimeError:
+            return None
+
+    def get_packet(self, source_id="cam0"):
+        """Nejnovější snímek jako FramePacket s časem zachycení (None při chybě)."""
+        try:
+            frame, timestamp, _ = self.read_latest()
+        except RuntimeError:
+            return None
+        self._last_full = frame
+        packet = FramePacket(self.decoder.resize(frame), source_id=source_id, capture_time=timestamp, full=frame)
+        packet.stamp("decoded")
+        return packet
+
+    def get_full_frame(self):
+        """Poslední snímek v plném rozlišení (bez zmenšení dekodérem)."""
+        return self._last_full
+
     def stop(self):
         """Ukončí práci s kamerou."""
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
         if self.cap:
             self.cap.release()
             self.cap = None
-
-
@@ -0,0 +1,96 @@
+# camera/capture_thread.py
+import threading
+import time
+
+from utils.frame_buffer import FrameRingBuffer
+from utils.frame_packet import FramePacket
+
+
+class CaptureThread:
+    """
+    Režim průběžného snímání: samostatné vlákno neustále volá camera.get_frame()
+    a ukládá snímky do kruhového bufferu (drop-oldest).
+
+    Funguje s čímkoli, co má metodu get_packet() nebo get_frame() (CanonCamera,
+    CameraManager…). Konzumenti používají latest() nebo next(timeout) a dostávají
+    trojice (seq, capture_time, FramePacket).
+    """
+
+    def __init__(self, camera, buffer_depth=3, retry_delay=0.01, debug=False, on_frame=None,
+                 source_id="cam0", recorder=None):
+        self.camera = camera
+        self.source_id = source_id
+        self.recorder = recorder  # volitelný EvfRecorder – zaznamená i snímky, které konzument zahodí
+        self.buffer = FrameRingBuffer(buffer_depth)
+        self.retry_delay = retry_delay
+        self.debug = debug
+        self.on_frame = on_frame  # volitelné upozornění na nový snímek: on_frame(seq)
+        self.running = False
+        self.errors = 0
+        self._thread = None
+
+    def start(self):
+        """Spustí snímací vlákno (pokud již neběží)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if self.buffer.closed:
+            self.buffer = FrameRingBuffer(self.buffer.depth)
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, name="CaptureThread", daemon=True)
+        self._thread.start()
+        print(f"[CaptureThread] ✅ Snímání spuštěno (buffer={self.buffer.depth}).")
+
+    def _read_packet(self):
+        """Snímek jako FramePacket – přímo od kamery, nebo obalený get_frame()."""
+        get_packet = getattr(self.camera, "get_packet", None)
+        if get_packet is not None:
+            return get_packet(self.source_id)
+
+        frame = self.camera.get_frame()
+        if frame is None:
+            return None
+        return FramePacket(frame, source_id=self.source_id)
+
+    def _loop(self):
+        while self.running:
+            try:
+                packet = self._read_packet()
+            except Exception as e:
+                self.errors += 1
+                if self.debug:
+                    print(f"[CaptureThread DEBUG] get_frame exception: {e}")
+                packet = None
+
+            if packet is None:
+                # Krátká pauza jen při výpadku, ne jako pevné tempo snímání
+                time.sleep(self.retry_delay)
+                continue
+
+            if self.recorder is not None:
+                self.recorder.write_packet(packet)
+
+            seq = self.buffer.put(packet, packet.capture_time)
+            if self.on_frame is not None:
+                self.on_frame(seq)
+
+    def latest(self):
+        """Nejnovější snímek bez čekání (nebo None)."""
+        return self.buffer.latest()
+
+    def next(self, after_seq=None, timeout=None):
+        """Počká na snímek novější než after_seq (nebo poslední přečtený)."""
+        return self.buffer.next(after_seq=after_seq, timeout=timeout)
+
+    @property
+    def dropped(self):
+        """Počet snímků zahozených dřív, než si je někdo přečetl."""
+        return self.buffer.dropped
+
+    def stop(self, timeout=2.0):
+        """Zastaví snímací vlákno a probudí čekající konzumenty."""
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.buffer.close()
+        print(f"[CaptureThread] 🛑 Snímání zastaveno (zahozeno {self.dropped} snímků).")
@@ -0,0 +1,111 @@
+# camera/edsdk_backend.py
+import ctypes
+from abc import ABC, abstractmethod
+
+
+EDS_OK = 0x00000000
+EDS_ERR_DEVICE_BUSY = 0x00000081
+EDS_ERR_OBJECT_NOTREADY = 0x0000A102
+
+
+class EdsdkBackend(ABC):
+    """
+    Rozhraní EDSDK funkcí, které volá CanonCamera / EvfFrameReader.
+
+    Skutečná Windows DLL (ctypes.WinDLL) jej splňuje implicitně; náhradní
+    implementace (FakeEdsdk) z této třídy dědí – chybějící metoda se projeví
+    už při vytvoření instance. Výstupní parametry se předávají přes
+    ctypes.byref(), návratová hodnota je chybový kód EDSDK.
+    """
+
+    @abstractmethod
+    def EdsInitializeSDK(self):
+        """Inicializace knihovny (jednou za proces)."""
+
+    @abstractmethod
+    def EdsTerminateSDK(self):
+        """Ukončení knihovny."""
+
+    @abstractmethod
+    def EdsGetCameraList(self, out_list):
+        """Seznam připojených kamer → out_list."""
+
+    @abstractmethod
+    def EdsGetChildAtIndex(self, ref, index, out_child):
+        """index-tá položka seznamu (kamera) → out_child."""
+
+    @abstractmethod
+    def EdsRelease(self, ref):
+        """Uvolnění libovolného handlu."""
+
+    @abstractmethod
+    def EdsOpenSession(self, cam_ref):
+        """Otevření relace s kamerou."""
+
+    @abstractmethod
+    def EdsCloseSession(self, cam_ref):
+        """Uzavření relace s kamerou."""
+
+    @abstractmethod
+    def EdsSetPropertyData(self, cam_ref, prop_id, param, size, data):
+        """Zápis vlastnosti kamery (data přes ctypes.byref)."""
+
+    @abstractmethod
+    def EdsGetPropertyData(self, cam_ref, prop_id, param, size, out_data):
+        """Čtení vlastnosti kamery → out_data."""
+
+    @abstractmethod
+    def EdsCreateMemoryStream(self, size, out_stream):
+        """Paměťový stream o počáteční velikosti size → out_stream."""
+
+    @abstractmethod
+    def EdsCreateEvfImageRef(self, stream_ref, out_evf_image):
+        """EVF image ref nad streamem → out_evf_image."""
+
+    @abstractmethod
+    def EdsDownloadEvfImage(self, cam_ref, evf_image):
+        """Stažení aktuálního LiveView snímku do streamu."""
+
+    @abstractmethod
+    def EdsGetPointer(self, stream_ref, out_pointer):
+        """Adresa dat streamu → out_pointer."""
+
+    @abstractmethod
+    def EdsGetLength(self, stream_ref, out_length):
+        """Délka streamu → out_length."""
+
+    @abstractmethod
+    def EdsGetPosition(self, stream_ref, out_position):
+        """Aktuální pozice ve streamu → out_position."""
+
+    @abstractmethod
+    def EdsSeek(self, stream_ref, offset, origin):
+        """Posun pozice ve streamu (origin: 0 = aktuální, 1 = začátek, 2 = konec)."""
+
+
+def load_edsdk(sdk_path):
+    """Načte skutečnou Canon EDSDK DLL (pouze Windows)."""
+    try:
+        return ctypes.WinDLL(sdk_path)
+    except Exception as e:
+        raise RuntimeError(f"[CanonCamera] Nelze načíst EDSDK DLL: {e}")
+
+
+def create_edsdk(config=None):
+    """
+    Vytvoří EDSDK backend podle sekce camera.edsdk.
+
+    Vrací None pro backend "dll" (CanonCamera si DLL načte sama ze sdk_path),
+    nebo instanci FakeEdsdk pro backend "fake".
+    """
+    config = config or {}
+    eds_cfg = config.get("camera", {}).get("edsdk", {}) or {}
+    backend = eds_cfg.get("backend", "dll")
+
+    if backend == "dll":
+        return None
+    if backend == "fake":
+        from camera.fake_edsdk import FakeEdsdk
+        return FakeEdsdk.from_config(eds_cfg.get("fake", {}))
+
+    raise ValueError(f"[CanonCamera] Neznámý EDSDK backend: {backend}")
@@ -0,0 +1,100 @@
+# camera/evf_reader.py
+import ctypes
+import numpy as np
+
+
+EDS_OK = 0x00000000
+kEdsSeek_Begin = 1
+
+
+class EvfFrameReader:
+    """
+    Znovupoužitelné EVF handly (memory stream + EvfImageRef) pro jednu LiveView relaci.
+
+    Handly se vytvoří při prvním čtení a drží se až do close(), takže stahování
+    snímku nealokuje nové SDK objekty. Vrácená JPEG data jsou pohled přímo do
+    paměti SDK streamu – platí jen do dalšího volání read_jpeg().
+    """
+
+    def __init__(self, edsdk, cam_ref, debug=False):
+        self.edsdk = edsdk
+        self.cam_ref = cam_ref
+        self.debug = debug
+        self.stream_ref = None
+        self.evf_image = None
+
+    @property
+    def is_open(self):
+        return self.evf_image is not None
+
+    def open(self):
+        """Vytvoří memory stream a EvfImageRef (jednou za LiveView relaci)."""
+        if self.is_open:
+            return
+
+        stream_ref = ctypes.c_void_p()
+        err = self.edsdk.EdsCreateMemoryStream(0, ctypes.byref(stream_ref))
+        if err != EDS_OK:
+            raise RuntimeError(f"[EvfFrameReader] Chyba {hex(err)} při EdsCreateMemoryStream")
+
+        evf_image = ctypes.c_void_p()
+        err = self.edsdk.EdsCreateEvfImageRef(stream_ref, ctypes.byref(evf_image))
+        if err != EDS_OK:
+            self.edsdk.EdsRelease(stream_ref)
+            raise RuntimeError(f"[EvfFrameReader] Chyba {hex(err)} při EdsCreateEvfImageRef")
+
+        self.stream_ref = stream_ref
+        self.evf_image = evf_image
+        if self.debug:
+            print("[EvfFrameReader DEBUG] EVF handly vytvořeny.")
+
+    def read_jpeg(self):
+        """
+        Stáhne aktuální EVF snímek do sdíleného streamu.
+
+        Vrací (err, data): err je návratový kód EdsDownloadEvfImage, data je
+        np.uint8 pohled na JPEG v paměti SDK (bez kopie), nebo None pokud je
+        stream prázdný či stahování selhalo.
+        """
+        self.open()
+
+        # Přepis od začátku – stream se nealokuje znovu, jen se přepíše obsah
+        self.edsdk.EdsSeek(self.stream_ref, ctypes.c_int64(0), kEdsSeek_Begin)
+
+        err = self.edsdk.EdsDownloadEvfImage(self.cam_ref, self.evf_image)
+        if err != EDS_OK:
+            return err, None
+
+        pointer = ctypes.c_void_p()
+        length = ctypes.c_uint64()
+        position = ctypes.c_uint64()
+        self.edsdk.EdsGetPointer(self.stream_ref, ctypes.byref(pointer))
+        self.edsdk.EdsGetLength(self.stream_ref, ctypes.byref(length))
+
+        # Délka streamu může zůstat z většího předchozího snímku – skutečný
+        # počet zapsaných bajtů udává pozice po stažení.
+        size = length.value
+        if self.edsdk.EdsGetPosition(self.stream_ref, ctypes.byref(position)) == EDS_OK:
+            if 0 < position.value <= size:
+                size = position.value
+
+        if size == 0 or not pointer.value:
+            return err, None
+
+        data = (ctypes.c_ubyte * size).from_address(pointer.value)
+        return err, np.frombuffer(data, dtype=np.uint8)
+
+    def close(self):
+        """Uvolní EVF handly; bezpečné volat opakovaně."""
+        evf_image, stream_ref = self.evf_image, self.stream_ref
+        self.evf_image = None
+        self.stream_ref = None
+
+        for ref in (evf_image, stream_ref):
+            if ref is None:
+                continue
+            try:
+                self.edsdk.EdsRelease(ref)
+            except Exception as e:
+                if self.debug:
+                    print(f"[EvfFrameReader DEBUG] EdsRelease selhal: {e}")
@@ -0,0 +1,239 @@
+# camera/evf_recorder.py
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from camera.jpeg_decoder import JpegDecoder
+from utils.frame_packet import FramePacket
+
+
+# Index segmentu: hlavička + pevné záznamy (offset, délka, čas zachycení)
+INDEX_MAGIC = b"EVFIDX01"
+_HEADER = struct.Struct("<8sd")          # magic, čas začátku záznamu (time.time())
+_RECORD = struct.Struct("<QId")          # offset, length, capture_time (monotonic)
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("length", "<u4"), ("timestamp", "<f8")])
+
+
+def index_path(segment_path):
+    return segment_path + ".idx"
+
+
+def segment_path(base_path, segment_index):
+    """Cesta k segmentu: base (0), name_001.evf, name_002.evf, …"""
+    if segment_index == 0:
+        return base_path
+    root, ext = os.path.splitext(base_path)
+    return f"{root}_{segment_index:03d}{ext}"
+
+
+def segment_paths(base_path):
+    """Všechny existující segmenty záznamu v pořadí (včetně rotovaných)."""
+    paths = []
+    while os.path.exists(segment_path(base_path, len(paths))):
+        paths.append(segment_path(base_path, len(paths)))
+    if not paths:
+        raise FileNotFoundError(f"[EvfReplay] Záznam nenalezen: {base_path}")
+    return paths
+
+
+class EvfRecorder:
+    """
+    Záznam surových EVF JPEG snímků bez překódování.
+
+    Bajty se připojují beze změny do segmentu (*.evf), ke každému snímku se
+    do indexu (*.evf.idx) zapíše offset, délka a čas zachycení. Při překročení
+    max_segment_mb se založí další segment (name_001.evf, …). Snímky, které
+    kamera označila jako duplikát (stejný JPEG jako minule), se nezapisují.
+    """
+
+    def __init__(self, path, max_segment_mb=0, flush_every=30):
+        self.base_path = path
+        self.max_segment_bytes = int(max_segment_mb * 1024 * 1024)
+        self.flush_every = flush_every
+        self.segment_index = 0
+        self.frames_written = 0
+        self.bytes_written = 0
+        self.duplicates_skipped = 0
+        self._data = None
+        self._index = None
+        self._offset = 0
+        self._open_segment()
+
+    @classmethod
+    def from_config(cls, config):
+        """Vytvoří recorder ze sekce camera.record (nebo None, pokud je vypnutý)."""
+        rec_cfg = config.get("camera", {}).get("record", {}) or {}
+        if not rec_cfg.get("enabled", False):
+            return None
+        directory = rec_cfg.get("directory", "data/recordings")
+        os.makedirs(directory, exist_ok=True)
+        name = time.strftime("evf_%Y%m%d_%H%M%S.evf")
+        return cls(os.path.join(directory, name), max_segment_mb=rec_cfg.get("max_segment_mb", 0))
+
+    @property
+    def segment_path(self):
+        return segment_path(self.base_path, self.segment_index)
+
+    def _open_segment(self):
+        directory = os.path.dirname(self.segment_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._data = open(self.segment_path, "wb")
+        self._index = open(index_path(self.segment_path), "wb")
+        self._index.write(_HEADER.pack(INDEX_MAGIC, time.time()))
+        self._offset = 0
+        print(f"[EvfRecorder] 💾 Záznam do: {self.segment_path}")
+
+    def _close_segment(self):
+        if self._data is not None:
+            self._data.close()
+            self._index.close()
+            self._data = None
+            self._index = None
+
+    def write(self, jpeg, capture_time=None):
+        """Připojí jeden JPEG (bytes / np.uint8 buffer) do segmentu."""
+        if self._data is None:
+            raise RuntimeError("[EvfRecorder] Záznam je již uzavřen.")
+        if capture_time is None:
+            capture_time = time.monotonic()
+
+        data = memoryview(jpeg).cast("B")
+        if self.max_segment_bytes and self._offset and self._offset + len(data) > self.max_segment_bytes:
+            self._close_segment()
+            self.segment_index += 1
+            self._open_segment()
+
+        self._data.write(data)
+        self._index.write(_RECORD.pack(self._offset, len(data), capture_time))
+        self._offset += len(data)
+        self.frames_written += 1
+        self.bytes_written += len(data)
+
+        if self.flush_every and self.frames_written % self.flush_every == 0:
+            self._data.flush()
+            self._index.flush()
+
+    def write_packet(self, packet):
+        """Zaznamená FramePacket, pokud nese původní JPEG a není duplikátem."""
+        if packet.duplicate:
+            self.duplicates_skipped += 1
+            return
+        if packet.jpeg is not None:
+            self.write(packet.jpeg, packet.capture_time)
+
+    def close(self):
+        self._close_segment()
+        print(f"[EvfRecorder] ✅ Zaznamenáno {self.frames_written} snímků "
+              f"({self.bytes_written / 1e6:.1f} MB, segmentů: {self.segment_index + 1}, "
+              f"vynecháno duplikátů: {self.duplicates_skipped}).")
+
+
+def read_index(segment_path):
+    """Načte index segmentu jako strukturované pole (offset, length, timestamp)."""
+    with open(index_path(segment_path), "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"[EvfReplay] Poškozený index: {segment_path}")
+        magic, _ = _HEADER.unpack(header)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"[EvfReplay] Neznámý formát indexu: {segment_path}")
+        raw = f.read()
+
+    # Neúplný poslední záznam (přerušený zápis) se ignoruje
+    usable = len(raw) - len(raw) % INDEX_DTYPE.itemsize
+    return np.frombuffer(raw[:usable], dtype=INDEX_DTYPE)
+
+
+class EvfReplaySource:
+    """
+    Přehrávání EVF záznamu přes mmap – zdroj kompatibilní s CaptureThread.
+    Rotované segmenty (name_001.evf, …) navazují za prvním.
+
+    speed=1.0 zachová původní tempo, speed=4.0 přehrává 4× rychleji,
+    speed=0 servíruje snímky tak rychle, jak je pipeline stíhá.
+    """
+
+    def __init__(self, path, speed=1.0, loop=False, decoder=None):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.decoder = decoder or JpegDecoder()
+        self.segments = segment_paths(path)
+        indexes = [read_index(segment) for segment in self.segments]
+        self.index = np.concatenate(indexes)
+        # Číslo segmentu pro každý snímek (index do _mmaps)
+        self._segment_of = np.repeat(np.arange(len(indexes)), [len(index) for index in indexes])
+        self._files = []
+        self._mmaps = []
+        for segment in self.segments:
+            f = open(segment, "rb")
+            size = os.fstat(f.fileno()).st_size
+            self._files.append(f)
+            self._mmaps.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None)
+        self._position = 0
+        self._start = None
+        print(f"[EvfReplay] ▶️ {path}: {len(self.index)} snímků v {len(self.segments)} segmentech, "
+              f"rychlost {speed}×")
+
+    def __len__(self):
+        return len(self.index)
+
+    def read_jpeg(self, i):
+        """JPEG i-tého snímku jako np.uint8 pohled do mmap (bez kopie)."""
+        offset, length, _ = self.index[i]
+        buffer = self._mmaps[self._segment_of[i]]
+        return np.frombuffer(buffer, dtype=np.uint8, count=int(length), offset=int(offset))
+
+    def _next_index(self):
+        if self._position >= len(self.index):
+            if not self.loop or not len(self.index):
+                return None
+            self._position = 0
+            self._start = None
+
+        i = self._position
+        self._position += 1
+
+        if self.speed and self.speed > 0:
+            now = time.monotonic()
+            if self._start is None:
+                self._start = now - (self.index["timestamp"][i] - self.index["timestamp"][0]) / self.speed
+            due = self._start + (self.index["timestamp"][i] - self.index["timestamp"][0]) / self.speed
+            if due > now:
+                time.sleep(due - now)
+        return i
+
+    def get_packet(self, source_id="replay"):
+        """Další snímek jako FramePacket (None na konci záznamu)."""
+        i = self._next_index()
+        if i is None:
+            return None
+        jpeg = self.read_jpeg(i)
+        capture_time = time.monotonic()
+        frame = self.decoder.decode(jpeg)
+        if frame is None:
+            return None
+        packet = FramePacket(frame, source_id=source_id, capture_time=capture_time,
+                             jpeg=jpeg, full=None if self.decoder.reduces else frame)
+        packet.stamp("decoded")
+        return packet
+
+    def get_frame(self):
+        packet = self.get_packet()
+        return None if packet is None else packet.image
+
+    def stop(self):
+        for buffer in self._mmaps:
+            if buffer is not None:
+                try:
+                    buffer.close()
+                except BufferError:
+                    pass  # některý FramePacket ještě drží pohled do mmap – uvolní se s ním
+        self._mmaps = []
+        for f in self._files:
+            f.close()
+        self._files = []
@@ -0,0 +1,325 @@
+# camera/fake_edsdk.py
+import ctypes
+import glob
+import os
+import random
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from camera.edsdk_backend import EdsdkBackend, EDS_OK, EDS_ERR_OBJECT_NOTREADY
+
+
+EDS_ERR_INVALID_HANDLE = 0x00000061
+
+_JPEG_EXTENSIONS = (".jpg", ".jpeg")
+
+
+def _set_out(ref, value):
+    """Zapíše výstupní hodnotu do ctypes.byref() / ctypes objektu."""
+    obj = getattr(ref, "_obj", ref)
+    obj.value = value
+
+
+def _handle(ref):
+    """Převede c_void_p / int na číselný handle."""
+    value = getattr(ref, "value", ref)
+    return value or 0
+
+
+def load_jpeg_frames(source, max_frames=300):
+    """
+    Načte JPEG snímky (bytes) z adresáře, jednoho JPEG, EVF záznamu (*.evf)
+    nebo videa (snímky se jednou překódují do JPEG).
+    """
+    if os.path.isdir(source):
+        paths = sorted(
+            p for p in glob.glob(os.path.join(source, "*"))
+            if p.lower().endswith(_JPEG_EXTENSIONS)
+        )
+        frames = []
+        for path in paths[:max_frames]:
+            with open(path, "rb") as f:
+                frames.append(f.read())
+        return frames
+
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"[FakeEdsdk] Zdroj snímků nenalezen: {source}")
+
+    if source.lower().endswith(_JPEG_EXTENSIONS):
+        with open(source, "rb") as f:
+            return [f.read()]
+
+    if source.lower().endswith(".evf"):
+        from camera.evf_recorder import read_index, segment_paths
+
+        frames = []
+        for segment in segment_paths(source):
+            index = read_index(segment)[:max_frames - len(frames)]
+            # Jen potřebné záznamy – segment může mít stovky MB
+            with open(segment, "rb") as f:
+                for rec in index:
+                    f.seek(int(rec["offset"]))
+                    frames.append(f.read(int(rec["length"])))
+            if len(frames) >= max_frames:
+                break
+        return frames
+
+    # Video soubor – snímky se jednou překódují do JPEG
+    cap = cv2.VideoCapture(source)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        ok, buf = cv2.imencode(".jpg", frame)
+        if ok:
+            frames.append(buf.tobytes())
+    cap.release()
+    return frames
+
+
+class _FakeStream:
+    """Rostoucí paměťový stream s pevnou adresou do dalšího zvětšení."""
+
+    def __init__(self, capacity=0):
+        self.buffer = ctypes.create_string_buffer(max(capacity, 1))
+        self.length = 0
+        self.position = 0
+
+    def write(self, data):
+        end = self.position + len(data)
+        if end > len(self.buffer):
+            grown = ctypes.create_string_buffer(max(end, 2 * len(self.buffer)))
+            ctypes.memmove(grown, self.buffer, self.length)
+            self.buffer = grown
+        ctypes.memmove(ctypes.addressof(self.buffer) + self.position, data, len(data))
+        self.position = end
+        self.length = max(self.length, end)
+
+
+class FakeEdsdk(EdsdkBackend):
+    """
+    Softwarová náhrada Canon EDSDK pro Linux / benchmarky bez kamery.
+
+    Servíruje JPEG snímky z adresáře, jednoho JPEG, EVF záznamu (*.evf),
+    videa nebo syntetické sekvence. Nový snímek je k dispozici podle fps
+    (fps=0 → každé stažení vrací další snímek), stažení trvá latency ± jitter
+    a s pravděpodobností busy_rate vrací chybu 0xA102 (EDS_ERR_OBJECT_NOTREADY),
+    s empty_rate prázdný stream.
+    """
+
+    def __init__(self, source=None, fps=30.0, latency=0.0, jitter=0.0,
+                 busy_rate=0.0, empty_rate=0.0, loop=True, seed=None,
+                 size=(960, 640), max_frames=300):
+        self.fps = float(fps or 0.0)
+        self.latency = latency
+        self.jitter = jitter
+        self.busy_rate = busy_rate
+        self.empty_rate = empty_rate
+        self.loop = loop
+        self.frames = self._load_frames(source, size, max_frames)
+        if not self.frames:
+            raise ValueError(f"[FakeEdsdk] Zdroj neobsahuje žádné snímky: {source}")
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._refs = {}
+        self._next_ref = 1
+        self._props = {}
+        self._t0 = None
+        self._served = 0
+        self.initialized = False
+        self.session_open = False
+        self.stats = {"downloads": 0, "busy": 0, "empty": 0, "frames": 0}
+
+    @classmethod
+    def from_config(cls, fake_cfg):
+        """Sestaví backend ze sekce camera.edsdk.fake."""
+        fake_cfg = fake_cfg or {}
+        size = fake_cfg.get("size", (960, 640))
+        return cls(
+            source=fake_cfg.get("source") or None,
+            fps=fake_cfg.get("fps", 30.0),
+            latency=fake_cfg.get("latency", 0.0),
+            jitter=fake_cfg.get("jitter", 0.0),
+            busy_rate=fake_cfg.get("busy_rate", 0.0),
+            empty_rate=fake_cfg.get("empty_rate", 0.0),
+            loop=fake_cfg.get("loop", True),
+            seed=fake_cfg.get("seed"),
+            size=tuple(size),
+        )
+
+    # ------------------------------------------------------------------
+    # Zdroje snímků
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _load_frames(source, size, max_frames):
+        if source is None:
+            return FakeEdsdk._synthetic_frames(size, min(max_frames, 60))
+        return load_jpeg_frames(source, max_frames)
+
+    @staticmethod
+    def _synthetic_frames(size, count):
+        """Obloha s přelétajícím tmavým objektem."""
+        width, height = size
+        sky = np.linspace(200, 150, height, dtype=np.float32)[:, None]
+        base = np.repeat(sky, width, axis=1).astype(np.uint8)
+        base = cv2.merge([np.full_like(base, 235), base, base // 2 + 60])
+
+        frames = []
+        for i in range(count):
+            frame = base.copy()
+            x = int((i + 0.5) / count * width)
+            y = height // 3 + int(height / 10 * np.sin(i / 5.0))
+            cv2.circle(frame, (x, y), max(2, width // 160), (40, 40, 40), -1)
+            ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+            frames.append(buf.tobytes())
+        return frames
+
+    # ------------------------------------------------------------------
+    # Správa handlů
+    # ------------------------------------------------------------------
+    def _new_ref(self, obj, out_ref):
+        with self._lock:
+            ref = self._next_ref
+            self._next_ref += 1
+            self._refs[ref] = obj
+        _set_out(out_ref, ref)
+        return EDS_OK
+
+    def _get(self, ref, kind=None):
+        obj = self._refs.get(_handle(ref))
+        if obj is None or (kind is not None and not isinstance(obj, kind)):
+            return None
+        return obj
+
+    def outstanding_refs(self):
+        """Počet neuvolněných handlů (stream, EVF image, …) – pro kontrolu úniků."""
+        with self._lock:
+            return sum(1 for obj in self._refs.values() if not isinstance(obj, str))
+
+    # ------------------------------------------------------------------
+    # EDSDK API
+    # ------------------------------------------------------------------
+    def EdsInitializeSDK(self):
+        self.initialized = True
+        return EDS_OK
+
+    def EdsTerminateSDK(self):
+        self.initialized = False
+        return EDS_OK
+
+    def EdsGetCameraList(self, out_list):
+        return self._new_ref("camera_list", out_list)
+
+    def EdsGetChildAtIndex(self, ref, index, out_child):
+        if index != 0:
+            return EDS_ERR_INVALID_HANDLE
+        return self._new_ref("camera", out_child)
+
+    def EdsRelease(self, ref):
+        with self._lock:
+            if self._refs.pop(_handle(ref), None) is None:
+                return EDS_ERR_INVALID_HANDLE
+        return EDS_OK
+
+    def EdsOpenSession(self, cam_ref):
+        self.session_open = True
+        return EDS_OK
+
+    def EdsCloseSession(self, cam_ref):
+        self.session_open = False
+        return EDS_OK
+
+    def EdsSetPropertyData(self, cam_ref, prop_id, param, size, data):
+        self._props[prop_id] = getattr(data, "_obj", data).value
+        return EDS_OK
+
+    def EdsGetPropertyData(self, cam_ref, prop_id, param, size, out_data):
+        _set_out(out_data, self._props.get(prop_id, 0))
+        return EDS_OK
+
+    def EdsCreateMemoryStream(self, size, out_stream):
+        return self._new_ref(_FakeStream(_handle(size)), out_stream)
+
+    def EdsCreateEvfImageRef(self, stream_ref, out_evf_image):
+        stream = self._get(stream_ref, _FakeStream)
+        if stream is None:
+            return EDS_ERR_INVALID_HANDLE
+        return self._new_ref([stream], out_evf_image)
+
+    def EdsDownloadEvfImage(self, cam_ref, evf_image):
+        evf = self._get(evf_image, list)
+        if evf is None or not self.session_open:
+            return EDS_ERR_INVALID_HANDLE
+
+        self.stats["downloads"] += 1
+        delay = self.latency + (self._rng.gauss(0.0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.busy_rate and self._rng.random() < self.busy_rate:
+            self.stats["busy"] += 1
+            return EDS_ERR_OBJECT_NOTREADY
+        if self.empty_rate and self._rng.random() < self.empty_rate:
+            self.stats["empty"] += 1
+            return EDS_OK
+
+        index = self._frame_index()
+        if index is None:
+            return EDS_ERR_OBJECT_NOTREADY
+
+        evf[0].write(self.frames[index])
+        self.stats["frames"] += 1
+        return EDS_OK
+
+    def _frame_index(self):
+        """Index snímku, který by kamera právě měla k dispozici."""
+        if self.fps > 0:
+            now = time.monotonic()
+            if self._t0 is None:
+                self._t0 = now
+            index = int((now - self._t0) * self.fps)
+        else:
+            index = self._served
+            self._served += 1
+
+        if index >= len(self.frames):
+            if not self.loop:
+                return None
+            index %= len(self.frames)
+        return index
+
+    def EdsGetPointer(self, stream_ref, out_pointer):
+        stream = self._get(stream_ref, _FakeStream)
+        if stream is None:
+            return EDS_ERR_INVALID_HANDLE
+        _set_out(out_pointer, ctypes.addressof(stream.buffer))
+        return EDS_OK
+
+    def EdsGetLength(self, stream_ref, out_length):
+        stream = self._get(stream_ref, _FakeStream)
+        if stream is None:
+            return EDS_ERR_INVALID_HANDLE
+        _set_out(out_length, stream.length)
+        return EDS_OK
+
+    def EdsGetPosition(self, stream_ref, out_position):
+        stream = self._get(stream_ref, _FakeStream)
+        if stream is None:
+            return EDS_ERR_INVALID_HANDLE
+        _set_out(out_position, stream.position)
+        return EDS_OK
+
+    def EdsSeek(self, stream_ref, offset, origin):
+        stream = self._get(stream_ref, _FakeStream)
+        if stream is None:
+            return EDS_ERR_INVALID_HANDLE
+        offset = _handle(offset)
+        # kEdsSeek_Cur = 0, kEdsSeek_Begin = 1, kEdsSeek_End = 2
+        base = {0: stream.position, 1: 0, 2: stream.length}.get(origin, 0)
+        stream.position = max(0, base + offset)
+        return EDS_OK
@@ -0,0 +1,118 @@
+# camera/jpeg_decoder.py
+import cv2
+
+
+DECODE_MODES = ("full", "reduced", "resize")
+
+# Redukované dekódování přímo v DCT doméně (libjpeg škáluje při dekódování)
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+class JpegDecoder:
+    """
+    Dekodér EVF/MJPEG snímků s volitelným zmenšením na cílovou velikost.
+
+    Režimy:
+      - "full":    plné rozlišení (cv2.IMREAD_COLOR)
+      - "reduced": IMREAD_REDUCED_COLOR_2/4/8 – největší faktor, při kterém delší
+                   strana neklesne pod target_size
+      - "resize":  plné dekódování + jediný resize delší strany na target_size
+    """
+
+    def __init__(self, mode="full", target_size=None):
+        if mode not in DECODE_MODES:
+            raise ValueError(f"[JpegDecoder] Neznámý režim dekódování: {mode}")
+        self.mode = mode
+        self.target_size = int(target_size) if target_size else None
+        self._source_size = None  # (w, h) posledního plného snímku
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Sestaví dekodér ze sekce camera.decode:
+          mode: full | reduced | resize
+          target: detector | display | počet pixelů delší strany
+        """
+        config = config or {}
+        dec_cfg = config.get("camera", {}).get("decode", {}) or {}
+        mode = dec_cfg.get("mode", "full")
+        target = dec_cfg.get("target", "detector")
+
+        if target == "detector":
+            target_size = config.get("detection", {}).get("input_size")
+        elif target == "display":
+            target_size = dec_cfg.get("display_size")
+        else:
+            target_size = target
+
+        return cls(mode=mode, target_size=target_size)
+
+    @property
+    def reduces(self):
+        """True, pokud dekodér může vracet menší než plný snímek."""
+        return self.mode != "full" and self.target_size is not None
+
+    def decode(self, data):
+        """
+        Dekóduje JPEG (np.uint8 buffer) podle zvoleného režimu.
+
+        Výsledek je vždy nové pole: Python binding cv2.imdecode nemá výstupní
+        buffer (dst) a kopie do trvalého bufferu by přidala memcpy navíc.
+        Snímky navíc žijí v kruhovém bufferu CaptureThread déle než jeden
+        cyklus, takže jeden sdílený výstupní buffer by je přepisoval.
+        """
+        if not self.reduces:
+            return self.decode_full(data)
+
+        if self.mode == "reduced":
+            factor, flag = self._reduced_flag()
+            frame = cv2.imdecode(data, flag)
+            if frame is not None:
+                h, w = frame.shape[:2]
+                self._source_size = (w * factor, h * factor)
+            return frame
+
+        frame = self.decode_full(data)
+        if frame is None:
+            return None
+        return self._resize(frame)
+
+    def decode_full(self, data):
+        """Dekóduje snímek v plném rozlišení."""
+        frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        if frame is not None:
+            h, w = frame.shape[:2]
+            self._source_size = (w, h)
+        return frame
+
+    def resize(self, frame):
+        """Zmenší již dekódovaný snímek na cílovou velikost (pro zdroje bez JPEG)."""
+        if frame is None or not self.reduces:
+            return frame
+        h, w = frame.shape[:2]
+        self._source_size = (w, h)
+        return self._resize(frame)
+
+    def _resize(self, frame):
+        h, w = frame.shape[:2]
+        scale = self.target_size / float(max(w, h))
+        if scale >= 1.0:
+            return frame
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def _reduced_flag(self):
+        """Vybere největší DCT redukci, která zachová delší stranu >= target_size."""
+        if self._source_size is None:
+            # Rozměry zdroje zatím neznáme – první snímek se dekóduje celý
+            return 1, cv2.IMREAD_COLOR
+
+        long_side = max(self._source_size)
+        for factor, flag in _REDUCED_FLAGS:
+            if long_side // factor >= self.target_size:
+                return factor, flag
+        return 1, cv2.IMREAD_COLOR
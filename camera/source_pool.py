@@ -0,0 +1,169 @@
+# camera/source_pool.py
+import threading
+import time
+
+from camera.capture_thread import CaptureThread
+
+
+def open_source(src_cfg, config=None):
+    """
+    Otevře a spustí jeden zdroj podle položky ze sekce sources:
+      type: canon  → CanonCamera (EDSDK / FakeEdsdk podle camera.edsdk), index = pořadí těla v EDSDK
+      type: uvc | rtsp | video → CameraManager (cv2.VideoCapture; video tempem FPS × speed)
+      type: replay → EvfReplaySource (záznam z EvfRecorder)
+    """
+    config = config or {}
+    src_type = src_cfg.get("type", "uvc")
+
+    if src_type == "canon":
+        from camera.camera_canon import CanonCamera
+        from camera.edsdk_backend import create_edsdk
+        from camera.jpeg_decoder import JpegDecoder
+
+        cam = CanonCamera(
+            sdk_path=src_cfg.get("sdk_path", ""),
+            debug=src_cfg.get("debug", False),
+            decoder=JpegDecoder.from_config(config),
+            edsdk=create_edsdk(config),
+            dedupe=config.get("camera", {}).get("dedupe", True),
+            camera_index=int(src_cfg.get("index", 0)),
+        )
+        cam.initialize()
+        cam.start_liveview()
+        return cam
+
+    if src_type in ("uvc", "rtsp", "video"):
+        from camera.camera_manager import CameraManager
+
+        cam = CameraManager.from_config(config, source=src_cfg.get("source", 0), speed=src_cfg.get("speed", 1.0))
+        cam.start()
+        return cam
+
+    if src_type == "replay":
+        from camera.evf_recorder import EvfReplaySource
+        from camera.jpeg_decoder import JpegDecoder
+
+        return EvfReplaySource(
+            src_cfg["path"],
+            speed=src_cfg.get("speed", 1.0),
+            loop=src_cfg.get("loop", False),
+            decoder=JpegDecoder.from_config(config),
+        )
+
+    raise ValueError(f"[SourcePool] Neznámý typ zdroje: {src_type}")
+
+
+class SourcePool:
+    """
+    Souběžné snímání z více zdrojů (Canon EVF, UVC, RTSP…).
+
+    Každý zdroj má vlastní CaptureThread; collect() vrací nejnovější dosud
+    nezpracovaný snímek z každého zdroje jako (source_id, seq, timestamp, FramePacket).
+    Místo collect() lze nastavit on_packet(source_id, seq, timestamp, FramePacket),
+    který se volá ze snímacího vlákna hned po zachycení (např. MultiSourceDetector.submit).
+    """
+
+    def __init__(self, buffer_depth=2, on_packet=None):
+        self.buffer_depth = buffer_depth
+        self.on_packet = on_packet
+        self.sources = {}
+        self.captures = {}
+        self._last_seq = {}
+        self._new_frame = threading.Event()
+
+    @classmethod
+    def from_config(cls, config):
+        """Otevře všechny zdroje ze sekce sources."""
+        pool = cls(buffer_depth=config.get("camera", {}).get("buffer_depth", 2))
+        canon_bodies = {}
+        for index, src_cfg in enumerate(config.get("sources", [])):
+            source_id = str(src_cfg.get("id", f"source{index}"))
+            try:
+                if src_cfg.get("type", "uvc") == "canon":
+                    body = int(src_cfg.get("index", 0))
+                    if body in canon_bodies:
+                        raise ValueError(f"Canon index {body} už používá zdroj '{canon_bodies[body]}' "
+                                         f"– u více kamer nastav každé jiný 'index'.")
+                    canon_bodies[body] = source_id
+                pool.add_source(source_id, open_source(src_cfg, config))
+            except Exception as e:
+                print(f"[SourcePool] ⚠️ Zdroj '{source_id}' se nepodařilo otevřít: {e}")
+        return pool
+
+    def add_source(self, source_id, camera):
+        """Přidá již spuštěný zdroj (cokoli s metodou get_frame())."""
+        if source_id in self.sources:
+            raise ValueError(f"[SourcePool] Duplicitní id zdroje: {source_id}")
+        self.sources[source_id] = camera
+        self.captures[source_id] = CaptureThread(
+            camera,
+            buffer_depth=self.buffer_depth,
+            on_frame=lambda seq: self._on_frame(source_id),
+            source_id=source_id,
+        )
+        self._last_seq[source_id] = 0
+        print(f"[SourcePool] ✅ Zdroj přidán: {source_id} ({type(camera).__name__})")
+
+    def _on_frame(self, source_id):
+        self._new_frame.set()
+        if self.on_packet is None:
+            return
+        item = self.captures[source_id].latest()
+        if item is None or item[0] <= self._last_seq[source_id]:
+            return
+        seq, timestamp, frame = item
+        self._last_seq[source_id] = seq
+        try:
+            self.on_packet(source_id, seq, timestamp, frame)
+        except Exception as e:
+            print(f"[SourcePool] ⚠️ on_packet selhal pro zdroj '{source_id}': {e}")
+
+    def start(self):
+        for capture in self.captures.values():
+            capture.start()
+
+    def collect(self, timeout=1.0):
+        """
+        Vrátí seznam nových snímků (nejvýše jeden – nejnovější – na zdroj).
+        Čeká nejvýše timeout sekund, než se objeví alespoň jeden.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            self._new_frame.clear()
+            frames = []
+            for source_id, capture in self.captures.items():
+                item = capture.latest()
+                if item is None or item[0] <= self._last_seq[source_id]:
+                    continue
+                seq, timestamp, frame = item
+                self._last_seq[source_id] = seq
+                frames.append((source_id, seq, timestamp, frame))
+
+            if frames:
+                return frames
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            self._new_frame.wait(remaining)
+
+    def dropped(self):
+        """Počet zahozených snímků po zdrojích."""
+        return {source_id: capture.dropped for source_id, capture in self.captures.items()}
+
+    def duplicates(self):
+        """Počet duplicitních (nedekódovaných) snímků po zdrojích, které je počítají."""
+        return {source_id: camera.duplicates for source_id, camera in self.sources.items()
+                if hasattr(camera, "duplicates")}
+
+    def stop(self):
+        """Zastaví snímání i samotné zdroje."""
+        for source_id, capture in self.captures.items():
+            capture.stop()
+            try:
+                self.sources[source_id].stop()
+            except Exception as e:
+                print(f"[SourcePool] ⚠️ Chyba při ukončování zdroje '{source_id}': {e}")
+
+    def __len__(self):
+        return len(self.sources)
@@ -0,0 +1,132 @@
+# detection/adaptive_resolution.py
+import time
+
+
+class ResolutionController:
+    """
+    Volba vstupního rozlišení modelu podle naměřené latence detekce.
+
+    Latence se vyhlazuje (EMA). Přes rozpočet → o úroveň níž; o úroveň výš
+    jen tehdy, když odhad latence na větším rozlišení (∝ plocha vstupu) zůstane
+    pod up_margin × rozpočet. Po každé změně se čeká min_samples snímků –
+    pásmo mezi oběma prahy a prodleva brání oscilaci.
+    """
+
+    def __init__(self, levels=(960, 640, 480, 320), target_fps=10.0, latency_budget_ms=None,
+                 initial=None, up_margin=0.8, min_samples=15, smoothing=0.2):
+        self.levels = sorted({int(level) for level in levels}, reverse=True)
+        if not self.levels:
+            raise ValueError("[ResolutionController] Prázdný seznam úrovní rozlišení.")
+        if latency_budget_ms:
+            self.budget = latency_budget_ms / 1000.0
+        elif target_fps:
+            self.budget = 1.0 / target_fps
+        else:
+            raise ValueError("[ResolutionController] Chybí target_fps i latency_budget_ms.")
+        self.up_margin = up_margin
+        self.min_samples = min_samples
+        self.smoothing = smoothing
+
+        initial = initial or self.levels[0]
+        self.level = min(range(len(self.levels)), key=lambda i: abs(self.levels[i] - initial))
+        self.latency = None
+        self.changes = 0
+        self._samples = 0
+        self._listeners = []
+
+    @classmethod
+    def from_config(cls, config):
+        """Parametry ze sekce detection.adaptive_resolution."""
+        det_cfg = config.get("detection", {})
+        adaptive_cfg = det_cfg.get("adaptive_resolution", {}) or {}
+        return cls(
+            levels=adaptive_cfg.get("levels", (960, 640, 480, 320)),
+            target_fps=adaptive_cfg.get("target_fps", 10.0),
+            latency_budget_ms=adaptive_cfg.get("latency_budget_ms") or None,
+            initial=det_cfg.get("input_size", 640),
+            up_margin=adaptive_cfg.get("up_margin", 0.8),
+            min_samples=adaptive_cfg.get("min_samples", 15),
+            smoothing=adaptive_cfg.get("smoothing", 0.2),
+        )
+
+    @property
+    def imgsz(self):
+        return self.levels[self.level]
+
+    def add_listener(self, callback):
+        """callback(imgsz) po každé změně rozlišení."""
+        self._listeners.append(callback)
+
+    def update(self, latency):
+        """Započte latenci jednoho snímku [s]; vrací rozlišení pro další snímek."""
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.smoothing * (latency - self.latency)
+        self._samples += 1
+        if self._samples < self.min_samples:
+            return self.imgsz
+
+        if self.latency > self.budget and self.level < len(self.levels) - 1:
+            self._step(+1)
+        elif self.level > 0:
+            scale = (self.levels[self.level - 1] / self.imgsz) ** 2
+            if self.latency * scale < self.up_margin * self.budget:
+                self._step(-1)
+        return self.imgsz
+
+    def _step(self, delta):
+        previous = self.imgsz
+        self.level += delta
+        self.changes += 1
+        self._samples = 0
+        self.latency = None
+        print(f"[ResolutionController] {'⬇️' if delta > 0 else '⬆️'} Vstup {previous} → {self.imgsz} px "
+              f"(rozpočet {self.budget * 1000.0:.0f} ms)")
+        for callback in self._listeners:
+            callback(self.imgsz)
+
+    def stats(self):
+        return {
+            "imgsz": self.imgsz,
+            "latency_ms": round((self.latency or 0.0) * 1000.0, 1),
+            "budget_ms": round(self.budget * 1000.0, 1),
+            "changes": self.changes,
+        }
+
+
+class AdaptiveResolutionDetector:
+    """
+    Detektor, kterému ResolutionController volí input_size snímek po snímku.
+
+    Měří se doba detect() celého snímku; výřezy (predict_regions) a další
+    atributy jdou beze změny na obalený detektor.
+    """
+
+    def __init__(self, detector, controller):
+        self.detector = detector
+        self.controller = controller
+
+    @classmethod
+    def from_config(cls, detector, config):
+        return cls(detector, ResolutionController.from_config(config))
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.detector, attr)
+
+    @property
+    def imgsz(self):
+        return self.controller.imgsz
+
+    def detect(self, frame):
+        start = time.perf_counter()
+        detections = self.detector.predict(frame, imgsz=self.controller.imgsz)
+        self.controller.update(time.perf_counter() - start)
+        return detections
+
+    predict = detect
+
+    def stats(self):
+        return self.controller.stats()
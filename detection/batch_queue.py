@@ -0,0 +1,113 @@
+# detection/batch_queue.py
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+class BatchQueue:
+    """
+    Sbírá snímky z více vláken / kamer do dávek pro detector.predict_batch().
+
+    Dávka se odešle, jakmile má max_batch_size snímků, nebo když nejstarší
+    čekající snímek čeká déle než max_wait sekund. submit() vrací Future
+    se seznamem detekcí daného snímku.
+    """
+
+    def __init__(self, detector, max_batch_size=8, max_wait=0.02):
+        if max_batch_size < 1:
+            raise ValueError(f"[BatchQueue] max_batch_size musí být ≥ 1: {max_batch_size}")
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.frames = 0
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, detector, config):
+        """Parametry ze sekce detection.batch (max_batch_size, max_wait_ms)."""
+        batch_cfg = config.get("detection", {}).get("batch", {}) or {}
+        return cls(
+            detector,
+            max_batch_size=batch_cfg.get("max_batch_size", 8),
+            max_wait=batch_cfg.get("max_wait_ms", 20) / 1000.0,
+        )
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="BatchQueue", daemon=True)
+        self._thread.start()
+
+    def submit(self, frame):
+        """Zařadí snímek (obraz nebo FramePacket) a vrátí Future s jeho detekcemi."""
+        future = Future()
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("[BatchQueue] Fronta neběží – zavolej start().")
+            self._pending.append((time.monotonic(), frame, future))
+            self._cond.notify()
+        return future
+
+    def _next_batch(self):
+        """Počká na plnou dávku nebo vypršení max_wait nejstaršího snímku."""
+        with self._cond:
+            while self._running:
+                if len(self._pending) >= self.max_batch_size:
+                    break
+                if self._pending:
+                    remaining = self._pending[0][0] + self.max_wait - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                else:
+                    self._cond.wait()
+            count = min(len(self._pending), self.max_batch_size)
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _loop(self):
+        while self._running or self._pending:
+            batch = self._next_batch()
+            if not batch:
+                continue
+            frames = [frame for _, frame, _ in batch]
+            try:
+                results = self.detector.predict_batch(frames)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.frames += len(batch)
+            for (_, _, future), detections in zip(batch, results):
+                future.set_result(detections)
+
+    @property
+    def mean_batch_size(self):
+        return self.frames / self.batches if self.batches else 0.0
+
+    def stop(self):
+        """Zpracuje zbývající snímky a ukončí vlákno."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+
+def iter_batches(frames, max_batch_size=8):
+    """Rozdělí libovolný iterátor snímků (např. offline video) na seznamy o max_batch_size."""
+    batch = []
+    for frame in frames:
+        batch.append(frame)
+        if len(batch) >= max_batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
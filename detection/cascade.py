@@ -0,0 +1,140 @@
+# detection/cascade.py
+import numpy as np
+
+from detection.detections import Detections
+from detection.model_loader import ModelLoader
+from detection.model_registry import model_config
+from detection.roi_scheduler import square_region
+from utils.frame_packet import FramePacket, as_image
+
+
+# Klíče sekce cascade.<stupeň>, které přepíší detection.models.<model>
+_STAGE_OVERRIDES = ("conf_threshold", "iou_threshold", "input_size", "max_det", "allowed_classes")
+
+
+def stage_config(config, stage_cfg, default_model):
+    """
+    Konfigurace jednoho stupně kaskády: active_model = stage_cfg.model a prahy
+    ze stage_cfg s předností před detection.models.<model>.
+    """
+    name = stage_cfg.get("model", default_model)
+    cfg = model_config(config, name)
+    det_cfg = cfg["detection"]
+    model_cfg = dict(det_cfg.get("models", {}).get(name, {}) or {})
+    model_cfg.update({key: stage_cfg[key] for key in _STAGE_OVERRIDES if key in stage_cfg})
+    det_cfg["models"] = dict(det_cfg.get("models", {}), **{name: model_cfg})
+    det_cfg["tiling"] = {"enabled": False}
+    return cfg
+
+
+class CascadeDetector:
+    """
+    Dvoustupňová detekce: levný proposer (malé rozlišení / základní model,
+    nízký práh) navrhne kandidáty na celém snímku a specializovaný verifier
+    (např. M150) ověří jen čtvercové výřezy kolem nich – jednou dávkou.
+
+    Výsledkem jsou detekce verifieru v souřadnicích celého snímku; bez
+    kandidátů verifier vůbec neběží.
+    """
+
+    def __init__(self, proposer, verifier, max_candidates=16, context=2.5, min_crop=96, crop_imgsz=320):
+        self.proposer = proposer
+        self.verifier = verifier
+        self.max_candidates = max_candidates
+        self.context = context
+        self.min_crop = min_crop
+        self.crop_imgsz = crop_imgsz
+        self.frames = 0
+        self.proposals = 0
+        self.crops = 0
+        self.verified = 0
+
+    @classmethod
+    def from_config(cls, config, loaded=None):
+        """
+        Sestaví oba stupně ze sekce detection.cascade. loaded = {jméno: model}
+        s již načtenými modely (např. aktivní model) – znovu se nenačítají.
+        """
+        from detection.detector_yolo import YoloAirborneDetector
+
+        cascade_cfg = config.get("detection", {}).get("cascade", {}) or {}
+        proposer_cfg = cascade_cfg.get("proposer", {}) or {}
+        verifier_cfg = cascade_cfg.get("verifier", {}) or {}
+        models = dict(loaded or {})
+
+        max_candidates = proposer_cfg.get("max_candidates", 16)
+
+        def build(stage_cfg, default_model, min_batch=1):
+            cfg = stage_config(config, stage_cfg, default_model)
+            batch_cfg = dict(cfg["detection"].get("batch", {}) or {})
+            batch_cfg["max_batch_size"] = max(batch_cfg.get("max_batch_size", 8), min_batch)
+            cfg["detection"]["batch"] = batch_cfg
+            name = cfg["detection"]["active_model"]
+            if name not in models:
+                models[name] = ModelLoader.load(ModelLoader.resolve_model_path(cfg["detection"]), cfg)
+            return YoloAirborneDetector(models[name], config=cfg)
+
+        return cls(
+            build(proposer_cfg, "default"),
+            # Všechny výřezy jednoho snímku v jediném průchodu verifierem
+            build(verifier_cfg, "m150", min_batch=max_candidates),
+            max_candidates=max_candidates,
+            context=verifier_cfg.get("context", 2.5),
+            min_crop=verifier_cfg.get("min_crop", 96),
+            crop_imgsz=verifier_cfg.get("input_size", 320),
+        )
+
+    def __getattr__(self, attr):
+        # predict_regions (výřezy kolem tracků), allowed_classes, model, … → verifier
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.verifier, attr)
+
+    def regions(self, proposals, shape):
+        """
+        Čtvercové výřezy kolem nejjistějších návrhů; návrh, který už leží
+        celý ve vybraném výřezu, další výřez nepřidá.
+        """
+        order = np.argsort(-proposals.conf, kind="stable")[:self.max_candidates]
+        regions = []
+        for x0, y0, x1, y1 in proposals.xyxy[order]:
+            if any(rx0 <= x0 and ry0 <= y0 and x1 <= rx1 and y1 <= ry1 for rx0, ry0, rx1, ry1 in regions):
+                continue
+            side = max(self.min_crop, self.context * max(x1 - x0, y1 - y0))
+            regions.append(square_region((x0 + x1) / 2.0, (y0 + y1) / 2.0, side, shape))
+        return regions
+
+    def _verify(self, frame, proposals):
+        self.frames += 1
+        self.proposals += len(proposals)
+        if not len(proposals):
+            detections = Detections(names=self.verifier.model.names)
+            if isinstance(frame, FramePacket):
+                frame.detections = detections
+                frame.stamp("detected")
+            return detections
+
+        regions = self.regions(proposals, as_image(frame).shape)
+        self.crops += len(regions)
+        detections = self.verifier.predict_regions(frame, regions, self.crop_imgsz)
+        self.verified += len(detections)
+        return detections
+
+    def predict(self, frame, imgsz=None):
+        """imgsz mění rozlišení proposeru (AdaptiveResolutionDetector), výřezy mají crop_imgsz."""
+        return self._verify(frame, self.proposer.predict(as_image(frame), imgsz))
+
+    detect = predict
+
+    def predict_batch(self, images):
+        """Návrhy pro všechny snímky jednou dávkou, ověření výřezů po snímcích."""
+        proposals = self.proposer.predict_batch([as_image(frame) for frame in images])
+        return [self._verify(frame, frame_proposals) for frame, frame_proposals in zip(images, proposals)]
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "proposals": self.proposals,
+            "crops": self.crops,
+            "verified": self.verified,
+        }
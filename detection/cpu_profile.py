@@ -0,0 +1,165 @@
+# detection/cpu_profile.py
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+
+from utils.performance_timer import latency_stats
+
+
+PROFILE_VERSION = 1
+
+
+def machine_id():
+    """Identifikace stroje, pro který profil platí (jméno, CPU, počet jader)."""
+    return {
+        "host": platform.node(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count() or 1,
+    }
+
+
+def default_profile_path(directory="configs"):
+    """configs/cpu_profile.<host>.json – každý produkční stroj má vlastní profil."""
+    return os.path.join(directory, f"cpu_profile.{platform.node() or 'local'}.json")
+
+
+def thread_candidates(cpu_count=None):
+    """1, 2, 4, … až po počet jader (včetně něj)."""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    candidates = []
+    n = 1
+    while n < cpu_count:
+        candidates.append(n)
+        n *= 2
+    candidates.append(cpu_count)
+    return candidates
+
+
+def set_torch_threads(intra_op_threads, inter_op_threads=None):
+    """
+    Nastaví počty vláken torch, pokud je torch načtený (import se nevynucuje).
+    Inter-op lze v torch nastavit jen jednou před první paralelní prací – volat
+    proto před načtením modelu; pozdější hodnota inter-op se tiše ignoruje.
+    """
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return False
+    if intra_op_threads:
+        torch.set_num_threads(int(intra_op_threads))
+    if inter_op_threads:
+        try:
+            torch.set_num_interop_threads(int(inter_op_threads))
+        except RuntimeError:
+            pass  # už nastaveno nebo běží paralelní práce – ponechá se původní hodnota
+    return True
+
+
+def measure(run, warmup=2, runs=20):
+    """Latence run() v sekundách po warmup nezapočítaných voláních."""
+    for _ in range(warmup):
+        run()
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def sweep(detector_factory, frames, threads, batch_sizes, sizes, warmup=2, runs=20, on_result=None):
+    """
+    Projde všechny kombinace (vlákna, dávka, vstupní rozlišení).
+
+    detector_factory(threads, batch_size, imgsz) vrátí detektor s predict_batch();
+    každé nastavení se změří na prvních batch_size snímcích. Vrací seznam řádků
+    s percentily latence dávky a propustností ve snímcích za sekundu.
+    """
+    rows = []
+    for n_threads, batch_size, imgsz in itertools.product(threads, batch_sizes, sizes):
+        detector = detector_factory(n_threads, batch_size, imgsz)
+        batch = [frames[i % len(frames)] for i in range(batch_size)]
+        stats = latency_stats(measure(lambda: detector.predict_batch(batch), warmup=warmup, runs=runs))
+        row = dict(stats, threads=n_threads, batch_size=batch_size, imgsz=imgsz,
+                   fps=batch_size / max(stats["mean_ms"] / 1000.0, 1e-9))
+        rows.append(row)
+        if on_result is not None:
+            on_result(row)
+    return rows
+
+
+def pick_best(rows, objective="fps", max_p95_ms=None):
+    """
+    Nejlepší nastavení: objective="fps" (nejvyšší propustnost) nebo "latency"
+    (nejnižší p95). max_p95_ms vyřadí nastavení s příliš vysokou latencí.
+    """
+    candidates = [row for row in rows if max_p95_ms is None or row["p95_ms"] <= max_p95_ms]
+    if not candidates:
+        return None
+    if objective == "latency":
+        return min(candidates, key=lambda row: (row["p95_ms"], row["threads"]))
+    if objective != "fps":
+        raise ValueError(f"[CpuProfile] Neznámé kritérium: {objective}")
+    # Při shodě propustnosti méně vláken – nechá jádra ostatním vláknům pipeline
+    return max(candidates, key=lambda row: (round(row["fps"], 1), -row["threads"]))
+
+
+def build_profile(best, rows, backend, inter_op_threads=1, objective="fps"):
+    """Obsah souboru profilu: vybrané nastavení + celé měření pro pozdější porovnání."""
+    return {
+        "version": PROFILE_VERSION,
+        "machine": machine_id(),
+        "backend": backend,
+        "objective": objective,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "intra_op_threads": best["threads"],
+        "inter_op_threads": inter_op_threads,
+        "batch_size": best["batch_size"],
+        "input_size": best["imgsz"],
+        "results": rows,
+    }
+
+
+def save_profile(path, profile):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2, ensure_ascii=False)
+
+
+def load_profile(path):
+    """
+    Načte profil; None, pokud soubor chybí nebo byl naměřen na stroji
+    s jiným počtem jader (nastavení vláken by tam neplatilo).
+    """
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        profile = json.load(f)
+    if profile.get("version") != PROFILE_VERSION:
+        print(f"[CpuProfile] ⚠️ Nepodporovaná verze profilu: {path}")
+        return None
+    measured_on = profile.get("machine", {}).get("cpu_count")
+    if measured_on != (os.cpu_count() or 1):
+        print(f"[CpuProfile] ⚠️ Profil {path} je pro {measured_on} jader, "
+              f"tento stroj má {os.cpu_count()} – ignoruji.")
+        return None
+    return profile
+
+
+def apply_profile(config, profile, apply_input_size=False):
+    """
+    Promítne profil do konfigurace: vlákna ONNX Runtime, velikost dávky
+    a volitelně vstupní rozlišení (mění přesnost, proto jen na vyžádání).
+    """
+    det_cfg = config.setdefault("detection", {})
+    onnx_cfg = det_cfg.setdefault("onnx", {})
+    onnx_cfg["intra_op_threads"] = profile["intra_op_threads"]
+    onnx_cfg["inter_op_threads"] = profile.get("inter_op_threads", 1)
+    det_cfg.setdefault("batch", {})["max_batch_size"] = profile["batch_size"]
+    if apply_input_size:
+        det_cfg["input_size"] = profile["input_size"]
+    return config
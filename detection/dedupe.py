@@ -0,0 +1,69 @@
+# detection/dedupe.py
+from utils.frame_packet import FramePacket
+
+
+class DuplicateFrameDetector:
+    """
+    Detektor, který na duplicitní EVF snímky (shodný otisk JPEG, viz
+    CanonCamera.dedupe) nespouští inferenci a vrátí detekce předchozího snímku.
+
+    Poslední (otisk, detekce) se drží po zdrojích, takže funguje i pro dávky
+    z více kamer (predict_batch). Snímky bez otisku jdou vždy do detektoru.
+    """
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.frames = 0
+        self.reused = 0
+        self._last = {}
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.detector, attr)
+
+    def _cached(self, frame):
+        """Detekce k opětovnému použití, nebo None."""
+        if not isinstance(frame, FramePacket) or frame.digest is None:
+            return None
+        last = self._last.get(frame.source_id)
+        if last is None or last[0] != frame.digest:
+            return None
+        self.reused += 1
+        frame.detections = last[1]
+        frame.stamp("detected")
+        return last[1]
+
+    def _remember(self, frame, detections):
+        if isinstance(frame, FramePacket) and frame.digest is not None:
+            self._last[frame.source_id] = (frame.digest, detections)
+
+    def detect(self, frame):
+        self.frames += 1
+        detections = self._cached(frame)
+        if detections is None:
+            detections = self.detector.detect(frame)
+            self._remember(frame, detections)
+        return detections
+
+    predict = detect
+
+    def predict_batch(self, images):
+        """Do modelu jdou jen snímky, které nejsou duplikáty."""
+        self.frames += len(images)
+        results = [self._cached(frame) for frame in images]
+        pending = [i for i, detections in enumerate(results) if detections is None]
+        if pending:
+            fresh = self.detector.predict_batch([images[i] for i in pending])
+            for i, detections in zip(pending, fresh):
+                results[i] = detections
+                self._remember(images[i], detections)
+        return results
+
+    @property
+    def reuse_ratio(self):
+        """Podíl snímků, pro které se inference nespouštěla."""
+        return self.reused / self.frames if self.frames else 0.0
+
+    def stats(self):
+        return {"frames": self.frames, "reused": self.reused}
@@ -0,0 +1,116 @@
+# detection/detections.py
+import numpy as np
+
+
+# Strukturovaný záznam jedné detekce (pro ukládání / předávání mezi procesy)
+DETECTION_DTYPE = np.dtype([
+    ("bbox", "<f4", (4,)),
+    ("conf", "<f4"),
+    ("cls_id", "<i4"),
+])
+
+
+def _to_numpy(values):
+    """Tensor (i na GPU) nebo pole → np.ndarray jedním přenosem."""
+    if hasattr(values, "cpu"):
+        values = values.cpu()
+    if hasattr(values, "numpy"):
+        values = values.numpy()
+    return np.asarray(values)
+
+
+class Detections:
+    """
+    Sloupcové detekce jednoho snímku: xyxy (N×4), conf (N), cls_id (N).
+
+    Pro zpětnou kompatibilitu se chová jako seznam slovníků
+    {"bbox", "conf", "cls"} – iterace, indexace a len() fungují jako dřív.
+    """
+
+    __slots__ = ("xyxy", "conf", "cls_id", "names")
+
+    def __init__(self, xyxy=None, conf=None, cls_id=None, names=None):
+        self.xyxy = np.zeros((0, 4), np.float32) if xyxy is None else np.asarray(xyxy, np.float32).reshape(-1, 4)
+        self.conf = np.zeros(len(self.xyxy), np.float32) if conf is None else np.asarray(conf, np.float32).reshape(-1)
+        self.cls_id = np.zeros(len(self.xyxy), np.int32) if cls_id is None else np.asarray(cls_id, np.int32).reshape(-1)
+        self.names = dict(enumerate(names)) if isinstance(names, (list, tuple)) else (names or {})
+
+    @classmethod
+    def from_result(cls, result, names=None, allowed_classes=None):
+        """
+        Převede výsledek ultralytics (result.boxes) na Detections.
+        Souřadnice, skóre i třídy se na CPU přenesou jednou pro celý snímek
+        a filtr allowed_classes se aplikuje maskou.
+        """
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return cls(names=names)
+        xyxy = _to_numpy(boxes.xyxy)
+        conf = _to_numpy(boxes.conf)
+        cls_id = _to_numpy(boxes.cls).astype(np.int32)
+        detections = cls(xyxy, conf, cls_id, names=names)
+        if allowed_classes:
+            detections = detections.filter_classes(allowed_classes)
+        return detections
+
+    @classmethod
+    def from_dicts(cls, dicts, names=None):
+        """Opak to_dicts() – třída se hledá podle jména v names (jinak -1)."""
+        dicts = list(dicts)
+        lookup = {name: cls_id for cls_id, name in (names or {}).items()}
+        return cls(
+            [d["bbox"] for d in dicts],
+            [d["conf"] for d in dicts],
+            [d.get("cls_id", lookup.get(d.get("cls"), -1)) for d in dicts],
+            names=names,
+        )
+
+    def filter_classes(self, allowed_classes):
+        return self[np.isin(self.cls_id, np.asarray(list(allowed_classes)))]
+
+    def __len__(self):
+        return len(self.conf)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        """Celé číslo → slovník; maska / řez / pole indexů → Detections."""
+        if isinstance(index, (int, np.integer)):
+            return self._as_dict(int(index))
+        return Detections(self.xyxy[index], self.conf[index], self.cls_id[index], self.names)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._as_dict(i)
+
+    def _as_dict(self, i):
+        cls_id = int(self.cls_id[i])
+        return {
+            "bbox": self.xyxy[i].tolist(),
+            "conf": float(self.conf[i]),
+            "cls": self.names.get(cls_id, str(cls_id)),
+        }
+
+    def to_dicts(self):
+        """Seznam slovníků ve formátu původního predict()."""
+        return list(self)
+
+    def to_structured(self):
+        """NumPy strukturované pole s dtype DETECTION_DTYPE."""
+        out = np.empty(len(self), dtype=DETECTION_DTYPE)
+        out["bbox"] = self.xyxy
+        out["conf"] = self.conf
+        out["cls_id"] = self.cls_id
+        return out
+
+    @classmethod
+    def from_structured(cls, array, names=None):
+        return cls(array["bbox"], array["conf"], array["cls_id"], names=names)
+
+    @property
+    def class_names(self):
+        return [self.names.get(int(c), str(int(c))) for c in self.cls_id]
+
+    def __repr__(self):
+        return f"Detections(n={len(self)})"
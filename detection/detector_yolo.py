@@ -12,21 +12,28 @@ Upraveno: přidána podpora pro více modelů a dynamické načítání tříd z
 @author: Milan
 """
 
-import torch
+import sys
+import threading
+
 import numpy as np
 
+from detection.batch_queue import iter_batches
+from detection.detections import Detections
+from detection.letterbox import LetterboxPreprocessor
+from detection.tiling import merge_tiles, tile_grid
+from utils.frame_packet import FramePacket, as_image
+
 
 class YoloAirborneDetector:
     """Wrapper pro YOLO model s podporou více modelů a konfigurace."""
 
     def __init__(self, model, config=None):
         self.model = model
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = self._default_device()
         self.config = config or {}
 
         det_cfg = self.config.get("detection", {})
-        self.conf_threshold = det_cfg.get("conf_threshold", 0.4)
-        self.iou_threshold = det_cfg.get("iou_threshold", 0.5)
+        self.max_batch_size = (det_cfg.get("batch", {}) or {}).get("max_batch_size", 8)
 
         # Určení aktivního modelu a jeho tříd
         self.active_model = det_cfg.get("active_model", "default")
@@ -34,39 +41,199 @@ class YoloAirborneDetector:
 
         # Načti seznam povolených tříd podle aktivního modelu
         self.allowed_classes = model_cfg.get("allowed_classes", det_cfg.get("allowed_classes", []))
+        self.conf_threshold = model_cfg.get("conf_threshold", det_cfg.get("conf_threshold", 0.4))
+        self.iou_threshold = model_cfg.get("iou_threshold", det_cfg.get("iou_threshold", 0.5))
+
+        # Parametry předávané přímo do volání modelu (filtr tříd proběhne už před NMS)
+        self.profile = self.build_profile(det_cfg, model_cfg, self.allowed_classes, self.device)
+
+        # Dlaždicová inference pro malé vzdálené cíle
+        tiling_cfg = det_cfg.get("tiling", {}) or {}
+        self.tiling = bool(tiling_cfg.get("enabled", False))
+        self.tile_size = tiling_cfg.get("tile_size", 640)
+        self.tile_overlap = tiling_cfg.get("overlap", 0.2)
+        self.tile_full_frame = tiling_cfg.get("include_full_frame", True)
+        self.tile_full_resolution = tiling_cfg.get("full_resolution", False)
+        self.tile_merge_iou = tiling_cfg.get("merge_iou", self.profile["iou"])
+
+        # Vlastní letterbox do předalokovaných bufferů místo alokací v ultralytics
+        self.preprocessor = None
+        self._infer_lock = threading.Lock()
+        if (det_cfg.get("preprocess", {}) or {}).get("preallocated", False):
+            self.preprocessor = LetterboxPreprocessor(self.profile["imgsz"], max_batch=self.max_batch_size)
 
         print(f"[YoloAirborneDetector] 🔧 Aktivní model: {self.active_model}")
         print(f"[YoloAirborneDetector] 🎯 Povolené třídy (ID): {self.allowed_classes}")
-        print(f"[YoloAirborneDetector] ⚙️  conf={self.conf_threshold}, iou={self.iou_threshold}")
-
-    def predict(self, image: np.ndarray):
-        """Provede detekci a vrátí výsledky jako seznam slovníků."""
+        print(f"[YoloAirborneDetector] ⚙️  conf={self.conf_threshold}, iou={self.iou_threshold}, "
+              f"imgsz={self.profile['imgsz']}, max_det={self.profile['max_det']}, half={self.profile['half']}")
+        if self.tiling:
+            print(f"[YoloAirborneDetector] 🧩 Dlaždice {self.tile_size}px, překryv {self.tile_overlap:.0%}")
+
+    @staticmethod
+    def _default_device():
+        """Zařízení bez vynuceného importu torch – ONNX backend ho vůbec nenačte."""
+        torch = sys.modules.get("torch")
+        return "cuda" if torch is not None and torch.cuda.is_available() else "cpu"
+
+    @staticmethod
+    def build_profile(det_cfg, model_cfg, allowed_classes, device="cpu"):
+        """
+        Inferenční profil pro model(...): classes, imgsz, max_det, half, agnostic_nms.
+        Hodnoty ze sekce models.<active_model> mají přednost před společnými.
+        """
+        def option(key, default):
+            return model_cfg.get(key, det_cfg.get(key, default))
+
+        return {
+            "conf": option("conf_threshold", 0.4),
+            "iou": option("iou_threshold", 0.5),
+            "classes": list(allowed_classes) or None,
+            "imgsz": option("input_size", 640),
+            "max_det": option("max_det", 300),
+            # FP16 má smysl jen na GPU – na CPU by ultralytics stejně počítal ve float32
+            "half": bool(option("half", False)) and device == "cuda",
+            "agnostic_nms": bool(option("agnostic_nms", False)),
+            "verbose": False,
+        }
+
+    def predict(self, image: np.ndarray, imgsz=None):
+        """
+        Provede detekci a vrátí Detections (vstup: obraz nebo FramePacket).
+        Výsledek lze procházet jako seznam slovníků {"bbox", "conf", "cls"}.
+        imgsz přepíše input_size jen pro tento snímek (AdaptiveResolutionDetector).
+        """
+        if self.tiling:
+            return self.predict_tiled(image)
         try:
-            results = self.model(
-                image,
-                conf=self.conf_threshold,
-                iou=self.iou_threshold,
-                verbose=False
-            )
-
-            detections = []
-            for box in results[0].boxes:
-                cls_id = int(box.cls[0])
-                if self.allowed_classes and cls_id not in self.allowed_classes:
-                    continue
-
-                detections.append({
-                    "bbox": box.xyxy[0].tolist(),
-                    "conf": float(box.conf[0]),
-                    "cls": self.model.names[cls_id],
-                })
-
+            detections = self._infer([as_image(image)], imgsz)[0]
+            self._annotate(image, detections)
             return detections
 
         except Exception as e:
             print(f"[YoloAirborneDetector] ❌ Prediction failed: {e}")
-            return []
+            return Detections()
+
+    def predict_batch(self, images):
+        """
+        Detekce na více snímcích (i z různých kamer) jedním průchodem modelem.
+        Snímky se posílají po dávkách nejvýše detection.batch.max_batch_size.
+        Vrací seznam seznamů detekcí ve stejném pořadí jako vstupní snímky.
+        """
+        if self.tiling:
+            return [self.predict_tiled(image) for image in images]
+        batched = []
+        for chunk in iter_batches(images, self.max_batch_size):
+            batched.extend(self._predict_chunk(chunk))
+        return batched
+
+    def _predict_chunk(self, images):
+        try:
+            batched = self._infer([as_image(image) for image in images])
+            for image, detections in zip(images, batched):
+                self._annotate(image, detections)
+            return batched
+
+        except Exception as e:
+            print(f"[YoloAirborneDetector] ❌ Batch prediction failed: {e}")
+            return [Detections() for _ in images]
+
+    def predict_tiled(self, image):
+        """
+        Detekce po překrývajících se dlaždicích (detection.tiling).
+
+        Dlaždice (a volitelně celý zmenšený snímek) jdou do modelu jako dávka,
+        boxy se posunou do souřadnic snímku a duplicity na švech odstraní NMS.
+        S full_resolution se dlaždicuje plné rozlišení FramePacket (z JPEG)
+        a výsledné boxy se přepočtou na rozměr packet.image.
+        """
+        frame = as_image(image)
+        source = frame
+        if self.tile_full_resolution and isinstance(image, FramePacket):
+            source = image.full_image()
+
+        height, width = source.shape[:2]
+        tiles = tile_grid(height, width, self.tile_size, self.tile_overlap)
+        if self.tile_full_frame and len(tiles) > 1:
+            tiles.append((0, 0, width, height))
+
+        try:
+            detections = self._predict_crops(source, tiles, self.tile_size)
+            if source is not frame and len(detections):
+                detections.xyxy *= frame.shape[1] / width
 
-    def detect(self, image: np.ndarray):
+        except Exception as e:
+            print(f"[YoloAirborneDetector] ❌ Tiled prediction failed: {e}")
+            detections = Detections()
+
+        self._annotate(image, detections)
+        return detections
+
+    def predict_regions(self, image, regions, imgsz=None):
+        """
+        Detekce jen ve výřezech regions = [(x0, y0, x1, y1), …] (např. kolem
+        predikovaných tracků). Výřezy jdou do modelu jednou dávkou, výsledek
+        je v souřadnicích celého snímku.
+        """
+        try:
+            detections = self._predict_crops(as_image(image), regions, imgsz or self.profile["imgsz"])
+        except Exception as e:
+            print(f"[YoloAirborneDetector] ❌ ROI prediction failed: {e}")
+            detections = Detections()
+
+        self._annotate(image, detections)
+        return detections
+
+    def _predict_crops(self, source, regions, imgsz):
+        """Dávková inference výřezů a sloučení výsledků do souřadnic source."""
+        crops = [source[y0:y1, x0:x1] for x0, y0, x1, y1 in regions]
+        crop_detections = []
+        for chunk in iter_batches(crops, self.max_batch_size):
+            crop_detections.extend(self._infer(chunk, imgsz))
+
+        return merge_tiles(
+            crop_detections, [(x0, y0) for x0, y0, _, _ in regions],
+            iou_threshold=self.tile_merge_iou,
+            agnostic=self.profile["agnostic_nms"],
+            names=self.model.names,
+        )
+
+    def _infer(self, images, imgsz=None):
+        """
+        Jeden průchod modelem (nejvýše max_batch_size obrazů) → Detections
+        v souřadnicích vstupních obrazů. S detection.preprocess.preallocated
+        jde do modelu rovnou tensor z LetterboxPreprocessor.
+        """
+        profile = self.profile if imgsz is None else dict(self.profile, imgsz=imgsz)
+        if self.preprocessor is None:
+            return [self._to_detections(result) for result in self.model(images, **profile)]
+
+        with self._infer_lock:  # tensor je sdílený buffer – platí do dalšího prepare()
+            size = getattr(self.model, "static_size", None) or profile["imgsz"]
+            tensor, meta = self.preprocessor.prepare(images, size)
+            results = self.model(self._model_input(tensor), **profile)
+            detections = [self._to_detections(result) for result in results]
+        for dets, image_meta in zip(detections, meta):
+            self.preprocessor.scale_boxes(dets.xyxy, image_meta)
+        return detections
+
+    def _model_input(self, tensor):
+        """ONNX backend bere NumPy, ultralytics torch tensor (sdílí paměť bufferu)."""
+        if getattr(self.model, "accepts_numpy", False):
+            return tensor
+        import torch
+        return torch.from_numpy(tensor)
+
+    @staticmethod
+    def _annotate(frame, detections):
+        """U FramePacket uloží detekce a čas dokončení detekce."""
+        if isinstance(frame, FramePacket):
+            frame.detections = detections
+            frame.stamp("detected")
+
+    def _to_detections(self, result):
+        """Převede výsledek modelu pro jeden snímek na Detections (vektorově, bez smyčky přes boxy)."""
+        return Detections.from_result(result, names=self.model.names, allowed_classes=self.allowed_classes)
+
+    def detect(self, image: np.ndarray, imgsz=None):
         """Alias pro kompatibilitu s main_GF.py"""
-        return self.predict(image)
+        return self.predict(image, imgsz)
@@ -0,0 +1,61 @@
+# detection/evaluation.py
+from collections import defaultdict
+
+import numpy as np
+
+from tracking.track import iou_matrix
+
+
+def match_counts(reference, candidate, iou_threshold=0.5):
+    """
+    Porovná detekce jednoho snímku: pro každou třídu počet referenčních
+    detekcí a kolik z nich kandidát našel (stejná třída, IoU ≥ prah).
+    Vrací {třída: (referenční, nalezené)}.
+    """
+    counts = defaultdict(lambda: [0, 0])
+    reference = list(reference)
+    candidate = list(candidate)
+    for cls in {det["cls"] for det in reference}:
+        ref_boxes = [det["bbox"] for det in reference if det["cls"] == cls]
+        cand_boxes = [det["bbox"] for det in candidate if det["cls"] == cls]
+        counts[cls][0] += len(ref_boxes)
+        if not cand_boxes:
+            continue
+        iou = iou_matrix(ref_boxes, cand_boxes)
+        used = set()
+        for r in range(len(ref_boxes)):
+            for c in np.argsort(-iou[r]):
+                if iou[r, c] < iou_threshold:
+                    break
+                if c not in used:
+                    used.add(c)
+                    counts[cls][1] += 1
+                    break
+    return {cls: tuple(value) for cls, value in counts.items()}
+
+
+def per_class_agreement(pairs, iou_threshold=0.5):
+    """
+    Shoda kandidáta s referencí po třídách přes více snímků. Vrací
+    {třída: {"reference", "candidate", "matched", "precision", "recall"}};
+    precision = podíl detekcí kandidáta, které mají protějšek v referenci.
+    """
+    totals = defaultdict(lambda: [0, 0, 0])
+    for reference, candidate in pairs:
+        reference = list(reference)
+        candidate = list(candidate)
+        for det in candidate:
+            totals[det["cls"]][1] += 1
+        for cls, (ref_count, found) in match_counts(reference, candidate, iou_threshold).items():
+            totals[cls][0] += ref_count
+            totals[cls][2] += found
+    return {
+        cls: {
+            "reference": ref_count,
+            "candidate": cand_count,
+            "matched": matched,
+            "precision": matched / cand_count if cand_count else 1.0,
+            "recall": matched / ref_count if ref_count else 1.0,
+        }
+        for cls, (ref_count, cand_count, matched) in totals.items()
+    }
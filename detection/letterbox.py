@@ -0,0 +1,103 @@
+# detection/letterbox.py
+import cv2
+import numpy as np
+
+
+def letterbox(image, size=640, color=114):
+    """
+    Zmenší obraz se zachováním poměru stran a doplní okraje na size×size
+    (stejně jako ultralytics). Vrací (obraz, měřítko, (pad_x, pad_y)).
+    """
+    height, width = image.shape[:2]
+    ratio = min(size / height, size / width)
+    new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    out = np.full((size, size, 3), color, dtype=np.uint8)
+    if (new_w, new_h) != (width, height):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    out[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = image
+    return out, ratio, (pad_x, pad_y)
+
+
+def to_tensor(images):
+    """Seznam BGR letterbox obrazů → float32 NCHW RGB v rozsahu 0–1."""
+    batch = np.stack(images)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(batch, dtype=np.float32) / 255.0
+
+
+class LetterboxPreprocessor:
+    """
+    Předpříprava vstupu modelu do předem alokovaných bufferů.
+
+    Pro každé rozlišení drží plátno (batch, S, S, 3) uint8 a tensor
+    (batch, 3, S, S) float32; letterbox, BGR→RGB, HWC→CHW i škálování 0–1
+    probíhá na místě, bez alokací pro každý snímek. prepare() vrací pohled
+    do sdíleného tensoru – platí jen do dalšího volání.
+    """
+
+    def __init__(self, size=640, max_batch=8, color=114, stride=32):
+        self.stride = stride
+        self.size = self._round(size)
+        self.max_batch = max_batch
+        self.color = color
+        self._buffers = {}
+        self._buffers_for(self.size)
+
+    def _round(self, size):
+        """Rozměr tensoru musí být násobkem kroku sítě (stride)."""
+        return int(np.ceil(int(size) / self.stride) * self.stride)
+
+    def _buffers_for(self, size):
+        buffers = self._buffers.get(size)
+        if buffers is None:
+            canvas = np.full((self.max_batch, size, size, 3), self.color, dtype=np.uint8)
+            tensor = np.empty((self.max_batch, 3, size, size), dtype=np.float32)
+            geometry = [None] * self.max_batch
+            buffers = self._buffers[size] = (canvas, tensor, geometry)
+        return buffers
+
+    def prepare(self, images, size=None):
+        """
+        Obrazy (BGR, libovolné rozměry) → (tensor[:n], meta), meta = [(ratio, (pad_x, pad_y), shape), …].
+        """
+        size = self._round(size or self.size)
+        if len(images) > self.max_batch:
+            raise ValueError(f"[LetterboxPreprocessor] Dávka {len(images)} > max_batch {self.max_batch}")
+        canvas, tensor, geometry = self._buffers_for(size)
+
+        meta = []
+        for i, image in enumerate(images):
+            height, width = image.shape[:2]
+            ratio = min(size / height, size / width)
+            new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+            pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+            # Okraje se přebarví jen při změně geometrie – jinak zůstávají z minula
+            if geometry[i] != (new_w, new_h):
+                canvas[i].fill(self.color)
+                geometry[i] = (new_w, new_h)
+
+            target = canvas[i, pad_y:pad_y + new_h, pad_x:pad_x + new_w]
+            if (new_w, new_h) == (width, height):
+                np.copyto(target, image)
+            else:
+                cv2.resize(image, (new_w, new_h), dst=target, interpolation=cv2.INTER_LINEAR)
+
+            for channel in range(3):
+                np.multiply(canvas[i, :, :, 2 - channel], 1.0 / 255.0, out=tensor[i, channel], casting="unsafe")
+            meta.append((ratio, (pad_x, pad_y), (height, width)))
+
+        return tensor[:len(images)], meta
+
+    @staticmethod
+    def scale_boxes(xyxy, meta):
+        """Boxy (N×4 float32) z letterbox souřadnic zpět do původního obrazu – na místě."""
+        ratio, (pad_x, pad_y), (height, width) = meta
+        xs, ys = xyxy[:, 0::2], xyxy[:, 1::2]   # pohledy na sloupce x1, x2 / y1, y2
+        xs -= pad_x
+        ys -= pad_y
+        xyxy /= ratio
+        np.clip(xs, 0, width, out=xs)
+        np.clip(ys, 0, height, out=ys)
+        return xyxy
@@ -0,0 +1,53 @@
+# detection/model_cache.py
+import os
+import time
+
+from detection.onnx_backend import weights_hash
+
+
+def fused_cache_path(model_path, cache_dir=None):
+    """
+    <cache_dir>/<jméno>.<hash vah>.torch<verze>-ul<verze>.fused.pt – změna vah
+    nebo verze torch / ultralytics vytvoří nový soubor.
+    """
+    import torch
+    import ultralytics
+
+    cache_dir = cache_dir or os.path.dirname(os.path.abspath(model_path))
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    versions = f"torch{torch.__version__.split('+')[0]}-ul{ultralytics.__version__}"
+    return os.path.join(cache_dir, f"{stem}.{weights_hash(model_path)}.{versions}.fused.pt")
+
+
+def load_fused(model_path, cache_dir=None):
+    """
+    YOLO model s již sloučenými Conv+BN vrstvami.
+
+    Při prvním startu se model načte, sloučí (fuse) a uloží bez optimizeru
+    a EMA vah; další starty načtou rovnou menší, sloučený checkpoint.
+    Vrací (model, True pokud byl použit cache soubor).
+    """
+    import torch
+    from ultralytics import YOLO
+
+    path = fused_cache_path(model_path, cache_dir)
+    if os.path.exists(path):
+        try:
+            return YOLO(path), True
+        except Exception as e:
+            print(f"[ModelCache] ⚠️ Cache nelze načíst ({e}) – vytvářím znovu: {path}")
+
+    model = YOLO(model_path)
+    model.fuse()
+    ckpt = {
+        "model": model.model,
+        "ema": None,
+        "optimizer": None,
+        "train_args": (getattr(model, "ckpt", None) or {}).get("train_args", {}),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    tmp_path = path + ".tmp"
+    torch.save(ckpt, tmp_path)
+    os.replace(tmp_path, path)
+    print(f"[ModelCache] 💾 Sloučený model uložen: {path}")
+    return model, False
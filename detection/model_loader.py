@@ -23,23 +23,140 @@ def _add_cuda_paths():
 
 _add_cuda_paths()
 # ----------------------------------------------------
-import torch
-from ultralytics import YOLO
+# torch a ultralytics se importují až při načítání .pt modelu (viz load_model):
+# samotný import tohoto modulu ani ONNX backend je nepotřebují.
 
+import numpy as np
 
 from utils.logger import Logger
+from utils.performance_timer import StageTimer
 
 class ModelLoader:
     @staticmethod
-    def load_model(model_path):
+    def resolve_model_path(det_cfg):
+        """Cesta k modelu: model_path, nebo model_path_<active_model>."""
+        if det_cfg.get("model_path"):
+            return det_cfg["model_path"]
+        active_model = det_cfg.get("active_model", "default")
+        return det_cfg.get(f"model_path_{active_model}", det_cfg.get("model_path_default"))
+
+    @staticmethod
+    def load_from_config(config, timer=None):
+        """
+        Načte aktivní model backendem podle detection.backend ("torch" | "onnx"),
+        provede warm-up (detection.startup.warmup_runs) a vypíše rozpis doby startu.
+        """
+        det_cfg = config.get("detection", {})
+        startup_cfg = det_cfg.get("startup", {}) or {}
+        timer = timer or StageTimer()
+
+        model = ModelLoader.load(ModelLoader.resolve_model_path(det_cfg), config, timer=timer)
+
+        runs = startup_cfg.get("warmup_runs", 1)
+        if runs:
+            with timer.stage("warm-up"):
+                ModelLoader.warmup(model, imgsz=det_cfg.get("input_size", 640), runs=runs)
+
+        Logger(log_to_console=True).info(timer.report("Start modelu"))
+        return model
+
+    @staticmethod
+    def load(model_path, config=None, timer=None):
+        """
+        Načte model z cesty: *.onnx (i INT8 artefakt) vždy přes ONNX Runtime,
+        *.pt podle detection.backend.
+        """
+        cpu_profile = ModelLoader.apply_cpu_profile(config) if config else None
+        det_cfg = (config or {}).get("detection", {})
+        startup_cfg = det_cfg.get("startup", {}) or {}
+        backend = det_cfg.get("backend", "torch")
+        if backend == "onnx" or model_path.lower().endswith(".onnx"):
+            return ModelLoader.load_onnx(model_path, imgsz=det_cfg.get("input_size", 640),
+                                         onnx_cfg=det_cfg.get("onnx", {}), timer=timer)
+        if backend != "torch":
+            raise ValueError(f"[ModelLoader] Neznámý backend: {backend}")
+        return ModelLoader.load_model(model_path,
+                                      fused_cache=startup_cfg.get("fused_cache", False),
+                                      cache_dir=startup_cfg.get("cache_dir") or None,
+                                      timer=timer,
+                                      threads=cpu_profile and (cpu_profile["intra_op_threads"],
+                                                               cpu_profile.get("inter_op_threads", 1)))
+
+    @staticmethod
+    def apply_cpu_profile(config):
+        """
+        Načte profil vláken naměřený nástrojem tools.tune_cpu (detection.cpu_profile)
+        a promítne ho do konfigurace. Vrací profil, nebo None.
+        """
+        from detection.cpu_profile import apply_profile, default_profile_path, load_profile
+
+        profile_cfg = config.get("detection", {}).get("cpu_profile", {}) or {}
+        if not profile_cfg.get("enabled", False):
+            return None
+        path = profile_cfg.get("path") or default_profile_path()
+        profile = load_profile(path)
+        if profile is None:
+            return None
+        apply_profile(config, profile, apply_input_size=profile_cfg.get("apply_input_size", False))
+        Logger(log_to_console=True).info(
+            f"🧵 CPU profil {path}: intra={profile['intra_op_threads']}, "
+            f"inter={profile.get('inter_op_threads', 1)}, dávka={profile['batch_size']}")
+        return profile
+
+    @staticmethod
+    def load_onnx(model_path, imgsz=640, onnx_cfg=None, timer=None):
+        """ONNX Runtime na CPU; .pt váhy se jednou exportují a uloží do cache podle hashe."""
+        timer = timer or StageTimer()
+        with timer.stage("import onnxruntime"):
+            from detection.onnx_backend import OnnxYoloModel, export_onnx
+            import onnxruntime  # noqa: F401
+
+        onnx_cfg = onnx_cfg or {}
+        logger = Logger(log_to_console=True)
+        with timer.stage("export / cache ONNX"):
+            onnx_path = export_onnx(model_path, imgsz=imgsz, cache_dir=onnx_cfg.get("cache_dir") or None,
+                                    dynamic=onnx_cfg.get("dynamic", True))
+        with timer.stage("ONNX session"):
+            model = OnnxYoloModel(onnx_path,
+                                  intra_op_threads=onnx_cfg.get("intra_op_threads", 0),
+                                  inter_op_threads=onnx_cfg.get("inter_op_threads", 1))
+        logger.info(f"✅ ONNX Runtime (CPU) model načten: {onnx_path}")
+        return model
+
+    @staticmethod
+    def warmup(model, imgsz=640, runs=1):
+        """Prázdná inference – inicializace (alokace, výběr kernelů) neproběhne až na prvním snímku."""
+        dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+        for _ in range(runs):
+            model(dummy, imgsz=imgsz, verbose=False)
+
+    @staticmethod
+    def load_model(model_path, fused_cache=False, cache_dir=None, timer=None, threads=None):
         logger = Logger(log_to_console=True)
         logger.info(f"Načítám YOLO model z: {model_path}")
+        timer = timer or StageTimer()
 
         # Pokus o import torch – pokud selže, přepneme na CPU
         try:
-            import torch
-            from ultralytics import YOLO
-            model = YOLO(model_path)
+            with timer.stage("import torch"):
+                import torch
+            if threads and not torch.cuda.is_available():
+                # Hned po importu: inter-op vlákna jdou v torch nastavit jen
+                # před první paralelní prací, tedy ještě před načtením vah
+                from detection.cpu_profile import set_torch_threads
+                set_torch_threads(*threads)
+            with timer.stage("import ultralytics"):
+                from ultralytics import YOLO
+
+            if fused_cache:
+                from detection.model_cache import load_fused
+
+                with timer.stage("načtení vah (fused cache)"):
+                    model, cached = load_fused(model_path, cache_dir)
+                logger.info("♻️ Sloučený model z cache." if cached else "💾 Sloučený model vytvořen a uložen.")
+            else:
+                with timer.stage("načtení vah"):
+                    model = YOLO(model_path)
 
             try:
                 if torch.cuda.is_available():
@@ -49,7 +166,8 @@ class ModelLoader:
                     device = "cpu"
                     logger.warning("⚠️ CUDA není dostupná – model poběží na CPU")
 
-                model.to(device)
+                with timer.stage(f"přesun na {device}"):
+                    model.to(device)
                 logger.info(f"Model běží na zařízení: {device.upper()}")
             except Exception as e:
                 logger.warning(f"⚠️ CUDA selhala ({e}) – přepínám na CPU")
@@ -0,0 +1,159 @@
+# detection/model_registry.py
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from detection.model_loader import ModelLoader
+
+
+def _load_with_warmup(path, config):
+    det_cfg = config.get("detection", {})
+    model = ModelLoader.load(path, config)
+    runs = (det_cfg.get("startup", {}) or {}).get("warmup_runs", 1)
+    if runs:
+        ModelLoader.warmup(model, imgsz=det_cfg.get("input_size", 640), runs=runs)
+    return model
+
+
+def model_config(config, name):
+    """Kopie konfigurace s active_model = name (a bez pevného model_path)."""
+    det_cfg = dict(config.get("detection", {}), active_model=name)
+    det_cfg.pop("model_path", None)
+    return dict(config, detection=det_cfg)
+
+
+def model_name_for_path(config, path):
+    """Jméno modelu, jehož model_path_<jméno> ukazuje na path (nebo None)."""
+    det_cfg = config.get("detection", {})
+    target = os.path.normcase(os.path.normpath(path))
+    for name in det_cfg.get("models", {}) or {}:
+        model_path = det_cfg.get(f"model_path_{name}")
+        if model_path and os.path.normcase(os.path.normpath(model_path)) == target:
+            return name
+    return None
+
+
+class ModelRegistry:
+    """
+    Načtené modely držené v paměti (nejvýše max_resident, LRU).
+
+    Ke každému modelu patří vlastní YoloAirborneDetector s allowed_classes,
+    classes a inferenčním profilem z detection.models.<jméno>, takže přepnutí
+    modelu nevyžaduje nové načtení ani restart kamery.
+    """
+
+    def __init__(self, config, max_resident=2, loader=None, detector_factory=None):
+        self.config = config
+        self.max_resident = max(1, max_resident)
+        self._loader = loader or _load_with_warmup
+        if detector_factory is None:
+            from detection.detector_yolo import YoloAirborneDetector
+            detector_factory = YoloAirborneDetector
+        self._detector_factory = detector_factory
+        self._resident = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """Parametry ze sekce detection.registry."""
+        registry_cfg = config.get("detection", {}).get("registry", {}) or {}
+        registry = cls(config, max_resident=registry_cfg.get("max_resident", 2))
+        for name in registry_cfg.get("preload", []) or []:
+            registry.get(name)
+        return registry
+
+    def available(self):
+        """Jména modelů, které mají v configu cestu (model_path_<jméno>)."""
+        det_cfg = self.config.get("detection", {})
+        names = list(det_cfg.get("models", {}).keys())
+        return [name for name in names if det_cfg.get(f"model_path_{name}")]
+
+    def resident(self):
+        """Jména modelů v paměti, od nejdéle nepoužitého."""
+        with self._lock:
+            return list(self._resident.keys())
+
+    def add(self, name, detector):
+        """Zařadí již vytvořený detektor (např. model načtený při startu)."""
+        with self._lock:
+            self._resident[name] = detector
+            self._resident.move_to_end(name)
+            self._evict()
+
+    def get(self, name):
+        """Detektor pro model name – z paměti, nebo ho načte (a případně uvolní nejstarší)."""
+        with self._lock:
+            if name in self._resident:
+                self._resident.move_to_end(name)
+                return self._resident[name]
+
+        cfg = model_config(self.config, name)
+        path = ModelLoader.resolve_model_path(cfg["detection"])
+        if not path:
+            raise KeyError(f"[ModelRegistry] Model '{name}' nemá v configu model_path_{name}.")
+        print(f"[ModelRegistry] 📥 Načítám model '{name}': {path}")
+        detector = self._detector_factory(self._loader(path, cfg), config=cfg)
+
+        with self._lock:
+            self._resident[name] = detector
+            self._resident.move_to_end(name)
+            self.loads += 1
+            self._evict()
+        return detector
+
+    def _evict(self):
+        while len(self._resident) > self.max_resident:
+            name, _ = self._resident.popitem(last=False)
+            self.evictions += 1
+            print(f"[ModelRegistry] 🗑️ Uvolněn model '{name}' (limit {self.max_resident}).")
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+
+class SwitchableDetector:
+    """
+    Detektor s přepínatelným modelem (GUI / API).
+
+    switch() načte nový model mimo detekční smyčku a aktivní model se vymění
+    atomicky – rozpracovaný snímek doběhne se starým, další už s novým.
+    """
+
+    def __init__(self, registry, active=None):
+        self.registry = registry
+        self.active_name = active or registry.config.get("detection", {}).get("active_model", "default")
+        self._active = registry.get(self.active_name)
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """callback(jméno) po každém přepnutí modelu."""
+        self._listeners.append(callback)
+
+    def switch(self, name):
+        if name == self.active_name:
+            return self._active
+        detector = self.registry.get(name)
+        self._active, self.active_name = detector, name
+        print(f"[SwitchableDetector] 🔀 Aktivní model: {name}")
+        for callback in self._listeners:
+            callback(name)
+        return detector
+
+    @property
+    def active(self):
+        return self._active
+
+    def __getattr__(self, attr):
+        # predict_batch, predict_regions, allowed_classes, … aktivního detektoru
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self._active, attr)
+
+    def predict(self, image, **kwargs):
+        return self._active.predict(image, **kwargs)
+
+    def detect(self, image, **kwargs):
+        return self._active.detect(image, **kwargs)
@@ -0,0 +1,155 @@
+# detection/motion_gate.py
+import time
+
+import cv2
+import numpy as np
+
+from detection.roi_scheduler import square_region
+from utils.frame_packet import FramePacket, as_image
+
+
+class MotionGate:
+    """
+    Levný předstupeň před YOLO: rozdíl vůči klouzavému průměru pozadí
+    na silně zmenšeném šedotónovém snímku.
+
+    check() vrací seznam oblastí s pohybem v souřadnicích původního snímku
+    (prázdný seznam = statická obloha).
+    """
+
+    def __init__(self, width=160, threshold=12, min_area=2, learning_rate=0.1):
+        self.width = width
+        self.threshold = threshold
+        self.min_area = min_area
+        self.learning_rate = learning_rate
+        self._background = None
+        self._kernel = np.ones((3, 3), np.uint8)
+
+    def reset(self):
+        self._background = None
+
+    def check(self, frame):
+        image = as_image(frame)
+        height, width = image.shape[:2]
+        scale = self.width / float(width)
+        small = cv2.resize(image, (self.width, max(1, int(round(height * scale)))), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        gray = cv2.GaussianBlur(gray, (3, 3), 0).astype(np.float32)
+
+        if self._background is None or self._background.shape != gray.shape:
+            self._background = gray
+            return [(0, 0, width, height)]  # první snímek – bez reference se pohyb nepozná
+
+        diff = cv2.absdiff(gray, self._background)
+        cv2.accumulateWeighted(gray, self._background, self.learning_rate)
+
+        mask = cv2.dilate((diff > self.threshold).astype(np.uint8), self._kernel)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+
+        regions = []
+        for x, y, w, h, area in stats[1:count]:
+            if area < self.min_area:
+                continue
+            regions.append((int(x / scale), int(y / scale),
+                            min(width, int(np.ceil((x + w) / scale))), min(height, int(np.ceil((y + h) / scale)))))
+        return regions
+
+
+class MotionGatedDetector:
+    """
+    Detektor s předstupněm MotionGate.
+
+    Bez pohybu se inference přeskočí a vrátí se poslední detekce, s malými
+    oblastmi pohybu se detekuje jen v nich (predict_regions), při rozsáhlém
+    pohybu (posun kamery) na celém snímku. Nejpozději po min_interval
+    sekundách proběhne plná detekce vždy – pomalé / visící cíle se neztratí.
+    """
+
+    def __init__(self, detector, gate=None, min_inference_hz=2.0, max_region_fraction=0.3,
+                 region_size=160, region_imgsz=320):
+        self.detector = detector
+        self.gate = gate or MotionGate()
+        self.min_interval = 1.0 / min_inference_hz if min_inference_hz else None
+        self.max_region_fraction = max_region_fraction
+        self.region_size = region_size
+        self.region_imgsz = region_imgsz
+        self.frames = 0
+        self.skipped = 0
+        self.region_frames = 0
+        self.full_frames = 0
+        self._last_full = None
+        self._last_detections = []
+
+    @classmethod
+    def from_config(cls, detector, config):
+        """Parametry ze sekce detection.motion."""
+        motion_cfg = config.get("detection", {}).get("motion", {}) or {}
+        gate = MotionGate(
+            width=motion_cfg.get("width", 160),
+            threshold=motion_cfg.get("threshold", 12),
+            min_area=motion_cfg.get("min_area", 2),
+            learning_rate=motion_cfg.get("learning_rate", 0.1),
+        )
+        return cls(
+            detector,
+            gate,
+            min_inference_hz=motion_cfg.get("min_inference_hz", 2.0),
+            max_region_fraction=motion_cfg.get("max_region_fraction", 0.3),
+            region_size=motion_cfg.get("region_size", 160),
+            region_imgsz=motion_cfg.get("region_imgsz", 320),
+        )
+
+    def _regions(self, motion, shape):
+        """Oblasti pohybu jako čtvercové výřezy; None = raději celý snímek."""
+        height, width = shape[:2]
+        area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in motion)
+        if area > self.max_region_fraction * width * height:
+            return None
+        regions = [
+            square_region((x0 + x1) / 2.0, (y0 + y1) / 2.0, max(self.region_size, x1 - x0, y1 - y0), shape)
+            for x0, y0, x1, y1 in motion
+        ]
+        if sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in regions) > self.max_region_fraction * width * height:
+            return None
+        return regions
+
+    def detect(self, frame):
+        """Detekce pro jeden snímek (np.ndarray nebo FramePacket)."""
+        now = frame.capture_time if isinstance(frame, FramePacket) else time.monotonic()
+        self.frames += 1
+        motion = self.gate.check(frame)
+
+        forced = self.min_interval is not None and (
+            self._last_full is None or now - self._last_full >= self.min_interval)
+        if not motion and not forced:
+            self.skipped += 1
+            if isinstance(frame, FramePacket):
+                frame.detections = self._last_detections
+            return self._last_detections
+
+        regions = None if forced else self._regions(motion, as_image(frame).shape)
+        if regions is not None and hasattr(self.detector, "predict_regions"):
+            self.region_frames += 1
+            detections = self.detector.predict_regions(frame, regions, self.region_imgsz)
+        else:
+            self.full_frames += 1
+            self._last_full = now
+            detections = self.detector.detect(frame)
+
+        self._last_detections = detections
+        return detections
+
+    predict = detect
+
+    @property
+    def skip_ratio(self):
+        """Podíl snímků, u kterých se inference úplně přeskočila."""
+        return self.skipped / self.frames if self.frames else 0.0
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "regions": self.region_frames,
+            "full": self.full_frames,
+        }
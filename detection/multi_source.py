@@ -0,0 +1,102 @@
+# detection/multi_source.py
+import threading
+from collections import deque
+
+
+class MultiSourceDetector:
+    """
+    Jeden YoloAirborneDetector sdílený více kamerami.
+
+    Snímky z různých zdrojů se spojí do jednoho dávkového průchodu modelem
+    (predict_batch) a detekce se pak rozdělí zpět do trackerů jednotlivých zdrojů.
+
+    S BatchQueue (queue) lze snímky zařazovat asynchronně hned po zachycení
+    (submit, např. jako SourcePool.on_packet) – dávku pak skládá fronta podle
+    max_wait_ms. Každý zdroj má rozpracovaný nejvýše jeden snímek, výsledky
+    vyzvedává results() ve vlákně, které vlastní trackery.
+    """
+
+    def __init__(self, detector, tracker_factory=None, queue=None):
+        self.detector = detector
+        if tracker_factory is None:
+            from tracking.object_tracking_manager import ObjectTrackingManager
+            tracker_factory = ObjectTrackingManager
+        self.tracker_factory = tracker_factory
+        self.trackers = {}
+        self.queue = queue
+        self.skipped = 0  # snímky nezařazené, protože zdroj už měl snímek ve frontě
+        self._in_flight = set()
+        self._completed = deque()
+        self._done = threading.Condition()
+
+    def tracker(self, source_id):
+        """Tracker daného zdroje (vytvoří se při prvním snímku)."""
+        if source_id not in self.trackers:
+            self.trackers[source_id] = self.tracker_factory()
+        return self.trackers[source_id]
+
+    def process(self, frames):
+        """
+        Zpracuje snímky ve tvaru (source_id, seq, timestamp, FramePacket) – viz SourcePool.collect().
+        Vrací {source_id: detections}.
+        """
+        if not frames:
+            return {}
+
+        batched = self.detector.predict_batch([frame for _, _, _, frame in frames])
+
+        results = {}
+        for (source_id, seq, _, frame), detections in zip(frames, batched):
+            self.tracker(source_id).update(detections, seq, packet=frame)
+            results[source_id] = detections
+        return results
+
+    def submit(self, source_id, seq, timestamp, frame):
+        """
+        Zařadí snímek do BatchQueue bez čekání na výsledek. Vrací False, pokud
+        má zdroj ještě snímek ve frontě – nový snímek se pak přeskočí.
+        """
+        if self.queue is None:
+            raise RuntimeError("[MultiSourceDetector] submit() vyžaduje BatchQueue (queue).")
+        with self._done:
+            if source_id in self._in_flight:
+                self.skipped += 1
+                return False
+            self._in_flight.add(source_id)
+        try:
+            future = self.queue.submit(frame)
+        except Exception:
+            with self._done:
+                self._in_flight.discard(source_id)
+            raise
+        future.add_done_callback(lambda f: self._finish(source_id, seq, frame, f))
+        return True
+
+    def _finish(self, source_id, seq, frame, future):
+        with self._done:
+            self._completed.append((source_id, seq, frame, future))
+            self._done.notify_all()
+
+    def results(self, timeout=None):
+        """
+        Počká nejvýše timeout sekund na dokončené snímky ze submit() a vrátí je
+        jako [(source_id, seq, FramePacket, detections)]; trackery se aktualizují
+        v tomto (volajícím) vlákně. Chyba detektoru se propaguje.
+        """
+        with self._done:
+            if not self._completed:
+                self._done.wait(timeout)
+            completed = list(self._completed)
+            self._completed.clear()
+            for source_id, _, _, _ in completed:
+                self._in_flight.discard(source_id)
+
+        results = []
+        for source_id, seq, frame, future in completed:
+            detections = future.result()
+            self.tracker(source_id).update(detections, seq, packet=frame)
+            results.append((source_id, seq, frame, detections))
+        return results
+
+    def active_tracks(self, source_id):
+        return self.tracker(source_id).get_active_tracks()
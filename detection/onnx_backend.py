@@ -0,0 +1,169 @@
+# detection/onnx_backend.py
+import ast
+import hashlib
+import os
+import shutil
+
+import numpy as np
+
+from detection.letterbox import LetterboxPreprocessor
+from detection.tiling import nms
+
+
+def weights_hash(path, length=16):
+    """SHA-256 obsahu souboru s vahami (zkrácený) – klíč cache exportů."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:length]
+
+
+def cached_export_path(model_path, imgsz=640, cache_dir=None, suffix=".onnx"):
+    """Cesta k exportu: <cache_dir>/<jméno>.<hash vah>.<imgsz><suffix> (výchozí vedle modelu)."""
+    cache_dir = cache_dir or os.path.dirname(os.path.abspath(model_path))
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(cache_dir, f"{stem}.{weights_hash(model_path)}.{imgsz}{suffix}")
+
+
+def export_onnx(model_path, imgsz=640, cache_dir=None, dynamic=True):
+    """
+    Exportuje .pt váhy do ONNX – jen jednou; další starty použijí soubor z cache.
+    Samotný export potřebuje ultralytics (a torch), běh pak už ne.
+    """
+    if model_path.lower().endswith(".onnx"):
+        return model_path
+
+    target = cached_export_path(model_path, imgsz, cache_dir, ".onnx" if dynamic else ".static.onnx")
+    if os.path.exists(target):
+        print(f"[OnnxBackend] ♻️ ONNX z cache: {target}")
+        return target
+
+    from ultralytics import YOLO
+
+    print(f"[OnnxBackend] 📦 Export {model_path} → ONNX (imgsz={imgsz}, dynamic={dynamic})...")
+    exported = YOLO(model_path).export(format="onnx", imgsz=imgsz, dynamic=dynamic, simplify=True)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.move(str(exported), target)
+    print(f"[OnnxBackend] ✅ Uloženo: {target}")
+    return target
+
+
+def decode_predictions(pred, conf=0.25, iou=0.45, classes=None, max_det=300, agnostic=False):
+    """
+    Výstup YOLOv8 hlavy (4 + nc, N) pro jeden snímek → (xyxy, conf, cls)
+    v letterbox souřadnicích. Filtr tříd proběhne před NMS.
+    """
+    pred = pred.T                                  # (N, 4 + nc)
+    scores = pred[:, 4:]
+    if classes:
+        allowed = np.zeros(scores.shape[1], dtype=bool)
+        allowed[[c for c in classes if c < scores.shape[1]]] = True
+        scores = np.where(allowed, scores, 0.0)
+
+    cls_id = scores.argmax(axis=1)
+    best = scores[np.arange(len(scores)), cls_id]
+    keep = best > conf
+    if not keep.any():
+        return np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int32)
+
+    xywh, best, cls_id = pred[keep, :4], best[keep], cls_id[keep]
+    xyxy = np.empty_like(xywh)
+    xyxy[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+    xyxy[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+
+    index = nms(xyxy, best, iou, classes=None if agnostic else cls_id)[:max_det]
+    return xyxy[index].astype(np.float32), best[index].astype(np.float32), cls_id[index].astype(np.int32)
+
+
+class OnnxBoxes:
+    """Minimální náhrada ultralytics Boxes (xyxy, conf, cls jako NumPy)."""
+
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+
+    def __len__(self):
+        return len(self.conf)
+
+
+class OnnxResult:
+    def __init__(self, boxes, names):
+        self.boxes = boxes
+        self.names = names
+
+
+class OnnxYoloModel:
+    """
+    YOLOv8 přes ONNX Runtime (CPU) s vlastním letterboxem a NMS.
+
+    Volá se stejně jako ultralytics YOLO – model(obraz | [obrazy], conf=…,
+    iou=…, classes=…, imgsz=…, max_det=…) – a vrací výsledky s .boxes,
+    takže YoloAirborneDetector nepozná rozdíl. Přijme i hotový tensor
+    (N, 3, S, S) float32 z LetterboxPreprocessor – boxy pak zůstanou
+    v souřadnicích tensoru.
+    """
+
+    accepts_numpy = True
+
+    def __init__(self, onnx_path, intra_op_threads=0, inter_op_threads=1, names=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.path = onnx_path
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Statický export má pevnou dávku i rozlišení
+        self.static_batch = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+        self.static_size = model_input.shape[2] if isinstance(model_input.shape[2], int) else None
+        self.names = names or self._read_names()
+        self.preprocessor = LetterboxPreprocessor(self.static_size or 640, max_batch=self.static_batch or 8)
+
+    def _read_names(self):
+        """Jména tříd z metadat, která do ONNX zapisuje export ultralytics."""
+        meta = self.session.get_modelmeta().custom_metadata_map
+        try:
+            return ast.literal_eval(meta.get("names", "{}"))
+        except (ValueError, SyntaxError):
+            return {}
+
+    def to(self, device):
+        """Kompatibilita s ultralytics – backend běží vždy na CPU."""
+        return self
+
+    def __call__(self, source, conf=0.25, iou=0.45, classes=None, imgsz=640, max_det=300,
+                 agnostic_nms=False, **kwargs):
+        if isinstance(source, np.ndarray) and source.ndim == 4:
+            return self._run(source, None, conf, iou, classes, max_det, agnostic_nms)
+
+        images = source if isinstance(source, (list, tuple)) else [source]
+        size = self.static_size or int(imgsz)
+        results = []
+        step = self.preprocessor.max_batch
+        for start in range(0, len(images), step):
+            batch, meta = self.preprocessor.prepare(images[start:start + step], size)
+            results.extend(self._run(batch, meta, conf, iou, classes, max_det, agnostic_nms))
+        return results
+
+    def _run(self, batch, meta, conf, iou, classes, max_det, agnostic_nms):
+        if self.static_batch == 1 and len(batch) > 1:
+            outputs = np.concatenate([self.session.run(None, {self.input_name: batch[i:i + 1]})[0]
+                                      for i in range(len(batch))])
+        else:
+            outputs = self.session.run(None, {self.input_name: batch})[0]
+
+        results = []
+        for i, pred in enumerate(outputs):
+            xyxy, scores, cls_id = decode_predictions(pred, conf, iou, classes, max_det, agnostic_nms)
+            if meta is not None and len(xyxy):
+                LetterboxPreprocessor.scale_boxes(xyxy, meta[i])
+            results.append(OnnxResult(OnnxBoxes(xyxy, scores, cls_id), self.names))
+        return results
+
+    predict = __call__
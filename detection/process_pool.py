@@ -0,0 +1,284 @@
+# detection/process_pool.py
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from detection.detections import Detections
+from utils.frame_packet import FramePacket, as_image
+
+
+# Jak často se při čekání na výsledek kontroluje, že pracovní procesy žijí [s]
+_POLL_INTERVAL = 0.5
+
+
+def default_detector_factory(config):
+    """Detektor v pracovním procesu – vlastní model a vlastní torch / ONNX session."""
+    from detection.detector_yolo import YoloAirborneDetector
+    from detection.model_loader import ModelLoader
+
+    return YoloAirborneDetector(ModelLoader.load_from_config(config), config=config)
+
+
+def _worker_main(worker_id, shm_name, slot_bytes, config, factory, threads, tasks, results):
+    """Smyčka pracovního procesu: snímek ze sdílené paměti → detekce → strukturované pole."""
+    if threads:
+        # Jinak by každý proces chtěl všechna jádra a navzájem by se přetahovaly
+        os.environ["OMP_NUM_THREADS"] = str(threads)
+        os.environ["MKL_NUM_THREADS"] = str(threads)
+        # CPU profil je naměřený pro jeden proces na celý stroj – tady by limit přepsal
+        config.setdefault("detection", {})["cpu_profile"] = {"enabled": False}
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        detector = factory(config)
+        names = getattr(getattr(detector, "model", None), "names", {}) or {}
+        results.put(("ready", worker_id, dict(names)))
+
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, slot, shape = task
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+            try:
+                detections = detector.predict(frame)
+                if not isinstance(detections, Detections):
+                    detections = Detections.from_dicts(detections, names)
+                results.put(("ok", seq, slot, detections.to_structured()))
+            except Exception as e:
+                results.put(("error", seq, slot, repr(e)))
+            del frame
+    finally:
+        shm.close()
+
+
+class InferencePool:
+    """
+    N procesů s vlastním YoloAirborneDetector (obchází GIL i jednu torch session).
+
+    Snímky se předávají přes sloty v multiprocessing.shared_memory (bez
+    picklování obrazu), zpět putují jen kompaktní pole detekcí (DETECTION_DTYPE).
+    Výsledky se vrací v pořadí sekvenčních čísel snímků. Skončí-li některý
+    pracovní proces (pád modelu, OOM killer…), čekání na výsledek vyhodí
+    RuntimeError místo věčného blokování.
+    """
+
+    def __init__(self, config, workers=2, slots=None, max_frame_shape=(1280, 720),
+                 detector_factory=None, threads_per_worker=None, start_method="spawn"):
+        self.config = config
+        self.workers = max(1, workers)
+        self.slots = slots or 2 * self.workers
+        width, height = max_frame_shape
+        self.slot_bytes = int(width * height * 3)
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * self.slots)
+
+        ctx = mp.get_context(start_method)
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        self._free_slots = queue.Queue()
+        for slot in range(self.slots):
+            self._free_slots.put(slot)
+
+        self._lock = threading.Lock()
+        self._pending = {}      # seq → původní snímek / FramePacket
+        self._done = {}         # seq → Detections (čekají na přeuspořádání)
+        self._next_submit = 0
+        self._next_result = 0
+        self.names = {}
+        self.errors = 0
+
+        factory = detector_factory or default_detector_factory
+        self._processes = [
+            ctx.Process(
+                target=_worker_main,
+                args=(i, self._shm.name, self.slot_bytes, config, factory, threads_per_worker,
+                      self._tasks, self._results),
+                name=f"InferenceWorker-{i}",
+                daemon=True,
+            )
+            for i in range(self.workers)
+        ]
+        for process in self._processes:
+            process.start()
+        self._wait_ready()
+
+    @classmethod
+    def from_config(cls, config, detector_factory=None):
+        """Parametry ze sekce detection.pool."""
+        pool_cfg = config.get("detection", {}).get("pool", {}) or {}
+        workers = pool_cfg.get("workers", 2)
+        return cls(
+            config,
+            workers=workers,
+            slots=pool_cfg.get("slots_per_worker", 2) * workers,
+            max_frame_shape=tuple(pool_cfg.get("max_frame", (1280, 720))),
+            detector_factory=detector_factory,
+            threads_per_worker=pool_cfg.get("threads_per_worker") or max(1, (os.cpu_count() or 1) // workers),
+            start_method=pool_cfg.get("start_method", "spawn"),
+        )
+
+    def _wait_ready(self, timeout=300.0):
+        deadline = time.monotonic() + timeout
+        ready = 0
+        while ready < self.workers:
+            try:
+                kind, _, names = self._results.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                try:
+                    self._check_workers()
+                except RuntimeError:
+                    self.close()
+                    raise
+                if time.monotonic() >= deadline:
+                    self.close()
+                    raise RuntimeError("[InferencePool] Pracovní procesy nenastartovaly.")
+                continue
+            if kind == "ready":
+                ready += 1
+                self.names = self.names or names
+        print(f"[InferencePool] ✅ {self.workers} procesů, {self.slots} slotů po {self.slot_bytes / 1e6:.1f} MB")
+
+    def submit(self, frame):
+        """
+        Zkopíruje snímek do volného slotu sdílené paměti a zařadí ho.
+        Blokuje, pokud jsou všechny sloty obsazené. Vrací sekvenční číslo.
+        """
+        image = np.ascontiguousarray(as_image(frame), dtype=np.uint8)
+        if image.nbytes > self.slot_bytes:
+            raise ValueError(f"[InferencePool] Snímek {image.shape} je větší než slot ({self.slot_bytes} B).")
+
+        slot = self._acquire_slot()
+        target = np.ndarray(image.shape, dtype=np.uint8, buffer=self._shm.buf, offset=slot * self.slot_bytes)
+        np.copyto(target, image)
+        del target
+
+        with self._lock:
+            seq = self._next_submit
+            self._next_submit += 1
+            self._pending[seq] = frame
+        self._tasks.put((seq, slot, image.shape))
+        return seq
+
+    def _acquire_slot(self):
+        """Volný slot; při zaplnění mezitím vyzvedává hotové výsledky."""
+        while True:
+            try:
+                return self._free_slots.get_nowait()
+            except queue.Empty:
+                self._collect(timeout=1.0)
+
+    def _check_workers(self):
+        """RuntimeError, pokud některý pracovní proces skončil – jeho snímek by se nikdy nevrátil."""
+        for process in self._processes:
+            if process.exitcode is not None:
+                with self._lock:
+                    pending = sorted(seq for seq in self._pending if seq not in self._done)
+                raise RuntimeError(f"[InferencePool] Pracovní proces {process.name} skončil "
+                                   f"(exitcode {process.exitcode}), nevyřízené snímky: {pending}")
+
+    def _collect(self, timeout=None):
+        """
+        Převezme jeden výsledek z fronty (uvolní jeho slot). Čeká po krátkých
+        úsecích a mezi nimi kontroluje pracovní procesy (viz _check_workers).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = _POLL_INTERVAL if deadline is None else min(_POLL_INTERVAL, deadline - time.monotonic())
+            try:
+                message = self._results.get(timeout=max(wait, 0.0))
+                break
+            except queue.Empty:
+                self._check_workers()
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+        kind, seq, slot, payload = message
+        self._free_slots.put(slot)
+        if kind == "ok":
+            detections = Detections.from_structured(payload, names=self.names)
+        else:
+            self.errors += 1
+            print(f"[InferencePool] ❌ Snímek {seq}: {payload}")
+            detections = Detections(names=self.names)
+        with self._lock:
+            self._done[seq] = detections
+        return True
+
+    def get(self, timeout=None):
+        """Další výsledek v pořadí odeslání jako (seq, Detections), nebo None po timeoutu."""
+        while True:
+            with self._lock:
+                seq = self._next_result
+                if seq in self._done:
+                    detections = self._done.pop(seq)
+                    frame = self._pending.pop(seq)
+                    self._next_result += 1
+                    break
+                if seq >= self._next_submit:
+                    return None
+            if not self._collect(timeout):
+                return None
+
+        if isinstance(frame, FramePacket):
+            frame.detections = detections
+            frame.stamp("detected")
+        return seq, detections
+
+    def predict_batch(self, images):
+        """Stejné rozhraní jako YoloAirborneDetector.predict_batch (např. pro MultiSourceDetector)."""
+        seqs = [self.submit(image) for image in images]
+        results = {}
+        while len(results) < len(seqs):
+            item = self.get(timeout=None)
+            if item is None:
+                break
+            results[item[0]] = item[1]
+        return [results.get(seq, Detections(names=self.names)) for seq in seqs]
+
+    def predict(self, image):
+        return self.predict_batch([image])[0]
+
+    detect = predict
+
+    def map(self, frames):
+        """Offline zpracování: generuje (snímek, Detections) v původním pořadí, sloty drží procesy vytížené."""
+        order = {}
+        for frame in frames:
+            order[self.submit(frame)] = frame
+            while True:
+                with self._lock:
+                    ready = self._next_result in self._done
+                if not ready:
+                    break
+                seq, detections = self.get()
+                yield order.pop(seq), detections
+        while order:
+            item = self.get(timeout=None)
+            if item is None:
+                break
+            seq, detections = item
+            yield order.pop(seq), detections
+
+    def close(self):
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
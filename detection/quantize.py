@@ -0,0 +1,156 @@
+# detection/quantize.py
+import os
+
+import cv2
+
+from detection.letterbox import letterbox, to_tensor
+from detection.onnx_backend import export_onnx
+
+QUANT_MODES = ("static", "dynamic")
+_JPEG_EXTENSIONS = (".jpg", ".jpeg")
+
+
+def quantized_path(model_path):
+    """Stabilní jméno INT8 artefaktu vedle modelu: models/yolov8n.pt → models/yolov8n.int8.onnx."""
+    return os.path.splitext(model_path)[0] + ".int8.onnx"
+
+
+def load_calibration_frames(source, max_frames=200):
+    """Dekódované BGR snímky z adresáře JPEG, EVF záznamu nebo videa."""
+    return list(iter_frames(source, max_frames))
+
+
+def iter_frames(source, max_frames=None):
+    """
+    Líně dekódované BGR snímky z adresáře JPEG, jednoho JPEG, EVF záznamu
+    (přes mmap, všechny segmenty) nebo videa – v paměti je vždy jen aktuální snímek.
+    """
+    count = 0
+    if os.path.isdir(source):
+        paths = sorted(os.path.join(source, name) for name in os.listdir(source)
+                       if name.lower().endswith(_JPEG_EXTENSIONS))
+        for path in paths:
+            if max_frames is not None and count >= max_frames:
+                return
+            frame = cv2.imread(path, cv2.IMREAD_COLOR)
+            if frame is not None:
+                count += 1
+                yield frame
+        return
+
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"[Quantize] Zdroj snímků nenalezen: {source}")
+
+    if source.lower().endswith(_JPEG_EXTENSIONS):
+        frame = cv2.imread(source, cv2.IMREAD_COLOR)
+        if frame is not None:
+            yield frame
+        return
+
+    if source.lower().endswith(".evf"):
+        from camera.evf_recorder import EvfReplaySource
+
+        replay = EvfReplaySource(source, speed=0)
+        try:
+            for i in range(len(replay)):
+                if max_frames is not None and count >= max_frames:
+                    return
+                frame = cv2.imdecode(replay.read_jpeg(i), cv2.IMREAD_COLOR)
+                if frame is not None:
+                    count += 1
+                    yield frame
+        finally:
+            replay.stop()
+        return
+
+    cap = cv2.VideoCapture(source)
+    try:
+        while max_frames is None or count < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            count += 1
+            yield frame
+    finally:
+        cap.release()
+
+
+class _CalibrationReader:
+    """Podává letterbox snímky kalibrátoru ONNX Runtime (po jednom)."""
+
+    def __init__(self, frames, input_name, imgsz):
+        self._batches = iter([to_tensor([letterbox(frame, imgsz)[0]]) for frame in frames])
+        self.input_name = input_name
+
+    def get_next(self):
+        batch = next(self._batches, None)
+        return None if batch is None else {self.input_name: batch}
+
+    def rewind(self):
+        pass
+
+
+def _copy_metadata(src_path, dst_path):
+    """Přenese metadata exportu (jména tříd, imgsz) do kvantizovaného modelu."""
+    import onnx
+
+    src = onnx.load(src_path, load_external_data=False)
+    dst = onnx.load(dst_path)
+    existing = {prop.key for prop in dst.metadata_props}
+    for prop in src.metadata_props:
+        if prop.key not in existing:
+            dst.metadata_props.add(key=prop.key, value=prop.value)
+    onnx.save(dst, dst_path)
+
+
+def quantize_model(model_path, calibration=None, output=None, imgsz=640, mode="static", max_frames=200):
+    """
+    Vytvoří INT8 variantu modelu (.pt nebo .onnx).
+
+    static: váhy i aktivace INT8, rozsahy aktivací z kalibračních snímků
+            (adresář JPEG / *.evf záznam / video) – nejrychlejší na CPU.
+    dynamic: jen váhy INT8, aktivace se kvantují za běhu – bez kalibrace.
+    Vrací cestu k artefaktu (výchozí <model>.int8.onnx).
+    """
+    from onnxruntime.quantization import (CalibrationMethod, QuantFormat, QuantType,
+                                          quantize_dynamic, quantize_static)
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    if mode not in QUANT_MODES:
+        raise ValueError(f"[Quantize] Neznámý režim: {mode} (povoleno: {QUANT_MODES})")
+    output = output or quantized_path(model_path)
+
+    # Statická kvantizace potřebuje pevný tvar vstupu
+    float_path = export_onnx(model_path, imgsz=imgsz, dynamic=(mode == "dynamic"))
+    prepared = os.path.splitext(output)[0] + ".prep.onnx"
+    quant_pre_process(float_path, prepared, skip_symbolic_shape=True)
+
+    try:
+        if mode == "dynamic":
+            quantize_dynamic(prepared, output, weight_type=QuantType.QInt8)
+        else:
+            if not calibration:
+                raise ValueError("[Quantize] Statická kvantizace potřebuje kalibrační snímky.")
+            frames = load_calibration_frames(calibration, max_frames)
+            if not frames:
+                raise ValueError(f"[Quantize] Ve zdroji nejsou žádné snímky: {calibration}")
+            import onnxruntime as ort
+
+            input_name = ort.InferenceSession(prepared, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+            print(f"[Quantize] 🎯 Kalibrace na {len(frames)} snímcích z {calibration}")
+            quantize_static(
+                prepared, output,
+                _CalibrationReader(frames, input_name, imgsz),
+                quant_format=QuantFormat.QDQ,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+                per_channel=True,
+                calibrate_method=CalibrationMethod.MinMax,
+            )
+    finally:
+        if os.path.exists(prepared):
+            os.remove(prepared)
+
+    _copy_metadata(float_path, output)
+    print(f"[Quantize] ✅ INT8 model ({mode}): {output}")
+    return output
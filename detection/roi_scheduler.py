@@ -0,0 +1,81 @@
+# detection/roi_scheduler.py
+
+
+def square_region(cx, cy, side, shape):
+    """Čtverec o straně side se středem (cx, cy), posunutý dovnitř snímku → (x0, y0, x1, y1)."""
+    height, width = shape[:2]
+    side = int(min(side, width, height))
+    x0 = int(round(cx - side / 2.0))
+    y0 = int(round(cy - side / 2.0))
+    x0 = min(max(x0, 0), width - side)
+    y0 = min(max(y0, 0), height - side)
+    return x0, y0, x0 + side, y0 + side
+
+
+class TrackGuidedDetector:
+    """
+    Detekce řízená tracky: celý snímek jen jednou za refresh_interval snímků,
+    mezi tím jen výřezy kolem predikovaných poloh tracků (jednou dávkou).
+
+    Celý snímek se zpracuje také, když nejsou žádné tracky nebo je jich
+    víc než max_rois – pak by výřezy stejně nic neušetřily.
+    """
+
+    def __init__(self, detector, tracker, refresh_interval=10, margin=2.0, min_size=128,
+                 imgsz=320, max_rois=4):
+        self.detector = detector
+        self.tracker = tracker
+        self.refresh_interval = max(1, refresh_interval)
+        self.margin = margin
+        self.min_size = min_size
+        self.imgsz = imgsz
+        self.max_rois = max_rois
+        self.full_frames = 0
+        self.roi_frames = 0
+        self._since_full = None
+
+    @classmethod
+    def from_config(cls, detector, tracker, config):
+        """Parametry ze sekce detection.roi."""
+        roi_cfg = config.get("detection", {}).get("roi", {}) or {}
+        return cls(
+            detector,
+            tracker,
+            refresh_interval=roi_cfg.get("refresh_interval", 10),
+            margin=roi_cfg.get("margin", 2.0),
+            min_size=roi_cfg.get("min_size", 128),
+            imgsz=roi_cfg.get("imgsz", 320),
+            max_rois=roi_cfg.get("max_rois", 4),
+        )
+
+    def regions(self, tracks, shape):
+        """Čtvercové výřezy kolem predikovaných boxů, posunuté dovnitř snímku."""
+        regions = []
+        for track in tracks:
+            x1, y1, x2, y2 = track.predicted_bbox()
+            side = max(self.min_size, self.margin * max(x2 - x1, y2 - y1))
+            regions.append(square_region((x1 + x2) / 2.0, (y1 + y2) / 2.0, side, shape))
+        return regions
+
+    def detect(self, frame):
+        """Detekce pro jeden snímek (np.ndarray nebo FramePacket)."""
+        from utils.frame_packet import as_image
+
+        tracks = self.tracker.get_active_tracks()
+        refresh_due = self._since_full is None or self._since_full + 1 >= self.refresh_interval
+        if refresh_due or not tracks or len(tracks) > self.max_rois:
+            self._since_full = 0
+            self.full_frames += 1
+            return self.detector.predict(frame)
+
+        self._since_full += 1
+        self.roi_frames += 1
+        return self.detector.predict_regions(frame, self.regions(tracks, as_image(frame).shape), self.imgsz)
+
+    predict = detect
+
+    @property
+    def roi_ratio(self):
+        """Podíl snímků zpracovaných jen ve výřezech."""
+        total = self.full_frames + self.roi_frames
+        return self.roi_frames / total if total else 0.0
@@ -0,0 +1,85 @@
+# detection/tiling.py
+import math
+
+import numpy as np
+
+from detection.detections import Detections
+
+
+def _axis_starts(length, tile, overlap_px):
+    """Počátky dlaždic podél jedné osy – rovnoměrně, poslední končí na okraji."""
+    if length <= tile:
+        return [0]
+    stride = max(1, tile - overlap_px)
+    count = math.ceil((length - overlap_px) / stride)
+    return np.linspace(0, length - tile, count).round().astype(int).tolist()
+
+
+def tile_grid(height, width, tile_size=640, overlap=0.2):
+    """
+    Rozdělí snímek na překrývající se dlaždice.
+    overlap je podíl velikosti dlaždice (0.2 → 20 %). Vrací seznam (x0, y0, x1, y1).
+    """
+    overlap_px = int(tile_size * overlap)
+    return [
+        (x0, y0, min(x0 + tile_size, width), min(y0 + tile_size, height))
+        for y0 in _axis_starts(height, tile_size, overlap_px)
+        for x0 in _axis_starts(width, tile_size, overlap_px)
+    ]
+
+
+def box_iou(box, boxes):
+    """IoU jednoho boxu (4,) vůči poli boxů (N, 4)."""
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / np.maximum(area + areas - inter, 1e-9)
+
+
+def nms(boxes, scores, iou_threshold=0.5, classes=None):
+    """
+    Greedy NMS nad NumPy poli; IoU se počítá vektorově vůči všem zbývajícím boxům.
+    S classes se potlačují jen boxy stejné třídy (posun souřadnic o třídu).
+    Vrací indexy ponechaných boxů seřazené podle skóre.
+    """
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    boxes = np.asarray(boxes, dtype=np.float32)
+    if classes is not None:
+        boxes = boxes + (np.asarray(classes, dtype=np.float32) * (boxes.max() + 1))[:, None]
+
+    order = np.argsort(-np.asarray(scores), kind="stable")
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        if order.size == 1:
+            break
+        rest = order[1:]
+        order = rest[box_iou(boxes[i], boxes[rest]) <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def merge_tiles(tile_detections, offsets, iou_threshold=0.5, agnostic=False, names=None):
+    """
+    Posune detekce z dlaždic do souřadnic snímku a odstraní duplicity na švech.
+    tile_detections: seznam Detections, offsets: seznam (x0, y0) ve stejném pořadí.
+    """
+    parts = [dets for dets in tile_detections if len(dets)]
+    if not parts:
+        return Detections(names=names)
+
+    shifts = np.concatenate([
+        np.tile([x0, y0, x0, y0], (len(dets), 1))
+        for dets, (x0, y0) in zip(tile_detections, offsets) if len(dets)
+    ]).astype(np.float32)
+    xyxy = np.concatenate([dets.xyxy for dets in parts]) + shifts
+    conf = np.concatenate([dets.conf for dets in parts])
+    cls_id = np.concatenate([dets.cls_id for dets in parts])
+
+    keep = nms(xyxy, conf, iou_threshold, classes=None if agnostic else cls_id)
+    return Detections(xyxy[keep], conf[keep], cls_id[keep], names=names or parts[0].names)
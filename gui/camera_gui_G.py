@@ -13,31 +13,40 @@ Updated on Mon Nov  3 2025
 
 import sys
 import os
+import threading
 import time
 import cv2
 import numpy as np
 from PyQt6 import QtCore, QtGui, QtWidgets
 
 from camera.camera_canon_G import CanonCamera
+from camera.capture_thread import CaptureThread
+from camera.edsdk_backend import create_edsdk
+from camera.jpeg_decoder import JpegDecoder
+from utils.frame_buffer import FrameMailbox
+from utils.frame_packet import as_image
 
 
 class CameraWorker(QtCore.QThread):
-    """Vlákno pro získávání snímků z kamery."""
-    frame_ready = QtCore.pyqtSignal(np.ndarray)
+    """Vlákno pro předávání snímků (FramePacket) z kamery do GUI."""
+    frame_ready = QtCore.pyqtSignal(object)
 
-    def __init__(self, camera):
+    def __init__(self, camera, buffer_depth=3):
         super().__init__()
         self.camera = camera
+        self.capture = CaptureThread(camera, buffer_depth=buffer_depth)
         self.running = False
 
     def run(self):
         print("[CameraWorker] Smyčka spuštěna.")
         self.running = True
+        self.capture.start()
         while self.running:
-            frame = self.camera.get_frame()
-            if frame is not None:
-                self.frame_ready.emit(frame)
-            time.sleep(0.05)
+            # Čeká na nový snímek ze snímacího vlákna – žádné pevné tempo
+            item = self.capture.next(timeout=0.2)
+            if item is not None:
+                self.frame_ready.emit(item[2])
+        self.capture.stop()
         print("[CameraWorker] Smyčka ukončena.")
 
     def stop(self):
@@ -45,26 +54,27 @@ class CameraWorker(QtCore.QThread):
 
 
 class DetectorWorker(QtCore.QThread):
-    """Vlákno pro YOLO detekci."""
+    """Vlákno pro YOLO detekci – čeká na snímek ve schránce (nejnovější vyhrává)."""
     detection_ready = QtCore.pyqtSignal(np.ndarray)
 
-    def __init__(self, detector):
+    def __init__(self, detector, capacity=1):
         super().__init__()
         self.detector = detector
         self.running = False
-        self.last_frame = None
+        self.mailbox = FrameMailbox(capacity)
 
     def set_frame(self, frame):
-        self.last_frame = frame
+        self.mailbox.put(frame)
 
     def run(self):
         print("[DetectorWorker] Smyčka spuštěna.")
         self.running = True
         while self.running:
-            if self.last_frame is not None and self.detector is not None:
+            frame = self.mailbox.get(timeout=0.5)
+            if frame is not None and self.detector is not None:
                 try:
-                    detections = self.detector.detect(self.last_frame)
-                    vis = self.last_frame.copy()
+                    detections = self.detector.detect(frame)
+                    vis = as_image(frame).copy()
                     for det in detections:
                         x1, y1, x2, y2 = map(int, det["bbox"])
                         conf = det["conf"]
@@ -81,25 +91,29 @@ class DetectorWorker(QtCore.QThread):
                             cv2.LINE_AA,
                         )
                     self.detection_ready.emit(vis)
-                    self.last_frame = None
                 except Exception as e:
                     print(f"[DetectorWorker] ⚠️ Chyba při detekci: {e}")
                     time.sleep(0.05)
-            time.sleep(0.03)
-        print("[DetectorWorker] Smyčka ukončena.")
+        print(f"[DetectorWorker] Smyčka ukončena. Snímky: {self.mailbox.stats()}")
 
     def stop(self):
         self.running = False
+        self.mailbox.close()
 
 
 class CameraGUI(QtWidgets.QMainWindow):
     """Hlavní GUI aplikace."""
-    def __init__(self, sdk_path, detector=None):
+    resolution_changed = QtCore.pyqtSignal(int)
+
+    def __init__(self, sdk_path, detector=None, config=None, models=None, resolution=None):
         super().__init__()
 
         self.setWindowTitle("AirborneTracker GUI")
         self.sdk_path = sdk_path
         self.detector = detector
+        self.models = models  # SwitchableDetector – přepínání modelů bez restartu
+        self.resolution = resolution  # ResolutionController – aktuální input_size
+        self.config = config or {}
         self.cam = None
         self.last_frame = None
 
@@ -108,7 +122,13 @@ class CameraGUI(QtWidgets.QMainWindow):
 
         # 🟢 Inicializace kamery
         try:
-            self.cam = CanonCamera(self.sdk_path, debug=True)
+            self.cam = CanonCamera(
+                self.sdk_path,
+                debug=True,
+                decoder=JpegDecoder.from_config(self.config),
+                edsdk=create_edsdk(self.config),
+                dedupe=self.config.get("camera", {}).get("dedupe", True),
+            )
             self.cam.initialize()
             self.cam.start_liveview()
             print("[GUI] ✅ Kamera inicializována a LiveView běží.")
@@ -141,6 +161,20 @@ class CameraGUI(QtWidgets.QMainWindow):
 
         layout = QtWidgets.QVBoxLayout()
         layout.addWidget(self.video_label)
+
+        if self.models is not None:
+            self.model_combo = QtWidgets.QComboBox()
+            self.model_combo.addItems(self.models.registry.available())
+            self.model_combo.setCurrentText(self.models.active_name)
+            self.model_combo.currentTextChanged.connect(self.switch_model)
+            layout.addWidget(self.model_combo)
+        if self.resolution is not None:
+            self.resolution_label = QtWidgets.QLabel(f"Vstup modelu: {self.resolution.imgsz} px")
+            self.resolution_changed.connect(
+                lambda imgsz: self.resolution_label.setText(f"Vstup modelu: {imgsz} px"))
+            # Listener běží v detekčním vlákně – do GUI jen přes signál
+            self.resolution.add_listener(self.resolution_changed.emit)
+            layout.addWidget(self.resolution_label)
         layout.addWidget(self.start_button)
         layout.addWidget(self.stop_button)
         layout.addWidget(self.save_button)
@@ -175,6 +209,20 @@ class CameraGUI(QtWidgets.QMainWindow):
             self.detector_thread.start()
             print("[GUI] ✅ Detekční thread spuštěn.")
 
+    def switch_model(self, name):
+        """Přepne model; načtení nového modelu běží mimo GUI vlákno."""
+        if not name or self.models is None:
+            return
+        print(f"[GUI] 🔀 Přepínám model na: {name}")
+
+        def _switch():
+            try:
+                self.models.switch(name)
+            except Exception as e:
+                print(f"[GUI] ❌ Model '{name}' se nepodařilo načíst: {e}")
+
+        threading.Thread(target=_switch, name="ModelSwitch", daemon=True).start()
+
     def _set_frame_for_detector(self, frame):
         if self.detector_thread:
             self.detector_thread.set_frame(frame)
@@ -200,17 +248,22 @@ class CameraGUI(QtWidgets.QMainWindow):
 
     def save_frame(self):
         """Uloží aktuální snímek do složky 'foto'."""
-        if self.last_frame is None:
+        # Plné rozlišení se dekóduje až teď (kamera může dekódovat zmenšeně)
+        frame = self.cam.get_full_frame() if self.cam else None
+        if frame is None:
+            frame = self.last_frame
+        if frame is None:
             print("[GUI] ⚠️ Není co uložit – žádný snímek není k dispozici.")
             return
         os.makedirs("foto", exist_ok=True)
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         filename = os.path.join("foto", f"snimek_{timestamp}.jpg")
-        cv2.imwrite(filename, self.last_frame)
+        cv2.imwrite(filename, frame)
         print(f"[GUI] 💾 Snímek uložen: {filename}")
 
     def update_view(self, frame):
         """Aktualizace zobrazeného obrazu."""
+        frame = as_image(frame)
         if frame is None:
             return
         self.last_frame = frame.copy()
@@ -236,10 +289,10 @@ class CameraGUI(QtWidgets.QMainWindow):
         event.accept()
 
 
-def run_gui(sdk_path, detector=None):
+def run_gui(sdk_path, detector=None, config=None, models=None, resolution=None):
     """Spuštění GUI aplikace."""
     print(f"[run_gui] sdk_path={sdk_path}")
     app = QtWidgets.QApplication(sys.argv)
-    gui = CameraGUI(sdk_path, detector=detector)
+    gui = CameraGUI(sdk_path, detector=detector, config=config, models=models, resolution=resolution)
     gui.show()
     sys.exit(app.exec())
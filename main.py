@@ -20,14 +20,23 @@ import yaml
 from camera.camera_manager import CameraManager
 from detection.model_loader import ModelLoader
 from detection.detector_yolo import YoloAirborneDetector
+from detection.adaptive_resolution import AdaptiveResolutionDetector
+from detection.cascade import CascadeDetector
+from detection.dedupe import DuplicateFrameDetector
+from detection.motion_gate import MotionGatedDetector
+from detection.roi_scheduler import TrackGuidedDetector
 from tracking.object_tracking_manager import ObjectTrackingManager
 from config.config_loader import ConfigLoader
 
 from utils.logger import Logger as AppLogger
 from utils.visualizer import Visualizer
-from utils.performance_timer import PerformanceTimer
+from utils.performance_timer import PerformanceTimer, latency_stats
 from utils.logger import Logger
 from camera.camera_canon import CanonCamera
+from camera.capture_thread import CaptureThread
+from camera.edsdk_backend import create_edsdk
+from camera.evf_recorder import EvfRecorder, EvfReplaySource
+from camera.jpeg_decoder import JpegDecoder
 
 
 def main():
@@ -47,25 +56,70 @@ def main():
     logger = AppLogger(cfg["logging"])
 
     # 3. Načti model
-    model = ModelLoader.load_model(cfg["detection"]["model_path"])
-    detector = YoloAirborneDetector(
-        model,
-        config=cfg
-        )
-
+    model = ModelLoader.load_from_config(cfg)
+    if cfg["detection"].get("cascade", {}).get("enabled", False):
+        # Levné návrhy na celém snímku, specializovaný model jen na výřezech
+        detector = CascadeDetector.from_config(cfg, loaded={cfg["detection"].get("active_model", "default"): model})
+    else:
+        detector = YoloAirborneDetector(
+            model,
+            config=cfg
+            )
+    cascade_detector = detector if isinstance(detector, CascadeDetector) else None
+
+
+    # Rozlišení vstupu podle latence – tracking drží tempo i při vytíženém CPU
+    adaptive_detector = None
+    if cfg["detection"].get("adaptive_resolution", {}).get("enabled", False):
+        adaptive_detector = AdaptiveResolutionDetector.from_config(detector, cfg)
+        adaptive_detector.controller.add_listener(
+            lambda imgsz: logger.log(f"Adaptive resolution: input size {imgsz}"))
+        detector = adaptive_detector
 
     # 4. Inicializuj kameru / video
-    from camera.camera_canon import CanonCamera
-    cam = CanonCamera(sdk_path=r"C:\Users\Milan\Projekty\Cuda\EDSDKv131910W\Windows\EDSDK_64\Dll\EDSDK.dll")
-    cam.initialize()
-
-    cam.start_liveview()
-
+    if cfg["camera"].get("replay"):
+        # Přehrání dřívějšího EVF záznamu místo živé kamery
+        cam = EvfReplaySource(cfg["camera"]["replay"],
+                              speed=cfg["camera"].get("replay_speed", 1.0),
+                              decoder=JpegDecoder.from_config(cfg))
+        recorder = None
+    else:
+        from camera.camera_canon import CanonCamera
+        cam = CanonCamera(sdk_path=r"C:\Users\Milan\Projekty\Cuda\EDSDKv131910W\Windows\EDSDK_64\Dll\EDSDK.dll",
+                          decoder=JpegDecoder.from_config(cfg),
+                          edsdk=create_edsdk(cfg),
+                          dedupe=cfg["camera"].get("dedupe", True))
+        cam.initialize()
+
+        cam.start_liveview()
+        recorder = EvfRecorder.from_config(cfg)
+
+    # Snímání běží ve vlastním vlákně – výpadky SDK neblokují detekci
+    capture = CaptureThread(cam, buffer_depth=cfg["camera"].get("buffer_depth", 3), recorder=recorder)
+    capture.start()
 
     # 5. Inicializuj tracker
     tracker_mgr = ObjectTrackingManager(max_lost=cfg["tracking"]["max_lost"],
                                         iou_threshold=cfg["tracking"]["iou_threshold"])
 
+    # Mezi periodickými průchody celým snímkem detekuj jen kolem tracků
+    roi_detector = None
+    if cfg["detection"].get("roi", {}).get("enabled", False):
+        roi_detector = TrackGuidedDetector.from_config(detector, tracker_mgr, cfg)
+    active_detector = roi_detector or detector
+
+    # Statická obloha se nedetekuje vůbec, malý pohyb jen ve výřezech
+    motion_detector = None
+    if cfg["detection"].get("motion", {}).get("enabled", False):
+        motion_detector = MotionGatedDetector.from_config(active_detector, cfg)
+        active_detector = motion_detector
+
+    # Opakovaný EVF snímek (stejný otisk JPEG) – detekce z minula, bez inference
+    dedupe_detector = None
+    if cfg["camera"].get("dedupe", True):
+        dedupe_detector = DuplicateFrameDetector(active_detector)
+        active_detector = dedupe_detector
+
     # 6. Vizualizátor
     visualizer = Visualizer(display=cfg["visualizer"]["display"],
                             save_output=cfg["visualizer"]["save_output"],
@@ -75,24 +129,35 @@ def main():
     perf_timer = PerformanceTimer()
 
     frame_id = 0
+    stale_frames = 0
+    latencies = []
+    max_frame_age = cfg["camera"].get("max_frame_age", 0)
     try:
         while True:
-            frame = cam.get_frame()
-            if frame is None:
+            item = capture.next(timeout=cfg["camera"].get("frame_timeout", 5.0))
+            if item is None:
                 break
+            _, _, packet = item
 
+            # Zastaralý snímek (detekce nestíhá) – raději počkat na čerstvý
+            if max_frame_age and packet.age() > max_frame_age:
+                stale_frames += 1
+                continue
+
+            frame = packet.image
             frame_id += 1
             perf_timer.start()
 
             # Detekce
-            detections = detector.detect(frame)
+            detections = active_detector.detect(packet)
 
             # Sledování
-            tracker_mgr.update(detections, frame_id)
+            tracker_mgr.update(detections, frame_id, packet=packet)
             tracks = tracker_mgr.get_active_tracks()
 
             # Vizualizace
-            visualizer.draw(frame, detections, tracks)
+            frame = visualizer.draw(packet, detections, tracks)
+            latencies.append(packet.latency("visualized"))
 
             # Logování
             for tr in tracks:
@@ -110,15 +175,35 @@ def main():
                 if cv2.waitKey(1) & 0xFF == ord('q'):
                     break
 
+        capture.stop()
         cam.stop()
         cv2.destroyAllWindows()
 
     except KeyboardInterrupt:
+        capture.stop()
         cam.stop()
         cv2.destroyAllWindows()
         logger.log("Interrupted by user")
 
+    if recorder is not None:
+        recorder.close()
+
     logger.log(f"Processed {frame_id} frames. Avg FPS: {perf_timer.get_fps():.2f}")
+    stats = latency_stats(latencies)
+    logger.log(f"Glass-to-glass latency: p50={stats['p50_ms']:.1f} ms, p95={stats['p95_ms']:.1f} ms, "
+               f"stale frames skipped: {stale_frames}, dropped in buffer: {capture.dropped}")
+    if roi_detector is not None:
+        logger.log(f"ROI inference: {roi_detector.roi_frames} frames, full frame: {roi_detector.full_frames} "
+                   f"({roi_detector.roi_ratio:.0%} ROI)")
+    if cascade_detector is not None:
+        logger.log(f"Cascade: {cascade_detector.stats()}")
+    if adaptive_detector is not None:
+        logger.log(f"Adaptive resolution: {adaptive_detector.stats()}")
+    if dedupe_detector is not None:
+        logger.log(f"Duplicate frames: {getattr(cam, 'duplicates', 0)} not decoded, "
+                   f"{dedupe_detector.stats()} ({dedupe_detector.reuse_ratio:.0%} inference reused)")
+    if motion_detector is not None:
+        logger.log(f"Motion gate: {motion_detector.stats()} ({motion_detector.skip_ratio:.0%} skipped)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
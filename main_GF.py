@@ -7,16 +7,20 @@ Upraveno: přidána možnost výběru dvou modelů YOLO (standardní a M150)
 
 import os
 import sys
-import torch
 import logging
 from datetime import datetime
 
 # --- Vlastní moduly ---
+from detection.adaptive_resolution import AdaptiveResolutionDetector
+from detection.cascade import CascadeDetector
+from detection.dedupe import DuplicateFrameDetector
 from detection.detector_yolo import YoloAirborneDetector
+from detection.model_loader import ModelLoader
+from detection.model_registry import ModelRegistry, SwitchableDetector
+from detection.motion_gate import MotionGatedDetector
 from gui.camera_gui_G import run_gui
 from utils.config_loader import ConfigLoader
 from utils.logger_G import setup_logger
-from ultralytics import YOLO
 
 
 def main():
@@ -36,10 +40,6 @@ def main():
     # === Cesty ===
     sdk_path = r"C:\Users\Milan\Projekty\Cuda\EDSDKv131910W\Windows\EDSDK_64\Dll\EDSDK.dll"
 
-    # === Definuj oba modely ===
-    model_default = os.path.join("models", "yolov8n.pt")
-    model_m150 = os.path.join("models", "yolo8nM150.pt")
-
     # --- Zjisti, který model použít ---
     # 1️⃣ Nejprve z konfigurace (pokud existuje klíč)
     active_model = "default"
@@ -51,10 +51,8 @@ def main():
         active_model = "m150"
 
     # 3️⃣ Nastav cestu k modelu podle volby
-    if active_model == "m150":
-        model_path = model_m150
-    else:
-        model_path = model_default
+    config.setdefault("detection", {})["active_model"] = active_model
+    model_path = ModelLoader.resolve_model_path(config["detection"]) or os.path.join("models", "yolov8n.pt")
 
     logging.info(f"[main_GF] 🔍 Aktivní model: {active_model.upper()} -> {model_path}")
 
@@ -62,27 +60,47 @@ def main():
         logging.error(f"❌ Modelový soubor nebyl nalezen: {model_path}")
         sys.exit(1)
 
-    # === Inicializace YOLO modelu ===
-    logging.info(f"Načítám YOLO model z: {model_path}")
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    logging.info(f"✅ Použité zařízení: {device.upper()}")
-
+    # === Inicializace YOLO modelu (torch se importuje až tady, včetně warm-upu) ===
     try:
-        model = YOLO(model_path)
-        model.to(device)
+        model = ModelLoader.load_from_config(config)
         logging.info(f"✅ YOLO model úspěšně načten ({model_path})")
     except Exception as e:
         logging.error(f"❌ Chyba při načítání YOLO modelu: {e}")
         sys.exit(1)
 
-    # === Inicializace detektoru ===
-    detector = YoloAirborneDetector(model, config)
-    logging.info("[main_GF] ✅ Detektor inicializován.")
+    # === Inicializace detektoru – další modely se načtou při přepnutí v GUI ===
+    registry = ModelRegistry.from_config(config)
+    registry.add(active_model, YoloAirborneDetector(model, config))
+    models = SwitchableDetector(registry, active_model)
+    detector = models
+
+    if config.get("detection", {}).get("cascade", {}).get("enabled", False):
+        # Kaskáda má modely pevně dané stupni – přepínání modelů v GUI se vypne
+        detector = CascadeDetector.from_config(config, loaded={active_model: model})
+        models = None
+        logging.info("[main_GF] 🪜 Kaskáda: návrhy proposeru ověřuje verifier na výřezech.")
+    logging.info(f"[main_GF] ✅ Detektor inicializován (modely k přepnutí: {registry.available()}).")
+
+    resolution = None
+    if config.get("detection", {}).get("adaptive_resolution", {}).get("enabled", False):
+        detector = AdaptiveResolutionDetector.from_config(detector, config)
+        resolution = detector.controller
+        logging.info(f"[main_GF] 📐 Adaptivní rozlišení vstupu: {resolution.levels}")
+
+    if config.get("detection", {}).get("motion", {}).get("enabled", False):
+        detector = MotionGatedDetector.from_config(detector, config)
+        logging.info("[main_GF] 🌤️ Detekce pohybu zapnuta – statická obloha se přeskakuje.")
+
+    if config.get("camera", {}).get("dedupe", True):
+        detector = DuplicateFrameDetector(detector)
 
     # === Spuštění GUI (bez trackeru) ===
     run_gui(
         sdk_path=sdk_path,
-        detector=detector
+        detector=detector,
+        config=config,
+        models=models,
+        resolution=resolution,
     )
 
 
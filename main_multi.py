@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Více kamer (Canon EVF + UVC/RTSP) s jedním sdíleným YOLO modelem.
+Snímky ze všech zdrojů jdou do jedné dávky, detekce se vrací do trackerů po zdrojích.
+S detection.batch.max_wait_ms > 0 skládá dávky BatchQueue z asynchronně zařazených snímků.
+@author: Milan
+"""
+
+# main_multi.py
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+
+from camera.source_pool import SourcePool
+from config.config_loader import ConfigLoader
+from detection.batch_queue import BatchQueue
+from detection.dedupe import DuplicateFrameDetector
+from detection.detector_yolo import YoloAirborneDetector
+from detection.model_loader import ModelLoader
+from detection.multi_source import MultiSourceDetector
+from detection.process_pool import InferencePool
+from tracking.object_tracking_manager import ObjectTrackingManager
+from utils.logger import Logger
+from utils.performance_timer import PerformanceTimer, latency_stats
+from utils.visualizer import Visualizer
+
+
+def main():
+    cfg = ConfigLoader.load("configs/default_config.yaml")
+
+    logger_cfg = cfg["logging"]
+    logger = Logger(
+        log_to_console=logger_cfg["log_to_console"],
+        log_to_file=logger_cfg["log_to_file"],
+        log_file_path=logger_cfg["log_file_path"]
+    )
+    logger.info("AirborneTracker SDK (více zdrojů) startuje...")
+
+    # Jeden model pro všechny kamery – nebo pool procesů, každý s vlastním modelem
+    pool_workers = cfg["detection"].get("pool", {}).get("workers", 0)
+    if pool_workers:
+        detector = InferencePool.from_config(cfg)
+    else:
+        detector = YoloAirborneDetector(ModelLoader.load_from_config(cfg), config=cfg)
+    # Duplicitní EVF snímky (stejný otisk JPEG) se do dávky vůbec nedostanou
+    dedupe_detector = DuplicateFrameDetector(detector) if cfg["camera"].get("dedupe", True) else None
+    # Asynchronní dávkování: snímek jde do fronty hned po zachycení, dávka odejde
+    # plná nebo po max_wait_ms; 0 = synchronní dávka ze SourcePool.collect()
+    batch_cfg = cfg["detection"].get("batch", {}) or {}
+    queue = None
+    if batch_cfg.get("max_wait_ms", 20) > 0:
+        queue = BatchQueue.from_config(dedupe_detector or detector, cfg)
+    multi = MultiSourceDetector(
+        dedupe_detector or detector,
+        tracker_factory=lambda: ObjectTrackingManager(
+            max_lost=cfg["tracking"]["max_lost"],
+            iou_threshold=cfg["tracking"]["iou_threshold"],
+        ),
+        queue=queue,
+    )
+
+    pool = SourcePool.from_config(cfg)
+    if not len(pool):
+        logger.error("Žádný zdroj se nepodařilo otevřít – končím.")
+        if pool_workers:
+            detector.close()
+        return
+
+    visualizers = {
+        source_id: Visualizer(display=cfg["visualizer"]["display"], window_name=f"AirborneTracker [{source_id}]")
+        for source_id in pool.sources
+    }
+    perf_timer = PerformanceTimer()
+    latencies = []
+    timeout = cfg["camera"].get("frame_timeout", 5.0)
+
+    if queue is not None:
+        queue.start()
+        pool.on_packet = multi.submit
+    pool.start()
+    try:
+        while True:
+            if queue is not None:
+                done = multi.results(timeout=timeout)
+            else:
+                frames = pool.collect(timeout=timeout)
+                results = multi.process(frames)
+                done = [(source_id, seq, packet, results[source_id]) for source_id, seq, _, packet in frames]
+            if not done:
+                logger.warning("Žádný zdroj nedodal snímek – končím.")
+                break
+
+            perf_timer.frame_count += len(done)
+
+            for source_id, seq, packet, detections in done:
+                tracks = multi.active_tracks(source_id)
+                visualizers[source_id].draw(packet, detections, tracks)
+                latencies.append(packet.latency("visualized"))
+                for tr in tracks:
+                    logger.log(f"[{source_id}] Frame {seq}, TrackID {tr.track_id}, BBox {tr.bbox}")
+
+            if cfg["visualizer"]["display"] and cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+    except KeyboardInterrupt:
+        logger.log("Interrupted by user")
+    finally:
+        pool.stop()
+        if queue is not None:
+            queue.stop()
+        if pool_workers:
+            detector.close()
+        for visualizer in visualizers.values():
+            visualizer.close()
+
+    logger.log(f"Processed {perf_timer.frame_count} frames. Avg FPS: {perf_timer.get_fps():.2f}, "
+               f"dropped: {pool.dropped()}")
+    if queue is not None:
+        logger.log(f"Batches: {queue.batches}, mean size {queue.mean_batch_size:.2f}, "
+                   f"skipped while in flight: {multi.skipped}")
+    stats = latency_stats(latencies)
+    logger.log(f"Glass-to-glass latency: p50={stats['p50_ms']:.1f} ms, p95={stats['p95_ms']:.1f} ms")
+    if dedupe_detector is not None:
+        logger.log(f"Duplicate frames: {pool.duplicates()} not decoded, "
+                   f"{dedupe_detector.stats()} ({dedupe_detector.reuse_ratio:.0%} inference reused)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,420 @@
 # Modul: tests/test_camera.py
+import numpy as np
+import pytest
+
+from camera.capture_thread import CaptureThread
+
+
+class _CountingCamera:
+    """Jednoduchá náhrada kamery – každý snímek nese své pořadí v prvním pixelu."""
+
+    def __init__(self, fail_every=0):
+        self.count = 0
+        self.fail_every = fail_every
+
+    def get_frame(self):
+        self.count += 1
+        if self.fail_every and self.count % self.fail_every == 0:
+            return None
+        frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        frame[0, 0, 0] = self.count % 256
+        return frame
+
+
+def test_capture_thread_delivers_increasing_sequence():
+    """Snímací vlákno plní buffer a next() vrací rostoucí sekvenční čísla."""
+    capture = CaptureThread(_CountingCamera(fail_every=3), buffer_depth=2)
+    capture.start()
+    try:
+        seqs = []
+        for _ in range(5):
+            item = capture.next(timeout=1.0)
+            assert item is not None, "Snímací vlákno nedodalo snímek."
+            seqs.append(item[0])
+        assert seqs == sorted(seqs)
+        assert len(set(seqs)) == len(seqs)
+    finally:
+        capture.stop()
+
+    assert capture.buffer.closed, "Po stop() má být buffer uzavřen."
+
+
+def _jpeg(width, height):
+    import cv2
+    frame = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    ok, buf = cv2.imencode(".jpg", frame)
+    assert ok
+    return buf
+
+
+def test_jpeg_decoder_reduced_keeps_target_size():
+    """Režim 'reduced' zvolí největší redukci, která nezmenší snímek pod target."""
+    from camera.jpeg_decoder import JpegDecoder
+
+    decoder = JpegDecoder(mode="reduced", target_size=640)
+    data = _jpeg(2560, 1440)
+
+    first = decoder.decode(data)
+    assert first.shape[:2] == (1440, 2560), "První snímek se dekóduje celý."
+
+    reduced = decoder.decode(data)
+    assert reduced.shape[:2] == (360, 640)
+    assert decoder.decode_full(data).shape[:2] == (1440, 2560)
+
+
+def test_jpeg_decoder_resize_and_from_config():
+    """Režim 'resize' zmenší delší stranu na cílovou velikost z configu."""
+    from camera.jpeg_decoder import JpegDecoder
+
+    cfg = {"camera": {"decode": {"mode": "resize", "target": "detector"}},
+           "detection": {"input_size": 320}}
+    decoder = JpegDecoder.from_config(cfg)
+    assert decoder.target_size == 320
+
+    frame = decoder.decode(_jpeg(1280, 720))
+    assert frame.shape[:2] == (180, 320)
+
+
+def test_edsdk_backend_rejects_incomplete_implementation():
+    """Backend bez některé EDSDK funkce nejde vůbec vytvořit."""
+    from camera.edsdk_backend import EdsdkBackend
+    from camera.fake_edsdk import FakeEdsdk
+
+    class _Partial(EdsdkBackend):
+        def EdsInitializeSDK(self):
+            return 0
+
+    with pytest.raises(TypeError):
+        _Partial()
+    assert isinstance(FakeEdsdk(fps=0, size=(32, 24)), EdsdkBackend)
+
+
+def test_canon_camera_on_fake_edsdk_releases_handles():
+    """CanonCamera nad FakeEdsdk vrací snímky a po stop() neuvolní žádný handle navíc."""
+    from camera.camera_canon import CanonCamera
+    from camera.fake_edsdk import FakeEdsdk
+
+    edsdk = FakeEdsdk(fps=0, size=(320, 240))
+    cam = CanonCamera("fake", edsdk=edsdk)
+    cam.initialize()
+
+    for _ in range(5):
+        frame = cam.get_frame()
+        assert frame is not None and frame.shape == (240, 320, 3)
+    assert edsdk.outstanding_refs() == 2, "EVF stream a image ref se mají vytvořit jen jednou."
+
+    cam.stop()
+    assert edsdk.outstanding_refs() == 0
+
+
+def test_canon_camera_retries_busy_errors():
+    """Chyby 0xA102 z FakeEdsdk projdou retry smyčkou get_frame()."""
+    from camera.camera_canon import CanonCamera
+    from camera.fake_edsdk import FakeEdsdk
+
+    edsdk = FakeEdsdk(fps=0, size=(160, 120), busy_rate=0.5, seed=3)
+    cam = CanonCamera("fake", edsdk=edsdk)
+    cam.initialize()
+    try:
+        frames = [cam.get_frame() for _ in range(3)]
+    finally:
+        cam.stop()
+
+    assert edsdk.stats["busy"] > 0
+    assert any(frame is not None for frame in frames)
+
+
+def test_canon_camera_marks_duplicate_evf_frames():
+    """Stejný EVF JPEG se nedekóduje znovu – paket nese otisk a příznak duplicate."""
+    from camera.camera_canon import CanonCamera
+    from camera.fake_edsdk import FakeEdsdk
+
+    edsdk = FakeEdsdk(fps=0.5, size=(160, 120))  # po celý test stále první snímek
+    cam = CanonCamera("fake", edsdk=edsdk)
+    cam.initialize()
+    try:
+        packets = [cam.get_packet() for _ in range(4)]
+    finally:
+        cam.stop()
+
+    assert [p.duplicate for p in packets] == [False, True, True, True]
+    assert len({p.digest for p in packets}) == 1 and cam.duplicates == 3
+    assert packets[0].image is cam._last_frame  # nový snímek bez kopie
+    assert packets[1].image is not packets[2].image
+    np.testing.assert_array_equal(packets[0].image, packets[3].image)
+
+
+def test_duplicate_frame_stays_clean_after_drawing():
+    """Kreslení do prvního snímku se nepřenese do duplikátu – ten odpovídá čistému dekódování."""
+    from camera.camera_canon import CanonCamera
+    from camera.fake_edsdk import FakeEdsdk
+    from utils.visualizer import Visualizer
+
+    cam = CanonCamera("fake", edsdk=FakeEdsdk(fps=0.5, size=(160, 120)))
+    cam.initialize()
+    try:
+        first = cam.get_packet()
+        drawn = Visualizer(display=False).draw(first, [{"bbox": [10, 10, 80, 60], "label": "drone", "confidence": 0.9}])
+        duplicate = cam.get_packet()
+    finally:
+        cam.stop()
+
+    clean = cam.decoder.decode(np.frombuffer(first.jpeg, dtype=np.uint8))
+    assert duplicate.duplicate
+    assert np.count_nonzero(drawn != clean) > 0
+    np.testing.assert_array_equal(first.image, clean)
+    np.testing.assert_array_equal(duplicate.image, clean)
+
+
+@pytest.mark.parametrize("module", ["camera.camera_canon_G", "camera.camera_canon_GF", "camera.camera_canon_GF1"])
+def test_gui_canon_camera_accepts_gui_kwargs_and_dedupes(module, monkeypatch):
+    """GUI varianty CanonCamera přijmou argumenty z GUI (včetně dedupe) a značí duplikáty."""
+    import importlib
+    import time
+
+    from camera.fake_edsdk import FakeEdsdk
+    from camera.jpeg_decoder import JpegDecoder
+
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)  # prodlevy pro skutečné SDK
+    camera_module = importlib.import_module(module)
+    cam = camera_module.CanonCamera(
+        "fake",
+        debug=True,
+        decoder=JpegDecoder.from_config({}),
+        edsdk=FakeEdsdk(fps=0.5, size=(160, 120)),
+        dedupe=True,
+    )
+    cam.initialize()
+    cam.start_liveview()
+    try:
+        packets = [cam.get_packet() for _ in range(3)]
+    finally:
+        cam.stop()
+
+    assert [p.duplicate for p in packets] == [False, True, True]
+    assert len({p.digest for p in packets}) == 1 and cam.duplicates == 2
+
+
+def _write_video(path, count=40, size=(64, 48)):
+    import cv2
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 30, size)
+    for i in range(count):
+        frame = np.full((size[1], size[0], 3), i * 5 % 256, dtype=np.uint8)
+        writer.write(frame)
+    writer.release()
+
+
+def test_camera_manager_threaded_returns_newest_frames(tmp_path):
+    """Asynchronní CameraManager vrací rostoucí indexy a počítá přeskočené snímky."""
+    from camera.camera_manager import CameraManager
+
+    video = tmp_path / "clip.avi"
+    _write_video(video)
+
+    cam = CameraManager(source=str(video), threaded=True)
+    cam.start()
+    try:
+        results = []
+        for _ in range(3):
+            try:
+                results.append(cam.read_latest(timeout=1.0))
+            except RuntimeError:
+                break  # krátké video může skončit dřív
+    finally:
+        cam.stop()
+
+    assert results, "Nepodařilo se přečíst žádný snímek."
+    indices = [index for _, _, index in results]
+    assert indices == sorted(set(indices))
+    assert cam.dropped_frames == indices[-1] - len(indices)
+
+
+def test_video_file_source_is_read_in_order_at_file_fps(tmp_path):
+    """Videosoubor jako zdroj: i s camera.threaded se čte synchronně, bez přeskočení, tempem FPS × speed."""
+    import time
+
+    from camera.source_pool import open_source
+
+    video = tmp_path / "clip.avi"
+    _write_video(video, count=12)
+
+    cam = open_source({"type": "video", "source": str(video), "speed": 4.0}, {"camera": {"threaded": True}})
+    try:
+        assert not cam.threaded
+        start = time.monotonic()
+        indices = [cam.read_latest()[2] for _ in range(10)]
+        elapsed = time.monotonic() - start
+    finally:
+        cam.stop()
+
+    assert indices == list(range(1, 11))
+    assert cam.dropped_frames == 0
+    assert elapsed >= 9 / (30 * 4.0) * 0.9
+
+
+def test_source_pool_rejects_two_canon_sources_on_one_body(monkeypatch):
+    """Dva canon zdroje se stejným index se neotevřou na stejné tělo; index jde do CanonCamera."""
+    import camera.source_pool as source_pool
+
+    opened = []
+    monkeypatch.setattr(source_pool, "open_source", lambda src_cfg, config: opened.append(src_cfg) or _CountingCamera())
+    pool = source_pool.SourcePool.from_config({"sources": [
+        {"id": "left", "type": "canon"},
+        {"id": "right", "type": "canon"},
+        {"id": "second", "type": "canon", "index": 1},
+    ]})
+
+    assert list(pool.sources) == ["left", "second"]
+    assert [src["id"] for src in opened] == ["left", "second"]
+
+
+def test_canon_camera_opens_configured_body():
+    """CanonCamera otevře tělo podle camera_index (FakeEdsdk má jediné – index 0)."""
+    from camera.camera_canon import CanonCamera
+    from camera.fake_edsdk import FakeEdsdk
+
+    with pytest.raises(RuntimeError, match="kamera 1"):
+        CanonCamera("fake", edsdk=FakeEdsdk(fps=0), camera_index=1).initialize()
+
+
+def test_source_pool_tags_frames_by_source():
+    """SourcePool vrací snímky označené id zdroje, nejvýše jeden na zdroj."""
+    from camera.source_pool import SourcePool
+
+    pool = SourcePool(buffer_depth=2)
+    pool.add_source("a", _CountingCamera())
+    pool.add_source("b", _CountingCamera())
+    pool.start()
+    try:
+        seen = set()
+        for _ in range(20):
+            frames = pool.collect(timeout=1.0)
+            ids = [source_id for source_id, _, _, _ in frames]
+            assert len(ids) == len(set(ids))
+            seen.update(ids)
+            if seen == {"a", "b"}:
+                break
+    finally:
+        for capture in pool.captures.values():
+            capture.stop()
+
+    assert seen == {"a", "b"}
+
+
+def test_source_pool_on_packet_delivers_each_new_frame():
+    """on_packet dostává snímky přímo ze snímacích vláken, seq po zdrojích roste."""
+    import threading
+
+    from camera.source_pool import SourcePool
+
+    received = []
+    both = threading.Event()
+
+    def on_packet(source_id, seq, timestamp, packet):
+        received.append((source_id, seq))
+        if {sid for sid, _ in received} == {"a", "b"}:
+            both.set()
+
+    pool = SourcePool(buffer_depth=2, on_packet=on_packet)
+    pool.add_source("a", _CountingCamera())
+    pool.add_source("b", _CountingCamera())
+    pool.start()
+    try:
+        assert both.wait(2.0)
+    finally:
+        for capture in pool.captures.values():
+            capture.stop()
+
+    for source_id in ("a", "b"):
+        seqs = [seq for sid, seq in list(received) if sid == source_id]
+        assert seqs == sorted(set(seqs))
+
+
+def test_evf_recorder_roundtrip(tmp_path):
+    """Zaznamenané JPEG bajty se přehrají beze změny a ve stejném pořadí."""
+    from camera.evf_recorder import EvfRecorder, EvfReplaySource, read_index
+
+    jpegs = [_jpeg(32 + i, 24).tobytes() for i in range(5)]
+    path = str(tmp_path / "session.evf")
+
+    recorder = EvfRecorder(path)
+    for i, data in enumerate(jpegs):
+        recorder.write(data, capture_time=100.0 + i * 0.04)
+    recorder.close()
+
+    index = read_index(path)
+    assert len(index) == 5
+    assert np.allclose(np.diff(index["timestamp"]), 0.04)
+
+    replay = EvfReplaySource(path, speed=0)
+    try:
+        assert [replay.read_jpeg(i).tobytes() for i in range(5)] == jpegs
+        packets = [replay.get_packet() for _ in range(5)]
+        assert [p.image.shape[1] for p in packets] == [32, 33, 34, 35, 36]
+        assert replay.get_packet() is None, "Bez loop záznam na konci končí."
+    finally:
+        replay.stop()
+
+
+def test_evf_recorder_rotates_segments(tmp_path):
+    """Při překročení max_segment_mb vznikne další segment s vlastním indexem."""
+    from camera.evf_recorder import EvfRecorder, read_index
+
+    path = str(tmp_path / "rot.evf")
+    recorder = EvfRecorder(path, max_segment_mb=1 / 1024)  # 1 kB
+    for _ in range(4):
+        recorder.write(b"\xff" * 600)
+    recorder.close()
+
+    assert recorder.segment_index == 3
+    assert len(read_index(str(tmp_path / "rot_002.evf"))) == 1
+
+
+def test_evf_replay_spans_rotated_segments_and_skips_duplicates(tmp_path):
+    """Přehrávání pokračuje přes všechny segmenty; duplikáty kamery se nezaznamenají."""
+    from camera.evf_recorder import EvfRecorder, EvfReplaySource
+    from camera.fake_edsdk import load_jpeg_frames
+    from utils.frame_packet import FramePacket
+
+    jpegs = [_jpeg(32 + i, 24).tobytes() for i in range(4)]
+    path = str(tmp_path / "multi.evf")
+    recorder = EvfRecorder(path, max_segment_mb=1 / 1024)  # 1 kB → každý snímek ve vlastním segmentu
+    for i, data in enumerate(jpegs):
+        recorder.write_packet(FramePacket(None, capture_time=float(i), jpeg=data))
+        recorder.write_packet(FramePacket(None, capture_time=float(i), jpeg=data, duplicate=True))
+    recorder.close()
+    assert recorder.frames_written == 4 and recorder.duplicates_skipped == 4
+
+    replay = EvfReplaySource(path, speed=0)
+    try:
+        assert len(replay.segments) == 4 and len(replay) == 4
+        assert [replay.read_jpeg(i).tobytes() for i in range(4)] == jpegs
+        assert [replay.get_packet().image.shape[1] for _ in range(4)] == [32, 33, 34, 35]
+    finally:
+        replay.stop()
+    assert load_jpeg_frames(path, max_frames=3) == jpegs[:3]
+
+
+def test_iter_frames_decodes_recording_lazily(tmp_path):
+    """iter_frames dekóduje snímek až při odběru a projde všechny segmenty záznamu."""
+    import inspect
+
+    import cv2
+
+    from camera.evf_recorder import EvfRecorder
+    from detection.quantize import iter_frames
+    from utils.frame_packet import FramePacket
+
+    path = str(tmp_path / "lazy.evf")
+    recorder = EvfRecorder(path, max_segment_mb=1 / 1024)
+    for i in range(4):
+        recorder.write_packet(FramePacket(None, capture_time=float(i), jpeg=_jpeg(32 + i, 24).tobytes()))
+    recorder.close()
+
+    frames = iter_frames(path, max_frames=3)
+    assert inspect.isgenerator(frames)
+    assert [frame.shape[1] for frame in frames] == [32, 33, 34]
+
+    for i in range(2):
+        cv2.imwrite(str(tmp_path / f"frame{i}.jpg"), np.zeros((24, 40 + i, 3), dtype=np.uint8))
+    assert [frame.shape[1] for frame in iter_frames(str(tmp_path))] == [40, 41]
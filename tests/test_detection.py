@@ -1 +1,629 @@
 # Modul: tests/test_detection.py
+import os
+
+import numpy as np
+import pytest
+
+from detection.multi_source import MultiSourceDetector
+
+
+class _BatchDetector:
+    """Náhrada detektoru – jedna detekce na snímek, zaznamenává velikost dávek."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict_batch(self, images):
+        self.batches.append(len(images))
+        return [[{"bbox": [0, 0, 1, 1], "conf": 0.9, "cls": f"img{i}"}] for i in range(len(images))]
+
+
+class _RecordingTracker:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, detections, frame_id, packet=None):
+        self.updates.append((frame_id, detections))
+
+    def get_active_tracks(self):
+        return []
+
+
+def test_multi_source_detector_batches_and_routes():
+    """Snímky ze dvou kamer jdou jednou dávkou a detekce se vrátí správnému trackeru."""
+    detector = _BatchDetector()
+    multi = MultiSourceDetector(detector, tracker_factory=_RecordingTracker)
+    frame = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    results = multi.process([("cam1", 5, 0.0, frame), ("cam2", 7, 0.0, frame)])
+
+    assert detector.batches == [2]
+    assert results["cam1"][0]["cls"] == "img0"
+    assert results["cam2"][0]["cls"] == "img1"
+    assert multi.trackers["cam1"].updates[0][0] == 5
+    assert multi.trackers["cam2"].updates[0][0] == 7
+
+
+def test_batch_queue_sends_full_batch():
+    """Plná dávka se odešle hned, aniž by se čekalo na max_wait."""
+    from detection.batch_queue import BatchQueue
+
+    detector = _BatchDetector()
+    queue = BatchQueue(detector, max_batch_size=3, max_wait=5.0)
+    queue.start()
+    frame = np.zeros((8, 8, 3), dtype=np.uint8)
+    try:
+        futures = [queue.submit(frame) for _ in range(3)]
+        results = [f.result(timeout=1.0) for f in futures]
+    finally:
+        queue.stop()
+
+    assert detector.batches == [3]
+    assert [r[0]["cls"] for r in results] == ["img0", "img1", "img2"]
+
+
+def test_batch_queue_flushes_after_max_wait():
+    """Neúplná dávka odejde po max_wait."""
+    from detection.batch_queue import BatchQueue
+
+    detector = _BatchDetector()
+    queue = BatchQueue(detector, max_batch_size=8, max_wait=0.01)
+    queue.start()
+    try:
+        result = queue.submit(np.zeros((8, 8, 3), dtype=np.uint8)).result(timeout=1.0)
+    finally:
+        queue.stop()
+
+    assert detector.batches == [1]
+    assert result[0]["cls"] == "img0"
+
+
+def test_multi_source_detector_submits_through_batch_queue():
+    """Asynchronní snímky dvou kamer skončí v jedné dávce; zdroj má ve frontě nejvýše jeden snímek."""
+    from detection.batch_queue import BatchQueue
+
+    detector = _BatchDetector()
+    queue = BatchQueue(detector, max_batch_size=2, max_wait=5.0)
+    multi = MultiSourceDetector(detector, tracker_factory=_RecordingTracker, queue=queue)
+    frame = np.zeros((8, 8, 3), dtype=np.uint8)
+    queue.start()
+    try:
+        assert multi.submit("cam1", 5, 0.0, frame)
+        assert not multi.submit("cam1", 6, 0.0, frame)
+        assert multi.submit("cam2", 7, 0.0, frame)
+        done = []
+        while len(done) < 2:
+            batch = multi.results(timeout=1.0)
+            assert batch, "Fronta nevrátila výsledek."
+            done += batch
+    finally:
+        queue.stop()
+
+    assert detector.batches == [2]
+    assert multi.skipped == 1
+    assert sorted((source_id, seq) for source_id, seq, _, _ in done) == [("cam1", 5), ("cam2", 7)]
+    assert multi.trackers["cam1"].updates[0][0] == 5
+    assert multi.trackers["cam2"].updates[0][0] == 7
+    # Po vyzvednutí výsledku může zdroj zařadit další snímek
+    queue.start()
+    try:
+        assert multi.submit("cam1", 8, 0.0, frame)
+    finally:
+        queue.stop()
+
+
+def test_iter_batches_splits_stream():
+    from detection.batch_queue import iter_batches
+
+    assert [len(b) for b in iter_batches(range(10), max_batch_size=4)] == [4, 4, 2]
+
+
+class _Boxes:
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = np.asarray(xyxy, np.float32)
+        self.conf = np.asarray(conf, np.float32)
+        self.cls = np.asarray(cls, np.float32)
+
+    def __len__(self):
+        return len(self.conf)
+
+
+class _Result:
+    def __init__(self, *args):
+        self.boxes = _Boxes(*args)
+
+
+def test_detections_from_result_filters_classes_vectorized():
+    """Filtr allowed_classes maskou, zpětně kompatibilní pohled jako slovníky."""
+    from detection.detections import Detections
+
+    result = _Result(
+        [[0, 0, 10, 10], [5, 5, 20, 20], [1, 2, 3, 4]],
+        [0.9, 0.5, 0.3],
+        [0, 7, 1],
+    )
+    dets = Detections.from_result(result, names={0: "drone", 1: "bird", 7: "car"}, allowed_classes=[0, 1])
+
+    assert len(dets) == 2
+    assert dets.cls_id.tolist() == [0, 1]
+    assert dets[0]["bbox"] == [0.0, 0.0, 10.0, 10.0]
+    assert dets[0]["conf"] == pytest.approx(0.9)
+    assert dets[0]["cls"] == "drone"
+    assert [d["cls"] for d in dets] == ["drone", "bird"]
+
+    structured = dets.to_structured()
+    assert structured["cls_id"].tolist() == [0, 1]
+    assert Detections.from_structured(structured, names=dets.names).to_dicts() == dets.to_dicts()
+
+
+def test_detections_empty_is_falsy():
+    from detection.detections import Detections
+
+    dets = Detections()
+    assert not dets
+    assert dets.to_dicts() == []
+    assert dets.to_structured().shape == (0,)
+
+
+def test_tile_grid_covers_frame_with_overlap():
+    from detection.tiling import tile_grid
+
+    tiles = tile_grid(720, 1280, tile_size=640, overlap=0.2)
+
+    assert len(tiles) == 6
+    assert all(x1 - x0 == 640 and y1 - y0 == 640 for x0, y0, x1, y1 in tiles)
+    assert max(x1 for _, _, x1, _ in tiles) == 1280
+    assert max(y1 for _, _, _, y1 in tiles) == 720
+    assert tile_grid(480, 640, tile_size=640) == [(0, 0, 640, 480)]
+
+
+def test_merge_tiles_shifts_and_removes_seam_duplicates():
+    """Stejný cíl viděný ze dvou dlaždic zůstane jednou, v souřadnicích snímku."""
+    from detection.detections import Detections
+    from detection.tiling import merge_tiles
+
+    left = Detections([[590, 100, 610, 110]], [0.8], [1])
+    right = Detections([[50, 100, 70, 110], [10, 10, 20, 20]], [0.6, 0.7], [1, 0])
+
+    merged = merge_tiles([left, right], [(0, 0), (540, 0)], iou_threshold=0.5, names={0: "drone", 1: "bird"})
+
+    assert len(merged) == 2
+    assert merged.xyxy[0].tolist() == [590, 100, 610, 110]
+    assert merged.conf[0] == pytest.approx(0.8)
+    assert merged.xyxy[1].tolist() == [550, 10, 560, 20]
+
+
+def test_nms_is_class_aware():
+    from detection.tiling import nms
+
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10]], dtype=np.float32)
+    assert nms(boxes, [0.9, 0.8], 0.5).tolist() == [0]
+    assert nms(boxes, [0.9, 0.8], 0.5, classes=[0, 1]).tolist() == [0, 1]
+
+
+def _sky(dot=None):
+    frame = np.full((240, 320, 3), 180, dtype=np.uint8)
+    if dot is not None:
+        x, y = dot
+        frame[y:y + 12, x:x + 12] = 30
+    return frame
+
+
+class _GateDetector:
+    def __init__(self):
+        self.calls = []
+
+    def detect(self, frame):
+        self.calls.append("full")
+        return [{"bbox": [0, 0, 1, 1], "conf": 0.5, "cls": "bird"}]
+
+    def predict_regions(self, frame, regions, imgsz=None):
+        self.calls.append(regions)
+        return []
+
+
+def test_motion_gate_detects_moving_object():
+    from detection.motion_gate import MotionGate
+
+    gate = MotionGate(width=160, threshold=12)
+    gate.check(_sky())
+    assert gate.check(_sky()) == []
+
+    regions = gate.check(_sky(dot=(100, 60)))
+    assert len(regions) == 1
+    x0, y0, x1, y1 = regions[0]
+    assert x0 <= 100 and y0 <= 60 and x1 >= 112 and y1 >= 72
+
+
+def test_motion_gated_detector_skips_static_sky():
+    """Statická obloha se přeskočí, pohyb jde do výřezů, min. frekvence vynutí plnou detekci."""
+    from detection.motion_gate import MotionGatedDetector
+
+    detector = _GateDetector()
+    gated = MotionGatedDetector(detector, min_inference_hz=0, region_size=64)
+
+    first = gated.detect(_sky())           # první snímek – bez reference celý
+    assert gated.detect(_sky()) is first   # statika – poslední výsledek
+    gated.detect(_sky(dot=(100, 60)))
+
+    assert detector.calls[0] == "full"
+    assert len(detector.calls) == 2 and isinstance(detector.calls[1], list)
+    assert gated.stats() == {"frames": 3, "skipped": 1, "regions": 1, "full": 1}
+
+    forced = MotionGatedDetector(_GateDetector(), min_inference_hz=1e6)
+    for _ in range(3):
+        forced.detect(_sky())
+    assert forced.skipped == 0
+
+
+def test_letterbox_roundtrip():
+    from detection.letterbox import LetterboxPreprocessor, letterbox
+
+    image = np.zeros((360, 640, 3), dtype=np.uint8)
+    boxed, ratio, pad = letterbox(image, 320)
+
+    assert boxed.shape == (320, 320, 3)
+    assert ratio == pytest.approx(0.5) and pad == (0, 70)
+    back = LetterboxPreprocessor.scale_boxes(np.array([[10, 80, 20, 90]], np.float32),
+                                             (ratio, pad, image.shape[:2]))
+    assert back.tolist() == [[20, 20, 40, 40]]
+
+
+def test_preallocated_letterbox_matches_reference():
+    """Předalokovaný letterbox dává stejný tensor jako letterbox + to_tensor a nealokuje nové buffery."""
+    from detection.letterbox import LetterboxPreprocessor, letterbox, to_tensor
+
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 255, (360, 640, 3), dtype=np.uint8),
+              rng.integers(0, 255, (320, 320, 3), dtype=np.uint8)]
+    pre = LetterboxPreprocessor(320, max_batch=4)
+
+    tensor, meta = pre.prepare(images)
+    expected = to_tensor([letterbox(image, 320)[0] for image in images])
+
+    assert tensor.shape == (2, 3, 320, 320) and tensor.dtype == np.float32
+    assert np.allclose(tensor, expected, atol=1e-6)
+    assert meta[0][1] == (0, 70) and meta[1] == (1.0, (0, 0), (320, 320))
+
+    again, _ = pre.prepare(images[::-1])
+    assert np.shares_memory(again, tensor), "Buffer se má znovu použít."
+    assert np.allclose(again[0], expected[1], atol=1e-6)
+    assert pre.prepare([images[0]], size=300)[0].shape == (1, 3, 320, 320), "Rozměr se zaokrouhlí na stride."
+
+
+def test_onnx_decode_predictions_filters_and_nms():
+    """Dekódování výstupu YOLOv8 (4 + nc, N): filtr tříd před NMS, xywh → xyxy."""
+    from detection.onnx_backend import decode_predictions
+
+    pred = np.array([
+        # cx, cy, w, h, skóre tříd 0..2
+        [50, 50, 20, 20, 0.9, 0.0, 0.0],
+        [51, 50, 20, 20, 0.8, 0.0, 0.0],   # duplicita → NMS
+        [200, 100, 10, 10, 0.0, 0.0, 0.7],  # třída 2 – mimo classes
+        [120, 80, 10, 10, 0.0, 0.6, 0.0],
+        [10, 10, 4, 4, 0.1, 0.0, 0.0],      # pod prahem
+    ], dtype=np.float32).T
+
+    xyxy, conf, cls_id = decode_predictions(pred, conf=0.25, iou=0.5, classes=[0, 1])
+
+    assert cls_id.tolist() == [0, 1]
+    assert xyxy[0].tolist() == [40, 40, 60, 60]
+    assert conf.tolist() == pytest.approx([0.9, 0.6])
+
+
+def test_model_name_for_path_matches_configured_paths():
+    from detection.model_registry import model_name_for_path
+
+    config = {"detection": {
+        "model_path_default": "models/yolov8n.pt",
+        "model_path_default_int8": "models/yolov8n.int8.onnx",
+        "models": {"default": {}, "default_int8": {}},
+    }}
+
+    assert model_name_for_path(config, "./models/yolov8n.pt") == "default"
+    assert model_name_for_path(config, "models/yolov8n.int8.onnx") == "default_int8"
+    assert model_name_for_path(config, "models/other.pt") is None
+
+
+def test_per_class_agreement_reports_counts_precision_and_recall():
+    from detection.evaluation import per_class_agreement
+
+    reference = [
+        {"bbox": [0, 0, 10, 10], "conf": 0.9, "cls": "drone"},
+        {"bbox": [50, 50, 60, 60], "conf": 0.8, "cls": "drone"},
+    ]
+    candidate = [
+        {"bbox": [1, 0, 11, 10], "conf": 0.85, "cls": "drone"},
+        {"bbox": [80, 80, 90, 90], "conf": 0.5, "cls": "drone"},  # navíc oproti referenci
+        {"bbox": [20, 20, 30, 30], "conf": 0.6, "cls": "plane"},
+    ]
+
+    agreement = per_class_agreement([(reference, candidate)], iou_threshold=0.5)
+
+    assert agreement["drone"] == {"reference": 2, "candidate": 2, "matched": 1, "precision": 0.5, "recall": 0.5}
+    assert agreement["plane"]["precision"] == 0.0 and agreement["plane"]["reference"] == 0
+
+
+class _NamedDetector:
+    def __init__(self, model, config=None):
+        self.model = model
+        self.active_model = config["detection"]["active_model"]
+
+    def detect(self, image):
+        return [{"bbox": [0, 0, 1, 1], "conf": 1.0, "cls": self.active_model}]
+
+    predict = detect
+
+
+def _registry_config():
+    return {"detection": {
+        "active_model": "default",
+        "model_path": "models/forced.pt",
+        "model_path_default": "models/a.pt",
+        "model_path_m150": "models/b.pt",
+        "model_path_extra": "models/c.pt",
+        "models": {"default": {}, "m150": {}, "extra": {}, "no_path": {}},
+    }}
+
+
+def test_model_registry_lru_and_per_model_config():
+    from detection.model_registry import ModelRegistry
+
+    loaded = []
+    registry = ModelRegistry(_registry_config(), max_resident=2,
+                             loader=lambda path, cfg: loaded.append(path) or path,
+                             detector_factory=_NamedDetector)
+
+    assert registry.available() == ["default", "m150", "extra"]
+    assert registry.get("default").active_model == "default"
+    registry.get("m150")
+    registry.get("default")                      # zůstane v paměti bez načítání
+    registry.get("extra")                        # uvolní nejdéle nepoužitý m150
+
+    assert loaded == ["models/a.pt", "models/b.pt", "models/c.pt"]
+    assert registry.resident() == ["default", "extra"]
+    assert registry.evictions == 1
+
+
+def test_switchable_detector_switches_between_frames():
+    from detection.model_registry import ModelRegistry, SwitchableDetector
+
+    registry = ModelRegistry(_registry_config(), loader=lambda path, cfg: path, detector_factory=_NamedDetector)
+    detector = SwitchableDetector(registry)
+    switched = []
+    detector.add_listener(switched.append)
+
+    assert detector.detect(None)[0]["cls"] == "default"
+    detector.switch("m150")
+    assert detector.detect(None)[0]["cls"] == "m150"
+    assert detector.model == "models/b.pt"
+    assert switched == ["m150"]
+
+
+class _TensorModel:
+    """Model přijímající NumPy tensor – vrací jeden box uprostřed letterbox vstupu."""
+
+    accepts_numpy = True
+    names = {0: "drone"}
+
+    def __init__(self):
+        self.inputs = []
+
+    def __call__(self, source, imgsz=640, **kwargs):
+        self.inputs.append(source)
+        size = source.shape[-1]
+        c = size / 2
+        return [_Result([[c - 10, c - 10, c + 10, c + 10]], [0.9], [0]) for _ in range(len(source))]
+
+
+def test_detector_preallocated_preprocessing_rescales_boxes():
+    from detection.detector_yolo import YoloAirborneDetector
+
+    model = _TensorModel()
+    config = {"detection": {"input_size": 320, "preprocess": {"preallocated": True}, "batch": {"max_batch_size": 2}}}
+    detector = YoloAirborneDetector(model, config=config)
+
+    batched = detector.predict_batch([np.zeros((360, 640, 3), np.uint8)] * 3)
+
+    assert [len(d) for d in batched] == [1, 1, 1]
+    assert batched[0].xyxy[0].tolist() == [300, 160, 340, 200]
+    assert model.inputs[0].shape == (2, 3, 320, 320) and model.inputs[1].shape == (1, 3, 320, 320)
+
+
+class _MeanDetector:
+    """Detektor pro pracovní procesy – jas snímku zakóduje do skóre."""
+
+    def __init__(self, config):
+        self.model = type("_Model", (), {"names": {0: "drone"}})()
+
+    def predict(self, frame):
+        from detection.detections import Detections
+        return Detections([[0, 0, frame.shape[1], frame.shape[0]]], [frame.mean() / 255.0], [0], names={0: "drone"})
+
+
+def _mean_detector_factory(config):
+    return _MeanDetector(config)
+
+
+def test_inference_pool_shared_memory_in_order():
+    """Snímky jdou přes sdílenou paměť do více procesů, výsledky se vrátí v pořadí."""
+    from detection.process_pool import InferencePool
+
+    frames = [np.full((48, 64, 3), 10 * i, dtype=np.uint8) for i in range(10)]
+    with InferencePool({}, workers=2, slots=3, max_frame_shape=(64, 48),
+                       detector_factory=_mean_detector_factory) as pool:
+        ordered = list(pool.map(frames))
+        batched = pool.predict_batch(frames[:3])
+
+        with pytest.raises(ValueError):
+            pool.submit(np.zeros((100, 100, 3), dtype=np.uint8))
+
+    assert [frame is original for (frame, _), original in zip(ordered, frames)] == [True] * 10
+    assert [round(d.conf[0] * 255) for _, d in ordered] == [10 * i for i in range(10)]
+    assert batched[2].xyxy[0].tolist() == [0, 0, 64, 48]
+    assert batched[0][0]["cls"] == "drone"
+
+
+class _CrashingDetector(_MeanDetector):
+    """Pracovní proces při inferenci okamžitě skončí (jako pád knihovny modelu)."""
+
+    def predict(self, frame):
+        os._exit(1)
+
+
+def _crashing_detector_factory(config):
+    return _CrashingDetector(config)
+
+
+def _crashing_startup_factory(config):
+    os._exit(1)
+
+
+def test_inference_pool_raises_when_worker_dies():
+    """Pád pracovního procesu skončí chybou, ne věčným čekáním na výsledek."""
+    from detection.process_pool import InferencePool
+
+    with pytest.raises(RuntimeError, match="exitcode 1"):
+        InferencePool({}, workers=1, max_frame_shape=(64, 48), detector_factory=_crashing_startup_factory)
+
+    with InferencePool({}, workers=1, max_frame_shape=(64, 48),
+                       detector_factory=_crashing_detector_factory) as pool:
+        with pytest.raises(RuntimeError, match=r"nevyřízené snímky: \[0\]"):
+            pool.predict_batch([np.zeros((48, 64, 3), dtype=np.uint8)])
+
+
+def test_cpu_sweep_picks_fastest_setting():
+    """Sweep změří všechny kombinace; při shodě propustnosti vyhraje méně vláken."""
+    from detection.cpu_profile import pick_best, sweep, thread_candidates
+
+    built = []
+
+    class _Timed:
+        def __init__(self, threads, batch_size, imgsz):
+            built.append((threads, batch_size, imgsz))
+            self.batch_size = batch_size
+
+        def predict_batch(self, images):
+            assert len(images) == self.batch_size
+            return [[] for _ in images]
+
+    frames = [np.zeros((8, 8, 3), dtype=np.uint8)]
+    rows = sweep(_Timed, frames, threads=[1, 2], batch_sizes=[1, 4], sizes=[320], warmup=0, runs=3)
+    assert built == [(1, 1, 320), (1, 4, 320), (2, 1, 320), (2, 4, 320)]
+    assert all(row["count"] == 3 and row["fps"] > 0 for row in rows)
+
+    fake = [
+        {"threads": 4, "batch_size": 2, "imgsz": 640, "fps": 20.0, "p95_ms": 120.0},
+        {"threads": 2, "batch_size": 2, "imgsz": 640, "fps": 20.0, "p95_ms": 110.0},
+        {"threads": 8, "batch_size": 4, "imgsz": 640, "fps": 25.0, "p95_ms": 200.0},
+    ]
+    assert pick_best(fake)["threads"] == 8
+    assert pick_best(fake, max_p95_ms=150)["threads"] == 2
+    assert pick_best(fake, objective="latency")["threads"] == 2
+    assert thread_candidates(6) == [1, 2, 4, 6]
+
+
+def test_resolution_controller_steps_with_hysteresis():
+    """Přes rozpočet o úroveň níž; zpět nahoru až s rezervou – bez kmitání."""
+    from detection.adaptive_resolution import ResolutionController
+
+    changes = []
+    controller = ResolutionController(levels=(320, 640, 480), target_fps=10, initial=640,
+                                      min_samples=3, smoothing=1.0, up_margin=0.8)
+    controller.add_listener(changes.append)
+    assert controller.levels == [640, 480, 320] and controller.imgsz == 640
+
+    for _ in range(3):
+        controller.update(0.15)
+    assert controller.imgsz == 480
+
+    # 70 ms na 480 → odhad na 640 ≈ 124 ms > rozpočet: zůstává
+    for _ in range(10):
+        controller.update(0.07)
+    assert controller.imgsz == 480
+
+    # 40 ms na 480 → odhad ≈ 71 ms < 80 ms: nahoru
+    for _ in range(3):
+        controller.update(0.04)
+    assert controller.imgsz == 640
+    assert changes == [480, 640] and controller.stats()["changes"] == 2
+
+
+def test_adaptive_resolution_detector_passes_imgsz():
+    from detection.adaptive_resolution import AdaptiveResolutionDetector, ResolutionController
+
+    class _SizeDetector:
+        allowed_classes = [0]
+
+        def __init__(self):
+            self.sizes = []
+
+        def predict(self, frame, imgsz=None):
+            self.sizes.append(imgsz)
+            return []
+
+    base = _SizeDetector()
+    detector = AdaptiveResolutionDetector(base, ResolutionController(levels=(640, 320), latency_budget_ms=1e-6,
+                                                                     initial=640, min_samples=1))
+    detector.detect(np.zeros((8, 8, 3), dtype=np.uint8))
+    detector.detect(np.zeros((8, 8, 3), dtype=np.uint8))
+    assert base.sizes == [640, 320]
+    assert detector.allowed_classes == [0]
+
+
+def test_duplicate_frame_detector_reuses_detections_per_source():
+    from detection.dedupe import DuplicateFrameDetector
+    from utils.frame_packet import FramePacket
+
+    inner = _BatchDetector()
+    detector = DuplicateFrameDetector(inner)
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    a1 = FramePacket(image, source_id="a", digest=b"x")
+    b1 = FramePacket(image, source_id="b", digest=b"x")
+    first = detector.predict_batch([a1, b1])
+    a2 = FramePacket(image, source_id="a", digest=b"x", duplicate=True)
+    b2 = FramePacket(image, source_id="b", digest=b"y")
+    second = detector.predict_batch([a2, b2])
+
+    assert second[0] is first[0] and a2.detections is first[0]
+    assert inner.batches == [2, 1]
+    assert detector.stats() == {"frames": 4, "reused": 1}
+    assert detector.reuse_ratio == 0.25
+
+
+def test_cascade_verifies_only_proposal_crops():
+    """Proposer navrhne boxy, verifier dostane jen výřezy kolem nich (jedním voláním)."""
+    from detection.cascade import CascadeDetector, stage_config
+    from detection.detections import Detections
+
+    class _Proposer:
+        def predict(self, image, imgsz=None):
+            self.imgsz = imgsz
+            return Detections([[100, 100, 110, 110], [102, 102, 108, 108], [300, 50, 340, 70]],
+                              [0.3, 0.1, 0.6], [14, 14, 4])
+
+    class _Verifier:
+        model = type("_Model", (), {"names": {0: "drone"}})()
+
+        def __init__(self):
+            self.calls = []
+
+        def predict_regions(self, image, regions, imgsz=None):
+            self.calls.append((regions, imgsz))
+            return Detections([[101, 101, 109, 109]], [0.8], [0], names=self.model.names)
+
+    verifier = _Verifier()
+    cascade = CascadeDetector(_Proposer(), verifier, max_candidates=2, context=2.0, min_crop=32, crop_imgsz=160)
+    detections = cascade.predict(np.zeros((240, 400, 3), dtype=np.uint8), imgsz=320)
+
+    # Nejjistější návrh první; třetí (nejméně jistý) se do max_candidates nevešel
+    assert verifier.calls == [([(280, 20, 360, 100), (89, 89, 121, 121)], 160)]
+    assert cascade.proposer.imgsz == 320
+    assert detections[0]["cls"] == "drone"
+    assert cascade.stats() == {"frames": 1, "proposals": 3, "crops": 2, "verified": 1}
+
+    cfg = stage_config({"detection": {"models": {"m150": {"conf_threshold": 0.2, "allowed_classes": [0]}}}},
+                       {"model": "m150", "conf_threshold": 0.5}, "default")
+    assert cfg["detection"]["active_model"] == "m150"
+    assert cfg["detection"]["models"]["m150"] == {"conf_threshold": 0.5, "allowed_classes": [0]}
@@ -45,3 +45,52 @@ def test_model_prediction_on_dummy_image(model_path):
     assert isinstance(results[0].boxes.xyxy, np.ndarray) or hasattr(results[0].boxes, "xyxy"), \
         "Výsledek predikce nemá správný formát!"
 
+
+
+def test_import_does_not_load_torch():
+    """Import modulu je levný – torch / ultralytics se načtou až s .pt modelem."""
+    import subprocess
+    import sys
+
+    code = "import sys, detection.model_loader; print('torch' in sys.modules, 'ultralytics' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["False", "False"]
+
+
+def test_warmup_runs_dummy_inference():
+    calls = []
+
+    def model(image, **kwargs):
+        calls.append((image.shape, kwargs["imgsz"]))
+        return []
+
+    ModelLoader.warmup(model, imgsz=320, runs=2)
+    assert calls == [((320, 320, 3), 320)] * 2
+
+
+def test_cpu_profile_applied_from_file(tmp_path, monkeypatch):
+    """Uložený profil vláken se promítne do configu; profil z jiného stroje se ignoruje."""
+    import functools
+
+    from detection.cpu_profile import build_profile, save_profile
+    from utils.logger import Logger
+
+    # Log do dočasného adresáře, ne do data/logs repozitáře
+    monkeypatch.setattr("detection.model_loader.Logger",
+                        functools.partial(Logger, log_file_path=str(tmp_path / "logs" / "tracker_log.txt")))
+
+    rows = [{"threads": 4, "batch_size": 2, "imgsz": 480, "fps": 30.0, "p95_ms": 70.0}]
+    path = str(tmp_path / "cpu_profile.json")
+    save_profile(path, build_profile(rows[0], rows, backend="onnx", inter_op_threads=1))
+
+    config = {"detection": {"cpu_profile": {"enabled": True, "path": path}, "input_size": 640}}
+    profile = ModelLoader.apply_cpu_profile(config)
+    assert profile["intra_op_threads"] == 4
+    assert config["detection"]["onnx"]["intra_op_threads"] == 4
+    assert config["detection"]["batch"]["max_batch_size"] == 2
+    assert config["detection"]["input_size"] == 640
+
+    other = build_profile(rows[0], rows, backend="onnx")
+    other["machine"]["cpu_count"] += 1
+    save_profile(path, other)
+    assert ModelLoader.apply_cpu_profile({"detection": {"cpu_profile": {"enabled": True, "path": path}}}) is None
@@ -1 +1,85 @@
 # Modul: tests/test_tracking.py
+import numpy as np
+
+from detection.roi_scheduler import TrackGuidedDetector
+from tracking.object_tracking_manager import ObjectTrackingManager
+from tracking.track import iou_matrix
+
+
+def _det(x, y, size=10, cls="bird"):
+    return {"bbox": [x, y, x + size, y + size], "conf": 0.9, "cls": cls}
+
+
+def test_iou_matrix():
+    iou = iou_matrix([[0, 0, 10, 10]], [[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]])
+    assert np.allclose(iou, [[1.0, 1 / 3, 0.0]])
+
+
+def test_tracker_keeps_id_and_follows_motion():
+    """Pohybující se objekt si drží track_id, druhý objekt dostane nový."""
+    tracker = ObjectTrackingManager(max_lost=2, iou_threshold=0.2)
+    for i in range(5):
+        tracker.update([_det(100 + 3 * i, 50)], frame_id=i)
+
+    tracks = tracker.get_active_tracks()
+    assert [t.track_id for t in tracks] == [1]
+    assert tracks[0].hits == 5
+    assert tracks[0].bbox[0] == 112
+
+    tracker.update([_det(115, 50), _det(300, 300)], frame_id=5)
+    assert sorted(t.track_id for t in tracker.get_active_tracks()) == [1, 2]
+
+
+def test_tracker_drops_track_after_max_lost():
+    tracker = ObjectTrackingManager(max_lost=2)
+    tracker.update([_det(10, 10)], frame_id=0)
+    for i in range(3):
+        tracker.update([], frame_id=i + 1)
+
+    assert tracker.get_active_tracks() == []
+
+
+class _RegionDetector:
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, frame):
+        self.calls.append("full")
+        return []
+
+    def predict_regions(self, frame, regions, imgsz=None):
+        self.calls.append(regions)
+        return []
+
+
+def test_track_guided_detector_refreshes_full_frame():
+    """Bez tracků celý snímek, s tracky výřezy a každý refresh_interval-tý snímek celý."""
+    tracker = ObjectTrackingManager()
+    detector = _RegionDetector()
+    roi = TrackGuidedDetector(detector, tracker, refresh_interval=3, margin=2.0, min_size=64)
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    roi.detect(frame)
+    tracker.update([_det(0, 100, size=40)], frame_id=0)
+    for _ in range(5):
+        roi.detect(frame)
+
+    assert detector.calls[0] == "full"
+    assert detector.calls[1] == [(0, 80, 80, 160)], "Výřez se posune dovnitř snímku."
+    assert [c == "full" for c in detector.calls] == [True, False, False, True, False, False]
+    assert roi.roi_frames == 4 and roi.full_frames == 2
+
+
+def test_tracked_stamp_marks_end_of_tracking(monkeypatch):
+    """Razítko "tracked" vzniká až po aktualizaci tracků (i bez detekcí)."""
+    from utils.frame_packet import FramePacket
+
+    tracker = ObjectTrackingManager()
+    packets = [FramePacket(np.zeros((8, 8, 3), dtype=np.uint8), seq=i) for i in range(2)]
+    seen = []
+    for packet, detections in zip(packets, ([_det(10, 10)], [])):
+        monkeypatch.setattr(tracker, "remove_lost_tracks", lambda p=packet: seen.append("tracked" in p.stamps))
+        tracker.update(detections, packet=packet)
+
+    assert seen == [False, False]
+    assert all("tracked" in p.stamps for p in packets)
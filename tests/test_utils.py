@@ -1 +1,129 @@
 # Modul: tests/test_utils.py
+import threading
+import time
+
+import pytest
+
+from utils.frame_buffer import FrameMailbox, FrameRingBuffer
+
+
+def test_ring_buffer_drops_oldest():
+    """Ověř, že plný buffer zahodí nejstarší nepřečtený snímek."""
+    buf = FrameRingBuffer(depth=2)
+    for i in range(4):
+        buf.put(i)
+
+    assert len(buf) == 2
+    assert buf.dropped == 2
+    seq, _, frame = buf.latest()
+    assert (seq, frame) == (4, 3)
+
+
+def test_ring_buffer_next_returns_in_order():
+    """next() vrací položky postupně podle sekvenčních čísel."""
+    buf = FrameRingBuffer(depth=3)
+    buf.put("a")
+    buf.put("b")
+
+    assert buf.next(timeout=0)[2] == "a"
+    assert buf.next(timeout=0)[2] == "b"
+    assert buf.next(timeout=0) is None
+
+
+def test_ring_buffer_next_waits_for_producer():
+    """next(timeout) se probudí, jakmile producent vloží snímek."""
+    buf = FrameRingBuffer(depth=1)
+    threading.Timer(0.05, buf.put, args=("frame",)).start()
+
+    start = time.monotonic()
+    item = buf.next(timeout=2.0)
+    assert item is not None and item[2] == "frame"
+    assert time.monotonic() - start < 1.0
+
+
+def test_ring_buffer_close_wakes_consumer():
+    """Po close() next() nečeká a vrací None."""
+    buf = FrameRingBuffer(depth=1)
+    threading.Timer(0.05, buf.close).start()
+    assert buf.next(timeout=2.0) is None
+
+
+def test_ring_buffer_rejects_zero_depth():
+    with pytest.raises(ValueError):
+        FrameRingBuffer(depth=0)
+
+
+def test_frame_packet_stamps_and_latency():
+    """FramePacket měří latenci fází od času zachycení."""
+    import numpy as np
+    from utils.frame_packet import FramePacket, as_image
+
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    packet = FramePacket(image, source_id="cam1", capture_time=time.monotonic() - 0.1)
+    packet.stamp("detected")
+
+    assert as_image(packet) is image
+    assert as_image(image) is image
+    assert packet.latency("detected") >= 0.1
+    assert packet.latency("missing") is None
+    with pytest.raises(AttributeError):
+        packet.extra = 1  # __slots__ – žádné nové atributy
+
+
+def test_frame_packet_full_image_decodes_lazily():
+    """full_image() dekóduje původní JPEG jen u zmenšeného obrazu."""
+    import cv2
+    import numpy as np
+    from utils.frame_packet import FramePacket
+
+    full = np.random.randint(0, 255, (64, 96, 3), dtype=np.uint8)
+    jpeg = cv2.imencode(".jpg", full)[1].tobytes()
+    small = cv2.resize(full, (48, 32))
+
+    packet = FramePacket(small, jpeg=jpeg)
+    assert packet.full_image().shape == (64, 96, 3)
+
+
+def test_ring_buffer_assigns_packet_seq():
+    from utils.frame_packet import FramePacket
+
+    buf = FrameRingBuffer(depth=2)
+    packet = FramePacket(None)
+    seq = buf.put(packet)
+    assert packet.seq == seq == 1
+
+
+def test_stage_timer_report():
+    from utils.performance_timer import StageTimer
+
+    timer = StageTimer()
+    with timer.stage("import"):
+        pass
+    with timer.stage("warm-up"):
+        pass
+
+    assert [name for name, _ in timer.stages] == ["import", "warm-up"]
+    assert "warm-up" in timer.report()
+
+
+def test_frame_mailbox_keeps_latest_and_counts():
+    mailbox = FrameMailbox(capacity=1)
+    mailbox.put("a")
+    assert mailbox.put("b") is True
+    assert mailbox.get(timeout=0) == "b"
+    assert mailbox.get(timeout=0.01) is None
+    assert mailbox.stats() == {"produced": 2, "consumed": 1, "dropped": 1}
+
+
+def test_frame_mailbox_wakes_blocked_consumer():
+    """get() se probudí hned po put() – bez pollingu – a po close() vrátí None."""
+    mailbox = FrameMailbox()
+    received = []
+    consumer = threading.Thread(target=lambda: received.extend([mailbox.get(timeout=2.0), mailbox.get()]))
+    consumer.start()
+    mailbox.put("frame")
+    mailbox.close()
+    consumer.join(timeout=2.0)
+
+    assert not consumer.is_alive()
+    assert received == ["frame", None]
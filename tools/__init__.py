@@ -0,0 +1 @@
+# Modul: tools/__init__.py
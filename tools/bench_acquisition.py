@@ -0,0 +1,124 @@
+# tools/bench_acquisition.py
+"""
+Benchmark akviziční cesty CanonCamera nad softwarovou náhradou EDSDK (FakeEdsdk).
+
+Měří propustnost a latence skutečného get_frame() (stažení EVF, dekódování,
+retry smyčka) bez připojené kamery. Propustnost se počítá jen z unikátních
+snímků – opakovaný EVF JPEG (duplikát) se vypisuje zvlášť.
+
+Spuštění:
+    python -m tools.bench_acquisition --duration 10 --fps 30 --busy-rate 0.05
+    python -m tools.bench_acquisition --source data/evf_frames --mode thread
+"""
+
+import argparse
+import time
+
+from camera.camera_canon import CanonCamera
+from camera.capture_thread import CaptureThread
+from camera.fake_edsdk import FakeEdsdk
+from camera.jpeg_decoder import DECODE_MODES, JpegDecoder
+from utils.performance_timer import latency_stats
+
+
+def _print_stats(title, stats):
+    print(f"  {title}: n={stats['count']}  mean={stats['mean_ms']:.2f} ms  "
+          f"p50={stats['p50_ms']:.2f}  p95={stats['p95_ms']:.2f}  "
+          f"p99={stats['p99_ms']:.2f}  max={stats['max_ms']:.2f}")
+
+
+def bench_direct(cam, duration):
+    """Synchronní volání get_frame() – jako původní smyčka v main.py."""
+    latencies = []
+    misses = 0
+    duplicates = 0
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        start = time.perf_counter()
+        packet = cam.get_packet()
+        latencies.append(time.perf_counter() - start)
+        if packet is None:
+            misses += 1
+        elif packet.duplicate:
+            duplicates += 1
+    return latencies, misses, duplicates
+
+
+def bench_thread(cam, duration, buffer_depth):
+    """Snímací vlákno + konzument přes next() – měří stáří snímku při převzetí."""
+    capture = CaptureThread(cam, buffer_depth=buffer_depth)
+    capture.start()
+    ages = []
+    misses = 0
+    duplicates = 0
+    end = time.monotonic() + duration
+    try:
+        while time.monotonic() < end:
+            item = capture.next(timeout=1.0)
+            if item is None:
+                misses += 1
+                continue
+            if item[2].duplicate:
+                duplicates += 1
+                continue
+            ages.append(time.monotonic() - item[1])
+    finally:
+        capture.stop()
+    return ages, misses, duplicates, capture.dropped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark akvizice CanonCamera nad FakeEdsdk")
+    parser.add_argument("--source", default=None, help="adresář JPEG / JPEG / video (výchozí: syntetické snímky)")
+    parser.add_argument("--fps", type=float, default=30.0, help="frekvence EVF snímků (0 = bez omezení)")
+    parser.add_argument("--latency", type=float, default=0.02, help="[s] latence stažení")
+    parser.add_argument("--jitter", type=float, default=0.005, help="[s] rozptyl latence")
+    parser.add_argument("--busy-rate", type=float, default=0.0, help="pravděpodobnost chyby 0xA102")
+    parser.add_argument("--empty-rate", type=float, default=0.0, help="pravděpodobnost prázdného streamu")
+    parser.add_argument("--decode", choices=DECODE_MODES, default="full")
+    parser.add_argument("--target-size", type=int, default=640)
+    parser.add_argument("--mode", choices=("direct", "thread"), default="direct")
+    parser.add_argument("--buffer-depth", type=int, default=3)
+    parser.add_argument("--duration", type=float, default=10.0, help="[s] délka měření")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    edsdk = FakeEdsdk(
+        source=args.source,
+        fps=args.fps,
+        latency=args.latency,
+        jitter=args.jitter,
+        busy_rate=args.busy_rate,
+        empty_rate=args.empty_rate,
+        seed=args.seed,
+    )
+    cam = CanonCamera(
+        sdk_path="fake",
+        decoder=JpegDecoder(mode=args.decode, target_size=args.target_size),
+        edsdk=edsdk,
+    )
+    cam.initialize()
+    cam.start_liveview()
+
+    print(f"=== Akvizice: mode={args.mode}, decode={args.decode}, fps={args.fps}, "
+          f"latency={args.latency}s±{args.jitter}s, busy={args.busy_rate} ===")
+    try:
+        if args.mode == "direct":
+            samples, misses, duplicates = bench_direct(cam, args.duration)
+            delivered = len(samples) - misses - duplicates
+            _print_stats("get_packet()", latency_stats(samples))
+        else:
+            samples, misses, duplicates, dropped = bench_thread(cam, args.duration, args.buffer_depth)
+            delivered = len(samples)
+            _print_stats("stáří snímku", latency_stats(samples))
+            print(f"  zahozeno v bufferu: {dropped}")
+    finally:
+        cam.stop()
+
+    print(f"  unikátních snímků: {delivered}  ({delivered / args.duration:.1f} fps), "
+          f"duplikátů: {duplicates}, bez snímku: {misses}")
+    print(f"  EDSDK: {edsdk.stats}, neuvolněné handly: {edsdk.outstanding_refs()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# tools/build_quantized.py
+"""
+Sestavení INT8 variant YOLO modelů pro CPU nasazení.
+
+Bez --model se kvantizují oba modely z configu (model_path_default
+a model_path_m150); výsledek je <model>.int8.onnx, na který míří
+model_path_<jméno>_int8 – stačí přepnout active_model.
+
+Spuštění:
+    python -m tools.build_quantized --calibration data/recordings/evf_20251110_101500.evf
+    python -m tools.build_quantized --model models/yolov8n.pt --mode dynamic
+"""
+
+import argparse
+
+from config.config_loader import ConfigLoader
+from detection.quantize import QUANT_MODES, quantize_model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="INT8 kvantizace YOLO modelů (ONNX Runtime)")
+    parser.add_argument("--config", default="configs/default_config.yaml")
+    parser.add_argument("--model", action="append", help="cesta k .pt / .onnx (lze opakovat)")
+    parser.add_argument("--calibration", help="adresář JPEG / *.evf záznam / video pro kalibraci")
+    parser.add_argument("--mode", choices=QUANT_MODES, default="static")
+    parser.add_argument("--imgsz", type=int, default=None, help="vstupní rozlišení (výchozí detection.input_size)")
+    parser.add_argument("--max-frames", type=int, default=200, help="počet kalibračních snímků")
+    args = parser.parse_args(argv)
+
+    det_cfg = ConfigLoader.load(args.config).get("detection", {})
+    models = args.model or [det_cfg[key] for key in ("model_path_default", "model_path_m150") if det_cfg.get(key)]
+    imgsz = args.imgsz or det_cfg.get("input_size", 640)
+
+    for model_path in models:
+        quantize_model(model_path, calibration=args.calibration, imgsz=imgsz,
+                       mode=args.mode, max_frames=args.max_frames)
+
+
+if __name__ == "__main__":
+    main()
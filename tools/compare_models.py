@@ -0,0 +1,86 @@
+# tools/compare_models.py
+"""
+Porovnání float a kvantizovaného modelu na stejných snímcích.
+
+Referencí jsou detekce float modelu: pro každou třídu se vypíše počet
+detekcí obou modelů, precision a recall INT8 vůči float modelu (shoda
+třídy a IoU ≥ --iou) a latence inference obou modelů. Každý model běží
+s vlastním profilem detection.models.<jméno> (allowed_classes, prahy);
+jméno se odvodí z model_path_<jméno>, nebo se zadá --float-name / --quant-name.
+
+Spuštění:
+    python -m tools.compare_models --float models/yolov8n.pt \\
+        --quant models/yolov8n.int8.onnx --frames data/recordings/evf_20251110_101500.evf
+"""
+
+import argparse
+import time
+
+from config.config_loader import ConfigLoader
+from detection.detector_yolo import YoloAirborneDetector
+from detection.evaluation import per_class_agreement
+from detection.model_loader import ModelLoader
+from detection.model_registry import model_config, model_name_for_path
+from detection.quantize import load_calibration_frames
+from utils.performance_timer import latency_stats
+
+
+def _run(model_path, name, config, frames, warmup=3):
+    config = model_config(config, name)
+    detector = YoloAirborneDetector(ModelLoader.load(model_path, config), config=config)
+    for frame in frames[:warmup]:
+        detector.predict(frame)
+
+    results, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        detections = detector.predict(frame)
+        latencies.append(time.perf_counter() - start)
+        results.append(detections.to_dicts() if hasattr(detections, "to_dicts") else list(detections))
+    return results, latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Float vs. INT8: shoda detekcí po třídách a latence")
+    parser.add_argument("--config", default="configs/default_config.yaml")
+    parser.add_argument("--float", dest="float_model", required=True, help="referenční model (.pt / .onnx)")
+    parser.add_argument("--quant", required=True, help="kvantizovaný model (.int8.onnx)")
+    parser.add_argument("--float-name", help="jméno v detection.models (výchozí podle model_path_<jméno>)")
+    parser.add_argument("--quant-name", help="jméno v detection.models (výchozí podle cesty, jinak <float>_int8)")
+    parser.add_argument("--frames", required=True, help="adresář JPEG / *.evf záznam / video")
+    parser.add_argument("--max-frames", type=int, default=300)
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU pro shodu detekcí")
+    args = parser.parse_args(argv)
+
+    config = ConfigLoader.load(args.config)
+    models = config.get("detection", {}).get("models", {}) or {}
+    float_name = args.float_name or model_name_for_path(config, args.float_model)
+    if float_name is None:
+        parser.error(f"{args.float_model} neodpovídá žádnému model_path_<jméno> – zadej --float-name")
+    quant_name = args.quant_name or model_name_for_path(config, args.quant)
+    if quant_name is None:
+        quant_name = f"{float_name}_int8" if f"{float_name}_int8" in models else float_name
+    print(f"[CompareModels] float={float_name}, int8={quant_name}")
+    frames = load_calibration_frames(args.frames, args.max_frames)
+    print(f"[CompareModels] {len(frames)} snímků z {args.frames}")
+
+    reference, float_latency = _run(args.float_model, float_name, config, frames)
+    candidate, quant_latency = _run(args.quant, quant_name, config, frames)
+
+    agreement = per_class_agreement(zip(reference, candidate), iou_threshold=args.iou)
+    print("\n  třída           float    int8   shodných   precision   recall")
+    for cls, row in sorted(agreement.items(), key=lambda item: str(item[0])):
+        print(f"  {str(cls):<15} {row['reference']:>5}   {row['candidate']:>5}   {row['matched']:>8}   "
+              f"{row['precision']:>9.1%}   {row['recall']:>6.1%}")
+    print(f"  detekcí celkem: float={sum(map(len, reference))}, int8={sum(map(len, candidate))}")
+
+    for title, samples in (("float", float_latency), ("int8", quant_latency)):
+        stats = latency_stats(samples)
+        print(f"  latence {title:<5}: mean={stats['mean_ms']:.1f} ms  p50={stats['p50_ms']:.1f}  "
+              f"p95={stats['p95_ms']:.1f}  p99={stats['p99_ms']:.1f}")
+    speedup = latency_stats(float_latency)["p50_ms"] / max(latency_stats(quant_latency)["p50_ms"], 1e-9)
+    print(f"  zrychlení (p50): {speedup:.2f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# tools/reprocess.py
+"""
+Offline zpracování záznamu (adresář JPEG / *.evf / video) víceprocesovým
+InferencePool – každý proces má vlastní model, snímky jdou přes sdílenou paměť.
+Snímky se dekódují líně, v paměti jich je nejvýše tolik, kolik má pool slotů.
+
+Spuštění:
+    python -m tools.reprocess --frames data/recordings/evf_20251110_101500.evf --workers 4
+"""
+
+import argparse
+import itertools
+import time
+
+from config.config_loader import ConfigLoader
+from detection.process_pool import InferencePool
+from detection.quantize import iter_frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline detekce přes pool procesů")
+    parser.add_argument("--config", default="configs/default_config.yaml")
+    parser.add_argument("--frames", required=True, help="adresář JPEG / *.evf záznam / video")
+    parser.add_argument("--max-frames", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None, help="počet procesů (výchozí detection.pool.workers)")
+    args = parser.parse_args(argv)
+
+    config = ConfigLoader.load(args.config)
+    pool_cfg = config["detection"].setdefault("pool", {})
+    pool_cfg["workers"] = args.workers or pool_cfg.get("workers") or 2
+
+    frames = iter_frames(args.frames, args.max_frames)
+    # Velikost slotu podle prvního snímku (záznam má pevné rozlišení)
+    first = next(frames, None)
+    if first is None:
+        print(f"[Reprocess] ⚠️ Žádné snímky v {args.frames}")
+        return
+    height, width = first.shape[:2]
+    pool_cfg["max_frame"] = [max(width, pool_cfg.get("max_frame", [0, 0])[0]),
+                             max(height, pool_cfg.get("max_frame", [0, 0])[1])]
+    frames = itertools.chain([first], frames)
+    print(f"[Reprocess] nejvýše {args.max_frames} snímků, {pool_cfg['workers']} procesů")
+
+    with InferencePool.from_config(config) as pool:
+        start = time.perf_counter()
+        counts = [len(detections) for _, detections in pool.map(frames)]
+        elapsed = time.perf_counter() - start
+
+    print(f"[Reprocess] ✅ {len(counts)} snímků za {elapsed:.1f} s ({len(counts) / max(elapsed, 1e-9):.1f} FPS), "
+          f"detekcí: {sum(counts)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# tools/tune_cpu.py
+"""
+Ladění počtu vláken, velikosti dávky a vstupního rozlišení pro CPU inferenci.
+
+Na cílovém stroji projde kombinace (vlákna × dávka × input_size) na syntetických
+nebo zaznamenaných snímcích, vypíše percentily latence a propustnost a nejlepší
+nastavení uloží do profilu, který ModelLoader při startu použije sám
+(detection.cpu_profile).
+
+Spuštění:
+    python -m tools.tune_cpu
+    python -m tools.tune_cpu --frames data/recordings/evf_20251110_101500.evf --batch 1,2,4 --sizes 480,640
+"""
+
+import argparse
+import copy
+
+import cv2
+import numpy as np
+
+from config.config_loader import ConfigLoader
+from detection.cpu_profile import (build_profile, default_profile_path, pick_best, save_profile,
+                                   set_torch_threads, sweep, thread_candidates)
+from detection.detector_yolo import YoloAirborneDetector
+from detection.model_loader import ModelLoader
+
+
+def _int_list(text):
+    return [int(value) for value in text.split(",") if value.strip()]
+
+
+def _frames(source, max_frames, size=(1280, 720)):
+    """Zaznamenané snímky, nebo syntetická obloha z FakeEdsdk."""
+    if source:
+        from detection.quantize import load_calibration_frames
+        return load_calibration_frames(source, max_frames)
+
+    from camera.fake_edsdk import FakeEdsdk
+    jpegs = FakeEdsdk(fps=0, size=size).frames[:max_frames]
+    return [cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR) for jpeg in jpegs]
+
+
+def _detector_factory(config, model_path, inter_op_threads):
+    """
+    Torch: jeden model, mění se torch.set_num_threads. Inter-op se nastaví jednou
+    před načtením modelu a platí pro celé měření (torch ho později změnit nedovolí).
+    ONNX: session pro každý počet vláken.
+    """
+    det_cfg = config["detection"]
+    backend = "onnx" if det_cfg.get("backend") == "onnx" or model_path.endswith(".onnx") else "torch"
+    models = {}
+
+    def model_for(threads):
+        if backend == "torch":
+            if "torch" not in models:
+                import torch  # noqa: F401 – set_torch_threads nastavuje jen již načtený torch
+                set_torch_threads(threads, inter_op_threads)
+                models["torch"] = ModelLoader.load(model_path, config)
+            else:
+                set_torch_threads(threads)
+            return models["torch"]
+        if threads not in models:
+            onnx_cfg = dict(det_cfg.get("onnx", {}) or {}, intra_op_threads=threads,
+                            inter_op_threads=inter_op_threads)
+            models[threads] = ModelLoader.load_onnx(model_path, imgsz=det_cfg.get("input_size", 640),
+                                                    onnx_cfg=onnx_cfg)
+        return models[threads]
+
+    def factory(threads, batch_size, imgsz):
+        cfg = copy.deepcopy(config)
+        cfg["detection"]["input_size"] = imgsz
+        cfg["detection"].setdefault("batch", {})["max_batch_size"] = batch_size
+        return YoloAirborneDetector(model_for(threads), config=cfg)
+
+    return factory, backend
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ladění vláken / dávky / rozlišení pro CPU inferenci")
+    parser.add_argument("--config", default="configs/default_config.yaml")
+    parser.add_argument("--model", help="cesta k modelu (výchozí aktivní model z configu)")
+    parser.add_argument("--frames", help="adresář JPEG / *.evf záznam / video; bez něj syntetické snímky")
+    parser.add_argument("--max-frames", type=int, default=16)
+    parser.add_argument("--threads", type=_int_list, help="např. 1,2,4,8 (výchozí 1, 2, 4 … počet jader)")
+    parser.add_argument("--inter-op", type=int, default=1, help="inter-op vlákna (torch jen jednou za běh)")
+    parser.add_argument("--batch", type=_int_list, default=[1, 2, 4])
+    parser.add_argument("--sizes", type=_int_list, default=None, help="výchozí detection.input_size")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--objective", choices=("fps", "latency"), default="fps")
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="vyřadit nastavení s vyšší p95")
+    parser.add_argument("--output", help="soubor profilu (výchozí configs/cpu_profile.<hostname>.json)")
+    args = parser.parse_args(argv)
+
+    config = ConfigLoader.load(args.config)
+    det_cfg = config["detection"]
+    det_cfg["cpu_profile"] = {"enabled": False}  # měří se bez dříve uloženého profilu
+    det_cfg.setdefault("startup", {})["warmup_runs"] = 0
+    model_path = args.model or ModelLoader.resolve_model_path(det_cfg)
+    sizes = args.sizes or [det_cfg.get("input_size", 640)]
+    threads = args.threads or thread_candidates()
+
+    frames = _frames(args.frames, max(args.max_frames, max(args.batch)))
+    print(f"[TuneCpu] {model_path}: vlákna {threads}, dávky {args.batch}, rozlišení {sizes}, "
+          f"{len(frames)} snímků")
+
+    factory, backend = _detector_factory(config, model_path, args.inter_op)
+    print("\n  vlákna  dávka  imgsz    p50 ms    p95 ms    p99 ms    snímků/s")
+    rows = sweep(factory, frames, threads, args.batch, sizes, warmup=args.warmup, runs=args.runs,
+                 on_result=lambda row: print(
+                     f"  {row['threads']:>6}  {row['batch_size']:>5}  {row['imgsz']:>5}  {row['p50_ms']:>8.1f}  "
+                     f"{row['p95_ms']:>8.1f}  {row['p99_ms']:>8.1f}  {row['fps']:>10.1f}"))
+
+    best = pick_best(rows, objective=args.objective, max_p95_ms=args.max_p95_ms)
+    if best is None:
+        print(f"[TuneCpu] ❌ Žádné nastavení nesplňuje p95 ≤ {args.max_p95_ms} ms.")
+        return
+
+    output = args.output or default_profile_path()
+    save_profile(output, build_profile(best, rows, backend, inter_op_threads=args.inter_op,
+                                       objective=args.objective))
+    print(f"\n[TuneCpu] ✅ Nejlepší: {best['threads']} vláken, dávka {best['batch_size']}, "
+          f"imgsz {best['imgsz']} ({best['fps']:.1f} snímků/s, p95 {best['p95_ms']:.1f} ms) → {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ import numpy as np
 class KalmanTracker:
     """Simple Kalman filter based tracker."""
 
-    def __init__(self):
+    def __init__(self, x=None, y=None):
         self.kalman = cv2.KalmanFilter(4, 2)
         self.kalman.measurementMatrix = np.array([[1, 0, 0, 0],
                                                    [0, 1, 0, 0]], np.float32)
@@ -15,6 +15,14 @@ class KalmanTracker:
                                                  [0, 0, 1, 0],
                                                  [0, 0, 0, 1]], np.float32)
         self.kalman.processNoiseCov = np.eye(4, dtype=np.float32) * 0.03
+        if x is not None and y is not None:
+            self.initialize(x, y)
+
+    def initialize(self, x, y):
+        """Nastaví počáteční stav (poloha z první detekce, nulová rychlost)."""
+        self.kalman.statePost = np.array([[x], [y], [0], [0]], np.float32)
+        self.kalman.statePre = self.kalman.statePost.copy()
+        self.kalman.errorCovPost = np.eye(4, dtype=np.float32)
 
     def predict(self):
         """Predict next position."""
@@ -25,4 +33,7 @@ class KalmanTracker:
         measurement = np.array([[np.float32(x)], [np.float32(y)]])
         self.kalman.correct(measurement)
 
-
+    def peek(self):
+        """Očekávaná poloha v dalším snímku bez posunu stavu filtru (x, y)."""
+        x, y, vx, vy = self.kalman.statePost[:, 0]
+        return float(x + vx), float(y + vy)
@@ -1,34 +1,84 @@
 # tracking/object_tracking_manager.py
-from tracking.kalman_tracker import KalmanTracker
+import numpy as np
+
+from tracking.track import Track, iou_matrix
+from utils.frame_packet import stamp
+
 
 class ObjectTrackingManager:
+    """
+    Správce objektového sledování (tracking).
+
+    Každý track (tracking/track.py) drží Kalmanův filtr středu boxu. Detekce
+    se k predikovaným boxům přiřazují hladově podle IoU (≥ iou_threshold),
+    nepřiřazené detekce zakládají nové tracky a track bez detekce déle než
+    max_lost snímků se odstraní. Predikované pozice využívá TrackGuidedDetector
+    (detection/roi_scheduler.py) k volbě výřezů.
+    """
+
     def __init__(self, max_lost=10, iou_threshold=0.3, debug=False):
-        """
-        Správce objektového sledování (tracking).
-        """
         self.max_lost = max_lost
         self.iou_threshold = iou_threshold
         self.trackers = {}
         self.debug = debug
+        self._next_id = 1
 
-    def update(self, detections, frame_id):
-        """Zpracování nových detekcí a aktualizace trackerů."""
-        if not detections:
-            if self.debug:
-                print(f"[TrackingManager] Frame {frame_id}: žádné detekce.")
-            return
+    def update(self, detections, frame_id=None, packet=None):
+        """Zpracování nových detekcí a aktualizace trackerů (volitelně s FramePacket)."""
+        if frame_id is None and packet is not None:
+            frame_id = packet.seq
 
-        for det in detections:
-            label = det.get('label', det.get('class', 'unknown'))
-            bbox = det.get('bbox')
-            conf = det.get('confidence', None)
-            if self.debug:
-                print(f"[TrackingManager] Frame {frame_id}: detekce {label} @ {bbox} (conf={conf})")
+        detections = list(detections or [])
+        tracks = list(self.trackers.values())
+        predicted = [track.predict() for track in tracks]
+
+        if not detections and self.debug:
+            print(f"[TrackingManager] Frame {frame_id}: žádné detekce.")
+
+        matched_tracks, matched_dets = self._associate(predicted, detections)
+
+        for t, d in zip(matched_tracks, matched_dets):
+            tracks[t].update(detections[d], frame_id)
+
+        for t, track in enumerate(tracks):
+            if t not in matched_tracks:
+                track.mark_missed(predicted[t])
+
+        for d, det in enumerate(detections):
+            if d not in matched_dets:
+                track = Track(self._next_id, det, frame_id)
+                self.trackers[track.track_id] = track
+                self._next_id += 1
+                if self.debug:
+                    print(f"[TrackingManager] Frame {frame_id}: nový track {track}")
+
+        self.remove_lost_tracks()
+        # Čas dokončení fáze – až po asociaci a Kalmanově kroku
+        stamp(packet, "tracked")
+
+    def _associate(self, predicted, detections):
+        """Greedy přiřazení detekcí k trackům podle IoU (od nejvyššího)."""
+        if not predicted or not detections:
+            return [], []
+        iou = iou_matrix(predicted, [det["bbox"] for det in detections])
+        matched_tracks, matched_dets = [], []
+        for flat in np.argsort(-iou, axis=None):
+            t, d = np.unravel_index(flat, iou.shape)
+            if iou[t, d] < self.iou_threshold:
+                break
+            if t in matched_tracks or d in matched_dets:
+                continue
+            matched_tracks.append(int(t))
+            matched_dets.append(int(d))
+        return matched_tracks, matched_dets
 
     def get_active_tracks(self):
         """Vrací aktuálně sledované objekty."""
         return list(self.trackers.values())
 
     def remove_lost_tracks(self):
-        """Odstraní ztracené tracky (zatím placeholder)."""
-        pass
+        """Odstraní tracky bez detekce déle než max_lost snímků."""
+        for track_id in [tid for tid, track in self.trackers.items() if track.lost > self.max_lost]:
+            if self.debug:
+                print(f"[TrackingManager] Track {track_id} ztracen.")
+            del self.trackers[track_id]
@@ -0,0 +1,76 @@
+# tracking/track.py
+import numpy as np
+
+from tracking.kalman_tracker import KalmanTracker
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """IoU všech dvojic boxů (N×4, M×4) → matice N×M."""
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)[:, None, :]
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+
+class Track:
+    """
+    Jeden sledovaný objekt: Kalmanův filtr nad středem boxu,
+    rozměr boxu z poslední detekce.
+    """
+
+    def __init__(self, track_id, detection, frame_id=None):
+        self.track_id = track_id
+        self.bbox = [float(v) for v in detection["bbox"]]
+        self.cls = detection.get("cls")
+        self.confidence = detection.get("conf")
+        self.hits = 1
+        self.lost = 0
+        self.first_frame = frame_id
+        self.last_frame = frame_id
+        cx, cy = self.center
+        self.kalman = KalmanTracker(cx, cy)
+
+    @property
+    def center(self):
+        x1, y1, x2, y2 = self.bbox
+        return (x1 + x2) / 2.0, (y1 + y2) / 2.0
+
+    @property
+    def size(self):
+        x1, y1, x2, y2 = self.bbox
+        return x2 - x1, y2 - y1
+
+    def _box_at(self, cx, cy):
+        w, h = self.size
+        return [cx - w / 2.0, cy - h / 2.0, cx + w / 2.0, cy + h / 2.0]
+
+    def predicted_bbox(self):
+        """Box v očekávané poloze pro následující snímek (stav filtru se nemění)."""
+        return self._box_at(*self.kalman.peek())
+
+    def predict(self):
+        """Posune filtr o jeden snímek; vrací predikovaný box."""
+        state = self.kalman.predict()
+        return self._box_at(float(state[0, 0]), float(state[1, 0]))
+
+    def update(self, detection, frame_id=None):
+        """Potvrzení tracku novou detekcí."""
+        self.bbox = [float(v) for v in detection["bbox"]]
+        self.cls = detection.get("cls", self.cls)
+        self.confidence = detection.get("conf", self.confidence)
+        self.kalman.correct(*self.center)
+        self.hits += 1
+        self.lost = 0
+        self.last_frame = frame_id
+
+    def mark_missed(self, predicted_bbox):
+        """Snímek bez odpovídající detekce – track pokračuje po predikci."""
+        self.bbox = predicted_bbox
+        self.lost += 1
+
+    def __repr__(self):
+        return f"Track(id={self.track_id}, cls={self.cls!r}, bbox={[round(v, 1) for v in self.bbox]}, lost={self.lost})"
@@ -0,0 +1,163 @@
+# utils/frame_buffer.py
+import threading
+import time
+from collections import deque
+
+
+class FrameRingBuffer:
+    """
+    Malý kruhový buffer posledních snímků (drop-oldest) se sekvenčními čísly.
+
+    Producent volá put(), konzumenti buď neblokující latest(), nebo next(),
+    který počká na snímek novější než zadané sekvenční číslo.
+    Položky jsou trojice (seq, timestamp, frame); má-li frame atribut seq
+    (FramePacket), buffer ho vyplní.
+    """
+
+    def __init__(self, depth=3):
+        if depth < 1:
+            raise ValueError("FrameRingBuffer: depth musí být alespoň 1")
+        self.depth = depth
+        self._items = deque(maxlen=depth)
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._last_read_seq = 0
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, frame, timestamp=None):
+        """Vloží snímek, případně zahodí nejstarší; vrací jeho sekvenční číslo."""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self._cond:
+            if len(self._items) == self.depth and self._items[0][0] > self._last_read_seq:
+                self.dropped += 1
+            self._seq += 1
+            if hasattr(frame, "seq"):
+                frame.seq = self._seq
+            self._items.append((self._seq, timestamp, frame))
+            self._cond.notify_all()
+            return self._seq
+
+    def latest(self):
+        """Vrátí nejnovější položku bez čekání, nebo None."""
+        with self._cond:
+            if not self._items:
+                return None
+            item = self._items[-1]
+            self._last_read_seq = max(self._last_read_seq, item[0])
+            return item
+
+    def next(self, after_seq=None, timeout=None):
+        """
+        Vrátí nejstarší dostupnou položku se seq > after_seq.
+
+        Bez after_seq navazuje na poslední přečtenou položku. Pokud do timeoutu
+        nic nepřijde (nebo je buffer uzavřen), vrací None.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                since = self._last_read_seq if after_seq is None else after_seq
+                for item in self._items:
+                    if item[0] > since:
+                        self._last_read_seq = max(self._last_read_seq, item[0])
+                        return item
+
+                if self._closed:
+                    return None
+                if deadline is None:
+                    self._cond.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+
+    @property
+    def last_seq(self):
+        """Sekvenční číslo posledního vloženého snímku (0 = zatím nic)."""
+        with self._cond:
+            return self._seq
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        """Probudí všechny čekající konzumenty; další next() už nečeká."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class FrameMailbox:
+    """
+    Předávka snímků mezi vlákny s pevnou kapacitou (výchozí 1 = jen nejnovější).
+
+    put() nikdy neblokuje – při plné schránce zahodí nejstarší snímek.
+    get() blokuje na podmínkové proměnné, dokud snímek nepřijde (bez pollingu).
+    Počítadla produced / consumed / dropped ukazují, kolik snímků detekce nestihla.
+    """
+
+    def __init__(self, capacity=1):
+        if capacity < 1:
+            raise ValueError("FrameMailbox: capacity musí být alespoň 1")
+        self.capacity = capacity
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.produced = 0
+        self.consumed = 0
+        self.dropped = 0
+
+    def put(self, frame):
+        """Vloží snímek; vrací True, pokud byl kvůli němu zahozen starší."""
+        with self._cond:
+            dropped = len(self._items) >= self.capacity
+            if dropped:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(frame)
+            self.produced += 1
+            self._cond.notify()
+            return dropped
+
+    def get(self, timeout=None):
+        """Vyzvedne nejstarší snímek ve schránce; None po timeoutu nebo po close()."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._items:
+                if self._closed:
+                    return None
+                if deadline is None:
+                    self._cond.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+            self.consumed += 1
+            return self._items.popleft()
+
+    def stats(self):
+        with self._cond:
+            return {"produced": self.produced, "consumed": self.consumed, "dropped": self.dropped}
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        """Probudí čekající konzumenty; další get() vrací None, jakmile je schránka prázdná."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
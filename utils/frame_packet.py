@@ -0,0 +1,86 @@
+# utils/frame_packet.py
+import hashlib
+import time
+
+import cv2
+import numpy as np
+
+
+class FramePacket:
+    """
+    Snímek putující pipeline: kamera → detekce → tracking → vizualizace.
+
+    Nese id zdroje, monotónní čas zachycení, sekvenční číslo, původní JPEG
+    (pokud existuje) a BGR obraz. Každá fáze si do stamps zapíše čas
+    dokončení, takže lze měřit latenci glass-to-glass i stáří snímku.
+    digest je otisk surového JPEG, duplicate značí snímek shodný s předchozím.
+    """
+
+    __slots__ = ("source_id", "seq", "capture_time", "jpeg", "image", "stamps", "detections",
+                 "digest", "duplicate", "_full")
+
+    def __init__(self, image, source_id="cam0", seq=0, capture_time=None, jpeg=None, full=None,
+                 digest=None, duplicate=False):
+        self.source_id = source_id
+        self.seq = seq
+        self.capture_time = time.monotonic() if capture_time is None else capture_time
+        self.jpeg = jpeg
+        self.image = image
+        self.stamps = {}
+        self.detections = None
+        self.digest = digest
+        self.duplicate = duplicate
+        self._full = full  # plné rozlišení, pokud je zdroj zná (jinak z jpeg líně)
+
+    def stamp(self, stage):
+        """Zapíše čas dokončení fáze (time.monotonic())."""
+        now = time.monotonic()
+        self.stamps[stage] = now
+        return now
+
+    def latency(self, stage=None):
+        """Čas od zachycení do dokončení fáze [s]; bez fáze = stáří snímku."""
+        end = self.stamps.get(stage) if stage else time.monotonic()
+        if end is None:
+            return None
+        return end - self.capture_time
+
+    def age(self):
+        """Stáří snímku v sekundách."""
+        return time.monotonic() - self.capture_time
+
+    def full_image(self):
+        """
+        Obraz v plném rozlišení – z původního JPEG se dekóduje líně,
+        jen pokud byl image zmenšen (snapshot, tiling).
+        """
+        if self._full is None:
+            full = None
+            if self.jpeg is not None:
+                full = cv2.imdecode(np.frombuffer(self.jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if full is None or (self.image is not None and full.shape[:2] == self.image.shape[:2]):
+                full = self.image
+            self._full = full
+        return self._full
+
+    def __repr__(self):
+        shape = None if self.image is None else self.image.shape
+        return f"FramePacket(source={self.source_id!r}, seq={self.seq}, shape={shape})"
+
+
+def content_hash(data):
+    """Otisk surových bajtů snímku (JPEG) – levný, bez dekódování."""
+    return hashlib.blake2b(memoryview(data).cast("B"), digest_size=8).digest()
+
+
+def as_image(frame):
+    """Vrátí BGR obraz z FramePacket nebo přímo z np.ndarray."""
+    if isinstance(frame, FramePacket):
+        return frame.image
+    return frame
+
+
+def stamp(frame, stage):
+    """Označí fázi, pokud je vstupem FramePacket (np.ndarray se ignoruje)."""
+    if isinstance(frame, FramePacket):
+        frame.stamp(stage)
@@ -1,5 +1,6 @@
 # Modul: utils/performance_timer.py
 import time
+from contextlib import contextmanager
 
 class PerformanceTimer:
     """
@@ -39,3 +40,54 @@ class PerformanceTimer:
         if elapsed == 0:
             return 0.0
         return self.frame_count / elapsed
+
+
+class StageTimer:
+    """
+    Doba jednotlivých fází (např. startu aplikace):
+        with timer.stage("import torch"): ...
+    """
+
+    def __init__(self):
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    @property
+    def total(self):
+        return sum(seconds for _, seconds in self.stages)
+
+    def report(self, title="Start"):
+        """Víceřádkový přehled fází v milisekundách."""
+        lines = [f"{title}: {self.total * 1000.0:.0f} ms"]
+        lines += [f"  {name:<24} {seconds * 1000.0:8.1f} ms" for name, seconds in self.stages]
+        return "\n".join(lines)
+
+
+def latency_stats(samples):
+    """
+    Souhrn latencí (vstup v sekundách) – průměr a percentily v milisekundách.
+    """
+    if not samples:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+    ordered = sorted(samples)
+
+    def pct(p):
+        index = min(len(ordered) - 1, max(0, int(round(p / 100.0 * (len(ordered) - 1)))))
+        return ordered[index] * 1000.0
+
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000.0,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": ordered[-1] * 1000.0,
+    }
@@ -3,9 +3,13 @@ import cv2
 import time
 import os
 
+from utils.frame_packet import as_image, stamp
+
 class Visualizer:
-    def __init__(self, display=True, save_output=False, output_path="data/outputs/output.avi"):
+    def __init__(self, display=True, save_output=False, output_path="data/outputs/output.avi",
+                 window_name="AirborneTracker"):
         self.display = display
+        self.window_name = window_name
         self.save_output = save_output
         self.output_path = output_path
         self.writer = None
@@ -34,9 +38,16 @@ class Visualizer:
         return self.last_fps
 
     def draw(self, frame, detections, tracks=None):
-        """Vykreslí detekce a případné tracky do snímku."""
+        """
+        Vykreslí detekce a případné tracky do kopie snímku (np.ndarray nebo
+        FramePacket) a vrátí ji. Obraz paketu se nemění – sdílí ho zdroj
+        (CanonCamera ho vrací pro duplikáty) i snímací vlákno.
+        """
+        packet = frame
+        frame = as_image(frame)
         if frame is None:
             return frame
+        frame = frame.copy()
 
         # Inicializuj zapisovač, pokud je potřeba
         if self.writer is None and self.save_output:
@@ -67,11 +78,12 @@ class Visualizer:
 
         # --- Zobrazení a/nebo uložení ---
         if self.display:
-            cv2.imshow("AirborneTracker", frame)
+            cv2.imshow(self.window_name, frame)
 
         if self.writer:
             self.writer.write(frame)
 
+        stamp(packet, "visualized")
         return frame
 
     def close(self):